@@ -1,6 +1,18 @@
-from importlib.metadata import PackageNotFoundError, version  # pragma: no cover
+globals().pop("__version__", None)  # ensure `reload` discovers the version again
 
-try:
-    __version__ = version(__name__)
-except PackageNotFoundError:  # pragma: no cover
-    __version__ = "unknown"
+
+def __getattr__(name):
+    # Discovering the installed version scans the distributions in `sys.path`, so it
+    # is delayed until needed (e.g. not needed by most invocations of the CLI)
+    if name != "__version__":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib.metadata import PackageNotFoundError, version  # pragma: no cover
+
+    try:
+        value = version(__name__)
+    except PackageNotFoundError:  # pragma: no cover
+        value = "unknown"
+
+    globals()["__version__"] = value  # next lookups do not call this function
+    return value
@@ -11,13 +11,30 @@ Note:
     other auxiliary functions, see :mod:`snek.structure`,
     :mod:`snek.update`.
 """
+import contextvars
+import inspect
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from functools import reduce
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
-from . import info, repo
+from . import file_system as fs
+from . import info, profiling, repo
 from .exceptions import (
     ActionNotFound,
     DirectoryAlreadyExists,
@@ -43,12 +60,18 @@ if TYPE_CHECKING:  # pragma: no cover
 ScaffoldOpts = Dict[str, Any]
 """Dictionary with snek's options, see :obj:`snek.api.create_project`."""
 
-Action = Callable[[Structure, ScaffoldOpts], Tuple[Structure, ScaffoldOpts]]
+Action = Callable[
+    [Structure, ScaffoldOpts],
+    Union[Tuple[Structure, ScaffoldOpts], Awaitable[Tuple[Structure, ScaffoldOpts]]],
+]
 """Signature of a snek action, both arguments should be treated as immutable,
 but a copy of the arguments, modified by the extension might be returned::
 
     Callable[[Structure, ScaffoldOpts], Tuple[Structure, ScaffoldOpts]]
 
+Actions can also be coroutine functions (``async def``), e.g. to run shell commands
+with :obj:`~snek.shell.AsyncShellCommand`. Coroutine actions should not change the
+working directory of the process, since other tasks might be running concurrently.
 """
 
 ActionParams = Tuple[Structure, ScaffoldOpts]
@@ -87,6 +110,9 @@ def discover(extensions: Iterable["Extension"]) -> List[Action]:
 def invoke(struct_and_opts: ActionParams, action: Action) -> ActionParams:
     """Invoke action with proper logging.
 
+    Coroutine actions run to completion in a new event loop (in a separate thread,
+    if the caller is already running in an event loop, see :obj:`invoke_async`).
+
     Args:
         struct_and_opts: snek's arguments for actions
         action: to be invoked
@@ -94,9 +120,39 @@ def invoke(struct_and_opts: ActionParams, action: Action) -> ActionParams:
     Returns:
         ActionParams: updated project representation and options
     """
-    logger.report("invoke", get_id(action))
-    with logger.indent():
-        return action(*struct_and_opts)
+    action_id = get_id(action)
+    logger.report("invoke", action_id)
+    with logger.indent(), profiling.measure(action_id):
+        if inspect.iscoroutinefunction(action):
+            return _run_coroutine(cast(Coroutine, action(*struct_and_opts)))
+        return cast(ActionParams, action(*struct_and_opts))
+
+
+def _run_coroutine(coroutine: Coroutine[Any, Any, ActionParams]) -> ActionParams:
+    import asyncio  # only needed by coroutine actions, keep it out of the cold start
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    # `asyncio.run` cannot be called when a loop is already running in this thread
+    # (e.g. in notebooks), so the coroutine runs in a new loop in a separate thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        ctx = contextvars.copy_context()
+        return executor.submit(ctx.run, asyncio.run, coroutine).result()
+
+
+async def invoke_async(struct_and_opts: ActionParams, action: Action) -> ActionParams:
+    """Awaitable equivalent of :obj:`invoke`.
+    Coroutine actions are awaited, while regular actions are simply called.
+    """
+    action_id = get_id(action)
+    logger.report("invoke", action_id)
+    with logger.indent(), profiling.measure(action_id):
+        if inspect.iscoroutinefunction(action):
+            return await action(*struct_and_opts)
+        return cast(ActionParams, action(*struct_and_opts))
 
 
 def register(
@@ -179,6 +235,36 @@ def unregister(actions: List[Action], reference: str) -> List[Action]:
     return actions[:position] + actions[position + 1 :]
 
 
+def declare(
+    reads: Iterable[str] = (), writes: Iterable[str] = ()
+) -> Callable[[Action], Action]:
+    """Decorator that declares which resources an action reads and produces, so the
+    :mod:`~snek.scheduler` can run it concurrently with other independent actions.
+
+    Resources are strings such as ``"struct"``, ``"opts"`` (all the options),
+    ``"opts.<key>"`` (a single option), ``"disk"`` (files of the project), ``"git"``
+    or ``"venv"``. Example::
+
+        @declare(reads={"opts.project_path", "git"}, writes={"git"})
+        def add_tag(struct, opts):
+            ...
+
+    Only the declared ``writes`` of the returned ``(struct, opts)`` are kept when the
+    action runs concurrently. Declared actions should not change the working
+    directory of the process (use ``cwd`` arguments instead), and regular functions
+    might run in a separate thread.
+    Actions without declaration always run alone, after all the previous actions
+    and before all the next ones (as when the pipeline runs sequentially).
+    """
+
+    def _decorator(action: Action) -> Action:
+        action.reads = frozenset(reads)  # type: ignore[attr-defined]
+        action.writes = frozenset(writes)  # type: ignore[attr-defined]
+        return action
+
+    return _decorator
+
+
 def _find(actions: Iterable[Action], name: str) -> int:
     """Find index of name in actions"""
     if ":" in name:
@@ -279,11 +365,13 @@ def verify_options_consistency(struct: Structure, opts: ScaffoldOpts) -> ActionP
 
 def empty(path: Path):
     """Is the path empty?"""
-    return not any(path.glob('*'))
+    return not any(path.glob("*"))
 
 
 def verify_project_dir(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
-    """Check if snek can materialize the project dir structure.
+    """Check if snek can materialize the project dir structure
+    (skipped when the files are not written to the disk, see
+    :obj:`snek.file_system.use_backend`).
 
     Args:
         struct: project representation as (possibly) nested :obj:`dict`.
@@ -294,6 +382,10 @@ def verify_project_dir(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
     """
     project_path = opts["project_path"].resolve(strict=False)
     parent_path = project_path.parent
+    if not fs.backend().on_disk:
+        logger.report("skip", f"{project_path} is not written to the disk")
+        return struct, opts
+
     logger.report("verify", f"does project path {project_path} exist...")
     if project_path.exists() and not empty(project_path):
         if not opts["update"] and not opts["force"]:
@@ -313,7 +405,9 @@ def verify_project_dir(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
 
 
 def init_git(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
-    """Add revision control to the generated files.
+    """Add revision control to the generated files
+    (skipped when the files are not written to the disk, see
+    :obj:`snek.file_system.use_backend`).
 
     Args:
         struct: project representation as (possibly) nested :obj:`dict`.
@@ -323,15 +417,54 @@ def init_git(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
         Updated project representation and options
     """
     path = opts.get("project_path", ".")
-    logger.report("check", f"is initialization of the git repository {path} needed...")
-    if not opts["update"] and not repo.is_git_repo(path):
-        repo.init_commit_repo(path, struct, pretend=opts.get("pretend"))
+    if _needs_git_repo(path, opts):
+        native, pretend = opts.get("native_git", False), opts.get("pretend")
+        repo.init_commit_repo(path, struct, native=native, pretend=pretend)
 
     return struct, opts
 
 
+@declare(
+    reads={"struct", "disk", "opts.project_path", "opts.update", "opts.native_git"},
+    writes={"git"},
+)
+async def init_git_async(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
+    """Coroutine equivalent of :obj:`init_git`, used when the pipeline runs in an
+    event loop (see :obj:`asynchronous`).
+
+    Git runs in the project directory via :obj:`~snek.repo.init_commit_repo_async`,
+    without changing the working directory of the process.
+    """
+    path = opts.get("project_path", ".")
+    if _needs_git_repo(path, opts):
+        native, pretend = opts.get("native_git", False), opts.get("pretend")
+        await repo.init_commit_repo_async(path, struct, native=native, pretend=pretend)
+
+    return struct, opts
+
+
+def _needs_git_repo(path: fs.PathLike, opts: ScaffoldOpts) -> bool:
+    if not fs.backend().on_disk:
+        logger.report("skip", f"git repository ({path} is not written to the disk)")
+        return False
+
+    logger.report("check", f"is initialization of the git repository {path} needed...")
+    if opts["update"]:
+        return False
+
+    if opts.get("native_git", False):
+        from .native_git import find_git_dir  # only loaded when required
+
+        return find_git_dir(path) is None
+
+    return not repo.is_git_repo(path)
+
+
 def report_done(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
     """Just inform the user snek is done"""
+    if opts.get("diff") in (True, "-") or opts.get("archive") in (True, "-"):
+        return struct, opts  # stdout is reserved for the diff/archive
+
     try:
         print("done! 🐍 🌟 ✨")
     except Exception:  # pragma: no cover
@@ -351,6 +484,19 @@ DEFAULT: List[Action] = [
 ]
 """Default list of actions forming the main pipeline executed by snek"""
 
+ASYNC_EQUIVALENTS: Dict[str, Action] = {get_id(init_git): init_git_async}
+"""Coroutine actions that replace the default ones when the pipeline runs in an
+event loop (see :obj:`asynchronous`)
+"""
+
+
+def asynchronous(pipeline: List[Action]) -> List[Action]:
+    """Replace the actions in the ``pipeline`` by their :obj:`ASYNC_EQUIVALENTS`
+    (e.g. :obj:`init_git` by :obj:`init_git_async`), so they can be awaited without
+    blocking the event loop or changing the working directory of the process.
+    """
+    return [ASYNC_EQUIVALENTS.get(get_id(a), a) for a in pipeline]
+
 
 # -------- Auxiliary functions --------
 
@@ -2,12 +2,13 @@
 External API for accessing Snek programmatically via Python.
 """
 from enum import Enum
-from functools import reduce
+from functools import partial, reduce
 from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional
 
-from . import __version__ as VERSION
-from . import actions, info
+from . import actions, info, profiling, templates
 from .exceptions import DirectErrorForUser, NoSnekProject
+from .log import logger
 
 # -------- Options --------
 
@@ -28,7 +29,6 @@ DEFAULT_OPTIONS = {
     "description": "Add a short description here!",
     "url": "https://github.com/",
     "license": "MIT",
-    "version": VERSION,
     "extensions": [],
     "config_files": [],  # Overloaded in bootstrap_options for lazy evaluation
 }
@@ -40,6 +40,7 @@ derived from ``project_path`` when not explicitly passed) are computed in
 
 When ``config_files`` is empty, a default value is computed dynamically by
 :obj:`snek.info.config_file` before the start of Snek's action pipeline.
+Similarly, ``version`` is always set to the running version of Snek.
 
 Warning:
     Default values might be dynamically overwritten by ``config_files`` or, during
@@ -64,23 +65,8 @@ def bootstrap_options(opts=None, **kwargs):
     """
     opts = opts.copy() if opts else {}
     opts.update(kwargs)
-
-    # Clean up:
-    opts = {k: v for k, v in opts.items() if v or v is False}
-    # ^  remove empty items, so we ensure setdefault works
-
-    # Add options stored in config files:
-    info._migrate_old_macos_config()
-    default_files = [info.config_file(default=None)]
-    opts.setdefault("config_files", [f for f in default_files if f and f.exists()])
-    # ^  make sure the file exists before passing it ahead
-    opts = _read_existing_config(opts)
-
-    # Add defaults last, so they don't overwrite:
-    opts.update({k: v for k, v in DEFAULT_OPTIONS.items() if k not in opts})
-
-    opts["version"] = VERSION  # always update version
-    return opts
+    opts = _read_existing_config(_read_user_config(_clean(opts)))
+    return _add_defaults(opts)
 
 
 # -------- Public API --------
@@ -117,6 +103,12 @@ def create_project(opts=None, **kwargs):
     :Snek Control:    - **update** (*bool*)
                       - **force** (*bool*)
                       - **pretend** (*bool*)
+                      - **native_git** (*bool*)
+                      - **jobs** (*int*)
+                      - **profile** (*bool* or :obj:`os.PathLike`)
+                      - **diff** (*bool* or :obj:`os.PathLike`)
+                      - **archive** (*bool* or :obj:`os.PathLike`)
+                      - **archive_git** (*bool*)
                       - **extensions** (*list*)
                       - **config_files** (*list* or ``NO_CONFIG``)
 
@@ -130,6 +122,24 @@ def create_project(opts=None, **kwargs):
     but will keep others intact.
     When the **pretend** flag is ``True``, the project will not be
     created/updated, but the expected outcome will be logged.
+    When the **native_git** flag is ``True``, the initial commit of new projects
+    is written directly by Snek (see :mod:`snek.native_git`), falling back to the
+    git CLI only when necessary.
+    When **jobs** is greater than 1, the files of the project are rendered and
+    written concurrently (see :obj:`snek.structure.create_structure`), and so are
+    the independent actions of the pipeline (see :mod:`snek.scheduler`, git is then
+    initialized by :obj:`~snek.actions.init_git_async`).
+    When **profile** is given, the time, memory, subprocesses and files written by
+    each action are printed as a table and saved as JSON to the given path (or to
+    :obj:`snek.profiling.DEFAULT_FILE` when ``True``), see :mod:`snek.profiling`.
+    When **diff** is given, nothing is written to the disk (as when pretending), but
+    a unified diff with the changes is written to the given path (or printed when
+    ``True``), see :mod:`snek.diff`.
+    When **archive** is given, the project is not written to the disk either.
+    Instead its files are streamed into a ``.tar.gz`` (or ``.zip``, ``.tar.xz``...)
+    archive in the given path (or to the standard output when ``True`` or ``"-"``).
+    The git repository is only included, as a bundle, when **archive_git** is
+    ``True``, see :mod:`snek.archive`.
 
     The **extensions** list may contain any object that follows the
     :ref:`extension API <extensions>`. Note that some Snek features, such
@@ -151,19 +161,146 @@ def create_project(opts=None, **kwargs):
     (and possibly nested) namespace.
     """
     opts = bootstrap_options(opts, **kwargs)
-    pipeline = actions.discover(opts["extensions"])
+    return _run_pipeline(actions.discover(opts["extensions"]), opts)
+
+
+def _run_pipeline(pipeline: List[actions.Action], opts: actions.ScaffoldOpts):
+    """Run the pipeline for the (already bootstrapped) options of a single project,
+    streaming it into an archive when ``opts["archive"]`` is given
+    """
+    if opts.get("archive"):
+        from . import archive  # tarfile/zipfile are only needed for archives
 
+        with archive.stream(opts["archive"], opts):
+            return _invoke_all(archive.adapt(pipeline), opts)
+
+    return _invoke_all(pipeline, opts)
+
+
+def _invoke_all(pipeline: List[actions.Action], opts: actions.ScaffoldOpts):
     # call the actions to generate final struct and opts
-    return reduce(actions.invoke, pipeline, ({}, opts))
+    params: actions.ActionParams = ({}, opts)
+    if not opts.get("profile"):
+        if _concurrent(opts):
+            from . import scheduler  # asyncio is only needed when running concurrently
+
+            pipeline = actions.asynchronous(pipeline)
+            return actions._run_coroutine(scheduler.run(pipeline, params, opts["jobs"]))
+        return reduce(actions.invoke, pipeline, params)
+
+    with profiling.session(opts["profile"]):
+        return reduce(actions.invoke, pipeline, params)
+
+
+async def create_project_async(opts=None, **kwargs):
+    """Awaitable equivalent of :obj:`create_project`, for applications that embed
+    snek in an :mod:`asyncio` event loop.
+
+    Coroutine actions (e.g. :obj:`~snek.actions.init_git_async`, that replaces
+    :obj:`~snek.actions.init_git`) are awaited, so the loop is free to run other
+    tasks while their subprocesses execute. Regular actions are still called
+    synchronously (unless **jobs** is greater than 1, see :mod:`snek.scheduler`).
+    """
+    opts = bootstrap_options(opts, **kwargs)
+    pipeline = actions.discover(opts["extensions"])
+
+    if opts.get("archive"):
+        from . import archive
+
+        with archive.stream(opts["archive"], opts):
+            pipeline = actions.asynchronous(archive.adapt(pipeline))
+            return await _invoke_all_async(pipeline, opts)
+
+    return await _invoke_all_async(actions.asynchronous(pipeline), opts)
+
+
+async def _invoke_all_async(pipeline: List[actions.Action], opts: actions.ScaffoldOpts):
+    async def _sequentially():
+        struct_and_opts: actions.ActionParams = ({}, opts)
+        for action in pipeline:
+            struct_and_opts = await actions.invoke_async(struct_and_opts, action)
+        return struct_and_opts
+
+    if not opts.get("profile"):
+        if _concurrent(opts):
+            from . import scheduler
+
+            return await scheduler.run(pipeline, ({}, opts), opts["jobs"])
+        return await _sequentially()
+
+    with profiling.session(opts["profile"]):
+        return await _sequentially()
+
+
+def _concurrent(opts: actions.ScaffoldOpts) -> bool:
+    # ^  profiling measures the actions one at a time, so it is never concurrent
+    return (opts.get("jobs") or 1) > 1
+
+
+class ProjectResult(NamedTuple):
+    """Outcome of each one of the projects handled by :obj:`create_projects`"""
+
+    project_path: str
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def create_projects(
+    projects: Iterable[dict], jobs: int = 1, **kwargs
+) -> List[ProjectResult]:
+    """Create (or update) several projects in a single run.
+
+    The work that does not depend on the individual projects (reading the user's
+    config files, checking git, loading the templates and discovering the actions
+    for each set of extensions) happens only once for the whole batch.
+
+    Args:
+        projects: options for each one of the projects (see :obj:`create_project`)
+        jobs: number of worker processes. When ``1``, all the projects are
+            created sequentially in the current process.
+        **kwargs: options shared by all the projects (e.g. ``extensions`` or
+            ``config_files``). Options given in **projects** take precedence.
+
+    Returns:
+        list: one :obj:`ProjectResult` per project, in the same order they were
+        given. Failing projects do not interrupt the batch, instead the exception
+        is stored in :obj:`ProjectResult.error`.
+    """
+    shared = _read_user_config(_clean(kwargs))
+    if not shared.get("pretend"):
+        info.check_git()
+    templates.warm_cache()
+    _pipelines.clear()
+
+    job = partial(_create_project_job, shared)
+    if jobs <= 1:
+        return [job(project) for project in projects]
+
+    from concurrent.futures import ProcessPoolExecutor  # imports multiprocessing
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(job, projects))
 
 
 # -------- Auxiliary functions (Private) --------
 
 
-def _read_existing_config(opts):
-    """Read existing config files first listed in ``opts["config_files"]``
-    and then ``setup.cfg`` inside ``opts["project_path"]``
+def _clean(opts):
+    """Remove empty items, so we ensure setdefault works"""
+    return {k: v for k, v in opts.items() if v or v is False}
+
+
+def _read_user_config(opts):
+    """Add options stored in the config files listed in ``opts["config_files"]``
+    (or in the default config file, when none is given)
     """
+    info._migrate_old_macos_config()
+    default_files = [info.config_file(default=None)]
+    opts.setdefault("config_files", [f for f in default_files if f and f.exists()])
+    # ^  make sure the file exists before passing it ahead
     config_files = opts["config_files"]
     if config_files is not NO_CONFIG:
         paths = (Path(f).resolve() for f in config_files)
@@ -173,6 +310,11 @@ def _read_existing_config(opts):
         #    explicit.
         opts = reduce(info.project, deduplicated.keys(), opts)
 
+    return opts
+
+
+def _read_existing_config(opts):
+    """Read ``setup.cfg`` inside ``opts["project_path"]`` (during updates)"""
     if opts.get("update"):
         try:
             opts = info.project(opts)
@@ -183,3 +325,55 @@ def _read_existing_config(opts):
             raise NoSnekProject from e
 
     return opts
+
+
+def _add_defaults(opts):
+    """Add defaults last, so they don't overwrite"""
+    from . import __version__ as VERSION
+
+    opts.update({k: v for k, v in DEFAULT_OPTIONS.items() if k not in opts})
+    opts["version"] = VERSION  # always update version
+    if opts.get("diff"):
+        opts["pretend"] = True  # the diff mode never writes to the disk
+    return opts
+
+
+_pipelines: dict = {}
+"""Memo for :obj:`actions.discover`, shared by the projects in the same batch"""
+
+
+def _pipeline(extensions):
+    key = tuple((type(e), e.name) for e in extensions)
+    if key not in _pipelines:
+        _pipelines[key] = actions.discover(extensions)
+    return _pipelines[key]
+
+
+def _create_project_job(shared, project) -> ProjectResult:
+    """Create a single project of a batch (see :obj:`create_projects`).
+    Errors are returned instead of raised, so one failure does not stop the batch.
+    """
+    project = _clean(dict(project))
+    path = str(project.get("project_path", "."))
+    try:
+        opts = {**shared, **project}
+        if "config_files" in project:
+            opts = _read_user_config(opts)
+        opts = _add_defaults(_read_existing_config(opts))
+        _run_pipeline(_pipeline(opts["extensions"]), opts)
+    except Exception as ex:
+        logger.debug("Error when creating %r", path, exc_info=True)
+        return ProjectResult(path, _picklable(ex))
+
+    return ProjectResult(path)
+
+
+def _picklable(ex: Exception) -> Exception:
+    """Exceptions raised in a worker process have to travel back to the main one"""
+    import pickle
+
+    try:
+        pickle.loads(pickle.dumps(ex))
+        return ex
+    except Exception:
+        return RuntimeError(f"{type(ex).__name__}: {ex}")
@@ -0,0 +1,267 @@
+"""Generate projects straight into a ``.tar(.gz|.bz2|.xz)`` or ``.zip`` archive
+(used by ``--archive``, see :obj:`snek.api.create_project`).
+
+The files of the project are never written to the disk: each file is added to the
+archive as soon as it is rendered, via the :obj:`ArchiveFileSystem` backend (see
+:obj:`snek.file_system.use_backend`).
+Initializing a git repository requires a working tree on the disk, so by default
+it is skipped. When ``opts["archive_git"]`` is true, a `git bundle`_ with the
+initial commit is added to the same archive (next to the project directory), in a
+temporary directory that is removed afterwards. The repository can be then obtained
+with ``git clone PROJECT.bundle``.
+Other actions that need the project in the disk, such as the creation of a virtual
+environment or the installation of pre-commit hooks, are skipped (see :obj:`adapt`).
+
+.. _git bundle: https://git-scm.com/docs/git-bundle
+"""
+
+import os
+import stat
+import sys
+import tarfile
+import time
+import zipfile
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import IO, Iterator, List, Optional, Tuple, Union, cast
+
+from . import file_system as fs
+from . import repo, shell
+from .actions import (
+    Action,
+    ActionParams,
+    ScaffoldOpts,
+    Structure,
+    init_git,
+    verify_project_dir,
+)
+from .identification import get_id
+from .log import logger
+from .scheduler import resources
+
+PathLike = Union[str, os.PathLike]
+
+STDOUT = "-"
+"""Destination representing the standard output (a ``.tar.gz`` stream)"""
+
+TAR_MODES = {
+    ".tar": "w|",
+    ".gz": "w|gz",
+    ".tgz": "w|gz",
+    ".bz2": "w|bz2",
+    ".xz": "w|xz",
+}
+"""Mode used to open the archive (see :obj:`tarfile.open`), given its file suffix"""
+
+WORKING_TREE = frozenset({"git", "venv"})
+"""Resources that require the project in the disk (see :obj:`snek.actions.declare`),
+the actions that declare them are not part of the pipeline (see :obj:`adapt`)
+"""
+
+
+class ArchiveFileSystem(fs.MemoryFileSystem):
+    """:obj:`~snek.file_system.MemoryFileSystem` that also streams the files into an
+    archive as they are written.
+
+    Each file is added to the archive only when the next one is written (or when the
+    archive is closed), so the permissions changed right after the file is created
+    (e.g. by :obj:`~snek.operations.add_permissions`) are also considered.
+
+    Args:
+        file: binary file object where the archive is written (it does not need to
+            be seekable)
+        root: directory that corresponds to the root of the archive
+        format: ``"zip"`` or one of the ``mode`` values accepted by
+            :obj:`tarfile.open` for streams (e.g. ``"w|gz"``)
+    """
+
+    def __init__(self, file: IO[bytes], root: PathLike, format="w|gz"):
+        super().__init__()
+        self.root = Path(os.path.abspath(root))
+        self.archived: List[Path] = []
+        self._pending: Optional[Path] = None
+        self._mtime = time.time()
+        if format == "zip":
+            self._zip: Optional[zipfile.ZipFile] = zipfile.ZipFile(
+                file, "w", zipfile.ZIP_DEFLATED
+            )
+            self._tar: Optional[tarfile.TarFile] = None
+        else:
+            self._zip = None
+            self._tar = tarfile.open(fileobj=file, mode=format)
+
+    def write_bytes(self, path: Path, content: bytes):
+        key = Path(os.path.abspath(path))
+        with self._lock:
+            super().write_bytes(path, content)
+            if self._pending not in (None, key):
+                self._add(self._pending)
+            self._pending = key
+
+    def mkdir(self, path: Path):
+        key = Path(os.path.abspath(path))
+        with self._lock:
+            new = [d for d in (key, *key.parents) if not self.is_dir(d)]
+            super().mkdir(path)
+            for directory in reversed(new):
+                self._add(directory)
+
+    def chmod(self, path: Path, mode: int):
+        key = Path(os.path.abspath(path))
+        with self._lock:
+            super().chmod(path, mode)
+            if key in self.archived and key in self.files:
+                self._add(key)  # the last entry wins when extracting
+
+    def close(self):
+        """Add the pending file and finish the archive"""
+        with self._lock:
+            if self._pending is not None:
+                self._add(self._pending)
+                self._pending = None
+            if self._zip:
+                self._zip.close()
+            if self._tar:
+                self._tar.close()
+
+    def _add(self, key: Path):
+        name = os.path.relpath(key, self.root).replace(os.sep, "/")
+        if name == "." or os.pardir in name.split("/"):
+            return  # outside of the archive
+
+        mode = self.mode(key)
+        content = self.files.get(key, b"")
+        if self._tar:
+            info = tarfile.TarInfo(name)
+            info.mtime = int(self._mtime)
+            info.mode = stat.S_IMODE(mode)
+            if stat.S_ISDIR(mode):
+                info.type = tarfile.DIRTYPE
+                self._tar.addfile(info)
+            else:
+                info.size = len(content)
+                self._tar.addfile(info, BytesIO(content))
+        elif self._zip:
+            is_dir = stat.S_ISDIR(mode)
+            date = time.localtime(self._mtime)[:6]
+            zinfo = zipfile.ZipInfo(name + "/" if is_dir else name, date_time=date)
+            zinfo.external_attr = (mode & 0xFFFF) << 16 | (0x10 if is_dir else 0)
+            zinfo.compress_type = zipfile.ZIP_DEFLATED
+            self._zip.writestr(zinfo, content)
+
+        self.archived.append(key)
+        logger.report("archive", name)
+
+
+def archive_format(destination: PathLike) -> str:
+    """Format of the archive, given its file name (see :obj:`ArchiveFileSystem`)"""
+    if str(destination) == STDOUT:
+        return "w|gz"
+    suffix = Path(destination).suffix.lower()
+    if suffix == ".zip":
+        return "zip"
+    return TAR_MODES.get(suffix, "w|gz")
+
+
+@contextmanager
+def stream(destination: Union[PathLike, bool], opts: ScaffoldOpts):
+    """Context manager that activates an :obj:`ArchiveFileSystem` writing to
+    ``destination`` (a file path, or the standard output for ``True`` or ``"-"``).
+
+    The root of the archive is the parent directory of ``opts["project_path"]``,
+    so all the entries are inside a directory named after the project.
+    When ``opts["pretend"]`` is true, the archive is discarded (``destination`` is
+    not even opened), but its entries are still logged.
+    """
+    project = Path(os.path.abspath(opts.get("project_path", ".")))
+    to_stdout = destination is True or str(destination) == STDOUT
+    kind = archive_format(STDOUT if to_stdout else cast(PathLike, destination))
+    path: Optional[PathLike] = None
+    if opts.get("pretend"):
+        file: IO[bytes] = open(os.devnull, "wb")
+    elif to_stdout:
+        file = sys.stdout.buffer
+    else:
+        path = cast(PathLike, destination)
+        file = open(path, "wb")
+
+    completed = False
+    try:
+        archive = ArchiveFileSystem(file, project.parent, kind)
+        with fs.use_backend(archive):
+            yield archive
+        archive.close()
+        completed = True
+    finally:
+        if file is sys.stdout.buffer:
+            file.flush()
+        else:
+            file.close()
+            if path is not None and not completed:
+                os.unlink(path)  # do not leave a partial (i.e. corrupted) archive
+
+
+def adapt(pipeline: List[Action]) -> List[Action]:
+    """Replace the actions that need a project in the disk (the verification of the
+    project directory and the git initialization) in the ``pipeline``.
+
+    Actions from extensions that declare :obj:`WORKING_TREE` resources (e.g. the
+    creation of a virtual environment or the installation of pre-commit hooks) are
+    removed, with a warning. Undeclared actions are kept as they are.
+    """
+    replacements = {get_id(verify_project_dir): None, get_id(init_git): bundle_git}
+    adapted = []
+    for action in pipeline:
+        replacement = replacements.get(get_id(action), action)
+        if replacement is action and _needs_working_tree(action):
+            logger.warning(f"Skipping {get_id(action)}: not supported with --archive")
+        elif replacement is not None:
+            adapted.append(replacement)
+    return adapted
+
+
+def _needs_working_tree(action: Action) -> bool:
+    reads, writes = resources(action, "reads"), resources(action, "writes")
+    return bool(WORKING_TREE & ((reads or frozenset()) | (writes or frozenset())))
+
+
+def bundle_git(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
+    """Add a git bundle with the initial commit of the project to the archive
+    (when ``opts["archive_git"]`` is true)
+    """
+    archive = fs.backend()
+    if not opts.get("archive_git") or not isinstance(archive, ArchiveFileSystem):
+        return struct, opts
+
+    project = Path(os.path.abspath(opts.get("project_path", ".")))
+    bundle = project.parent / f"{project.name}.bundle"
+    if opts.get("pretend"):
+        logger.report("bundle", bundle)
+        return struct, opts
+
+    with TemporaryDirectory(prefix="snek-bundle-") as tmp:
+        workdir = Path(tmp, project.name)
+        with fs.use_backend(fs.DISK):
+            for path, content, mode in _files_within(archive, project):
+                target = workdir / path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(content)
+                target.chmod(stat.S_IMODE(mode))  # e.g. executable scripts
+            repo.init_commit_repo(workdir, struct)
+            file = Path(tmp, bundle.name)
+            shell.git("bundle", "create", str(file), "--all", cwd=str(workdir))
+            data = file.read_bytes()
+
+    archive.write_bytes(bundle, data)
+    logger.report("bundle", bundle)
+    return struct, opts
+
+
+def _files_within(
+    archive: fs.MemoryFileSystem, directory: Path
+) -> Iterator[Tuple[Path, bytes, int]]:
+    for path, content in list(archive.files.items()):
+        if directory in path.parents:
+            yield path.relative_to(directory), content, archive.mode(path)
@@ -3,18 +3,18 @@ Command-Line-Interface of snek
 """
 
 import argparse
+import csv
+import json
 import logging
+import re
 import sys
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, List, Optional, Union
 
-from packaging.version import Version
-
-from . import __version__ as snek_version
 from . import api, templates
 from .actions import ScaffoldOpts
 from .actions import discover as discover_actions
-from .exceptions import exceptions2exit
+from .exceptions import ExtensionNotFound, exceptions2exit
 from .extensions import list_from_entry_points as list_all_extensions
 from .identification import get_id
 from .info import best_fit_license
@@ -49,6 +49,18 @@ def add_log_related_args(parser: argparse.ArgumentParser):
         help="do not create project, but displays the log of all operations"
         " as if it had been created.",
     )
+    parser.add_argument(
+        "--log-events",
+        dest="log_events",
+        type=_file_or_fd,
+        metavar="FILE",
+        help="write the reported events (with timestamps and durations) as JSON"
+        " lines to the given file (or file descriptor number)",
+    )
+
+
+def _file_or_fd(value: str) -> Union[str, int]:
+    return int(value) if value.isdigit() else value
 
 
 def add_init_args(parser: argparse.ArgumentParser):
@@ -124,9 +136,72 @@ def add_init_args(parser: argparse.ArgumentParser):
         " like setup.py etc. Use additionally --force to replace all scaffold files.",
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        required=False,
+        help="number of concurrent workers (default: 1). When greater than 1, the "
+        "files are rendered and written concurrently, and the independent actions "
+        "of the pipeline (e.g. git initialization and venv creation) run "
+        "concurrently as well",
+        metavar="N",
+    )
+    parser.add_argument(
+        "--native-git",
+        dest="native_git",
+        action="store_true",
+        required=False,
+        help="write the initial commit of new projects directly from Python, "
+        "instead of calling git (git is still used as a fallback)",
+    )
+
+    parser.add_argument(
+        "--diff",
+        dest="diff",
+        nargs="?",
+        const=True,
+        required=False,
+        help="do not create/update the project, but print a unified diff of the files "
+        "that would change (or save it to FILE). The changes made by the migration "
+        "steps of --update are not included, only logged",
+        metavar="FILE",
+    )
+    parser.add_argument(
+        "--archive",
+        dest="archive",
+        required=False,
+        help="do not create the project in the disk, but stream its files into a "
+        ".tar.gz/.tar.bz2/.tar.xz/.zip archive FILE (or `-` for stdout)",
+        metavar="FILE",
+    )
+    parser.add_argument(
+        "--archive-git",
+        dest="archive_git",
+        action="store_true",
+        required=False,
+        help="include a git bundle with the initial commit in the archive",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        nargs="?",
+        const=True,
+        required=False,
+        help="show how long each action takes (and how many processes/files it "
+        "spawns/writes), saving the details as JSON to FILE "
+        "(default: snek-profile.json)",
+        metavar="FILE",
+    )
+
     # The following are basically for the CLI options, so having a default value is OK.
     parser.add_argument(
-        "-V", "--version", action="version", version=f"snek {snek_version}"
+        "-V",
+        "--version",
+        action=_ShowVersion,
+        nargs=0,
+        help="show program's version number and exit",
     )
     add_log_related_args(parser)
     parser.add_argument(
@@ -138,6 +213,35 @@ def add_init_args(parser: argparse.ArgumentParser):
     )
 
 
+def add_batch_args(parser: argparse.ArgumentParser):
+    """Add the options and arguments of the ``batch`` sub command to the CLI parser."""
+    parser.add_argument(
+        "manifest",
+        help="JSON (list of objects) or CSV file with the options of each project "
+        "(one project per item/row, an `extensions` column may list extension names)",
+        metavar="MANIFEST",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="batch_jobs",
+        type=int,
+        default=1,
+        help="number of projects to be created in parallel processes (default: 1)",
+        metavar="N",
+    )
+    add_log_related_args(parser)
+
+
+class _ShowVersion(argparse.Action):
+    """Similar to ``action="version"``, but only discovers the version when used"""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        from . import __version__ as snek_version
+
+        parser.exit(message=f"snek {snek_version}\n")
+
+
 def add_extension_args(parser: argparse.ArgumentParser):
     """Add options and arguments defined by extensions to the CLI parser."""
     # load and instantiate extensions
@@ -164,6 +268,11 @@ def parse_args(args: List[str]) -> ScaffoldOpts:
     init_parser = parsers.add_parser('init', help="Initialize a new repository in the current directory")
     init_parser.set_defaults(func=init)
     add_init_args(init_parser)
+    batch_parser = parsers.add_parser(
+        "batch", help="Create (or update) several projects listed in a manifest file"
+    )
+    batch_parser.set_defaults(func=batch)
+    add_batch_args(batch_parser)
 
     add_extension_args(parser)
 
@@ -229,6 +338,10 @@ def run_scaffold(opts: ScaffoldOpts):
     """
     api.create_project(opts)
     if opts["update"] and not opts["force"]:
+        from packaging.version import Version
+
+        from . import __version__ as snek_version
+
         note = (
             "Update accomplished!\n"
             "Please check if your setup.cfg still complies with:\n"
@@ -238,6 +351,62 @@ def run_scaffold(opts: ScaffoldOpts):
         print(note.format(base_version))
 
 
+def batch(opts: ScaffoldOpts):
+    """Create all the projects listed in ``opts["manifest"]``, calling the python API
+
+    Args:
+        opts (dict): command line options as dictionary
+    """
+    projects = read_manifest(opts.pop("manifest"))
+    jobs = opts.pop("batch_jobs", 1)
+    opts.pop("func", None)
+    results = api.create_projects(projects, jobs=jobs, **opts)
+
+    for result in results:
+        status = "ok" if result.ok else f"failed ({result.error})"
+        print(f"{result.project_path}: {status}")
+
+    failed = sum(not r.ok for r in results)
+    if failed:
+        print(f"{failed} of {len(results)} projects failed", file=sys.stderr)
+        sys.exit(1)
+
+
+def read_manifest(path: str) -> List[ScaffoldOpts]:
+    """Read the options of each project from a JSON or CSV ``path``.
+
+    Extensions are referred by name (e.g. ``namespace`` or ``no-tox``) and resolved
+    only once for the whole manifest.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    if Path(path).suffix.lower() == ".json":
+        projects = json.loads(text)
+    else:
+        rows = csv.DictReader(text.splitlines())
+        projects = [{k: _parse_csv_value(v) for k, v in row.items()} for row in rows]
+
+    available = {e.name: e for e in list_all_extensions()}
+    return [_resolve_extensions(p, available) for p in projects]
+
+
+def _parse_csv_value(value: Optional[str]):
+    text = (value or "").strip()
+    return {"true": True, "false": False}.get(text.lower(), text)
+
+
+def _resolve_extensions(project: ScaffoldOpts, available: dict) -> ScaffoldOpts:
+    names: Iterable[str] = project.get("extensions") or []
+    if isinstance(names, str):
+        names = re.split(r"[\s,]+", names.strip())
+
+    try:
+        extensions = [available[n.replace("-", "_")] for n in names if n]
+    except KeyError as ex:
+        raise ExtensionNotFound([ex.args[0]]) from ex
+
+    return {**project, "extensions": extensions}
+
+
 def list_actions(opts: ScaffoldOpts):
     """Do not create a project, just list actions considering extensions
 
@@ -4,8 +4,6 @@ import re
 from itertools import chain
 from typing import Iterable, List
 
-from packaging.requirements import InvalidRequirement, Requirement
-
 # setuptools version is now enforced via `install_requires`
 
 BUILD = ("setuptools_scm>=5",)
@@ -68,6 +66,8 @@ def attempt_pkg_name(requirement: str) -> str:
     :pep`440`), it returns the "package name" part of dependency (without versions).
     Otherwise, it returns the same string (removed the comment marks).
     """
+    from packaging.requirements import InvalidRequirement, Requirement
+
     req = requirement.strip("#").strip()
     try:
         return Requirement(req).name
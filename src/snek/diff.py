@@ -0,0 +1,68 @@
+"""Preview of the changes that creating/updating a project would cause in the disk,
+in the format of a `unified diff`_ (used by ``--diff``, see
+:obj:`snek.structure.create_structure`).
+
+Only the files in the project structure are compared. The changes made by the
+migration steps of an update (:obj:`snek.update.version_migration`, e.g. to
+``setup.cfg`` and ``pyproject.toml``) are not part of the diff, they are just logged
+as when pretending.
+
+.. _unified diff: https://www.gnu.org/software/diffutils/manual/html_node/Unified-Format.html
+"""  # noqa
+
+import difflib
+import os
+import sys
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from .file_system import backend
+from .operations import FileContents
+
+PathLike = Union[str, os.PathLike]
+
+NULL = "/dev/null"
+"""Label used for files that do not exist (as in ``git diff``)"""
+
+
+def unified_diff(
+    path: Path, contents: FileContents, relative_to: Optional[PathLike] = None
+) -> str:
+    """Unified diff between the file in ``path`` and the new ``contents``
+    (empty string if they are the same, ``contents = None`` means removal).
+    """
+    name = Path(os.path.relpath(path, relative_to)) if relative_to else path
+    old: Optional[str] = None
+    try:
+        if backend().is_file(path):
+            old = backend().read_text(path, encoding="utf-8")
+    except UnicodeDecodeError:
+        return f"Binary files a/{name.as_posix()} and b/{name.as_posix()} differ\n"
+
+    if old == contents:
+        return ""
+
+    old_label = f"a/{name.as_posix()}" if old is not None else NULL
+    new_label = f"b/{name.as_posix()}" if contents is not None else NULL
+    lines = difflib.unified_diff(
+        _lines(old), _lines(contents), fromfile=old_label, tofile=new_label
+    )
+    return "".join(lines)
+
+
+def write(destination: Union[PathLike, bool], diffs: Iterable[str]):
+    """Write the ``diffs`` to a file in the given path
+    (or to :obj:`sys.stdout` when ``destination`` is ``True`` or ``"-"``).
+    """
+    text = "".join(diffs)
+    if destination is True or str(destination) == "-":
+        sys.stdout.write(text)
+    elif not isinstance(destination, bool):
+        Path(destination).write_text(text, encoding="utf-8")
+
+
+def _lines(contents: FileContents):
+    lines = (contents or "").splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n\\ No newline at end of file\n"
+    return lines
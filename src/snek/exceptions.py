@@ -7,15 +7,14 @@ import logging
 import sys
 import traceback
 from pathlib import Path
-from typing import Optional, Sequence, Union, cast
+from typing import TYPE_CHECKING, Optional, Sequence, Union, cast
 
-if sys.version_info[:2] >= (3, 8):
-    # TODO: Import directly (no need for conditional) when `python_requires = >= 3.8`
-    from importlib.metadata import EntryPoint  # pragma: no cover
-else:
-    from importlib_metadata import EntryPoint  # pragma: no cover
-
-from . import __version__ as snek_version
+if TYPE_CHECKING:  # pragma: no cover
+    if sys.version_info[:2] >= (3, 8):
+        # TODO: Import directly (no need for conditional) when `python_requires >= 3.8`
+        from importlib.metadata import EntryPoint
+    else:
+        from importlib_metadata import EntryPoint
 
 
 def exceptions2exit(exception_list):
@@ -157,6 +156,8 @@ class ExtensionNotFound(DirectErrorForUser):
     """
 
     def __init__(self, extensions: Sequence[str]):
+        from . import __version__ as snek_version
+
         message = cast(str, self.__doc__)
         message = message.format(extensions=extensions, version=snek_version)
         super().__init__(message)
@@ -168,7 +169,9 @@ class ErrorLoadingExtension(DirectErrorForUser):
     with Snek {version}. You can also try unininstalling it.
     """
 
-    def __init__(self, extension: str = "", entry_point: Optional[EntryPoint] = None):
+    def __init__(self, extension: str = "", entry_point: Optional["EntryPoint"] = None):
+        from . import __version__ as snek_version
+
         if entry_point and not extension:
             extension = getattr(entry_point, "module", entry_point.name)
 
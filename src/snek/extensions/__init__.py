@@ -2,13 +2,17 @@
 Built-in extensions for snek.
 """
 import argparse
+import json
+import os
 import sys
 import textwrap
-from typing import Callable, Iterable, List, Optional, Type
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type
 
+from .. import info
 from ..actions import Action, register, unregister
 from ..exceptions import ErrorLoadingExtension
 from ..identification import dasherize, deterministic_sort, underscore
+from ..log import logger
 
 if sys.version_info[:2] >= (3, 8):
     # TODO: Import directly (no need for conditional) when `python_requires = >= 3.8`
@@ -19,6 +23,11 @@ else:
 
 ENTRYPOINT_GROUP = "snek.cli"
 
+ENTRYPOINT_CACHE = "entry_points.json"
+"""Name of the file (inside :obj:`snek.info.cache_dir`) used as a persistent index
+for the entry points, see :obj:`iterate_entry_points`.
+"""
+
 NO_LONGER_NEEDED = {"pyproject", "tox"}
 """Extensions that are no longer needed and are now part of snek itself"""
 
@@ -157,9 +166,77 @@ def iterate_entry_points(group=ENTRYPOINT_GROUP) -> Iterable[EntryPoint]:
     This method can be used in conjunction with :obj:`load_from_entry_point` to filter
     the extensions before actually loading them.
 
+    Reading the metadata of all the installed distributions is slow, therefore the
+    entry points are indexed in a file (:obj:`ENTRYPOINT_CACHE`), that is invalidated
+    when the entries in :obj:`sys.path` change (or are modified). Moreover, the
+    metadata is scanned at most once per process (see :obj:`clear_entry_point_cache`).
 
     .. _setuptools: https://setuptools.pypa.io/en/latest/userguide/entry_point.html
     """  # noqa
+    if group not in _entry_points_memo:
+        _entry_points_memo[group] = _load_entry_point_index(group)
+    return (EntryPoint(name, value, group) for name, value in _entry_points_memo[group])
+
+
+_EntryPointIndex = List[Tuple[str, str]]
+_entry_points_memo: Dict[str, _EntryPointIndex] = {}
+
+
+def clear_entry_point_cache(persistent: bool = False):
+    """Force the entry points to be scanned again (in the next call to
+    :obj:`iterate_entry_points`). When ``persistent`` is ``True``, the index file
+    is also removed.
+    """
+    _entry_points_memo.clear()
+    file = _entry_point_cache_file()
+    if persistent and file and file.exists():
+        file.unlink()
+
+
+def _entry_point_cache_file():
+    folder = info.cache_dir()
+    return folder / ENTRYPOINT_CACHE if folder else None
+
+
+def _sys_path_signature() -> list:
+    def _mtime(entry: str) -> Optional[float]:
+        try:
+            return os.stat(entry or ".").st_mtime
+        except OSError:
+            return None
+
+    return [sys.executable, [[entry, _mtime(entry)] for entry in sys.path]]
+    # ^  lists instead of tuples, so it can be directly compared after JSON parsing
+
+
+def _load_entry_point_index(group: str) -> _EntryPointIndex:
+    file = _entry_point_cache_file()
+    signature = _sys_path_signature()
+    cache: dict = {}
+    try:
+        if file and file.exists():
+            cache = json.loads(file.read_text(encoding="utf-8"))
+            if cache.get("signature") == signature and group in cache["groups"]:
+                return [(name, value) for name, value in cache["groups"][group]]
+    except Exception:
+        logger.debug("Ignoring invalid entry point cache %s", file, exc_info=True)
+
+    index = [(e.name, e.value) for e in _scan_entry_points(group)]
+    if file:
+        groups = cache.get("groups", {}) if cache.get("signature") == signature else {}
+        content = {"signature": signature, "groups": {**groups, group: index}}
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = file.with_name(f"{file.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(content), encoding="utf-8")
+            os.replace(str(tmp), str(file))  # atomic, in the case of concurrent runs
+        except OSError:
+            msg = "Impossible to write entry point cache %s"
+            logger.debug(msg, file, exc_info=True)
+    return index
+
+
+def _scan_entry_points(group: str) -> Iterable[EntryPoint]:
     entries = entry_points()
     if hasattr(entries, "select"):
         # The select method was introduced in importlib_metadata 3.9 (and Python 3.10)
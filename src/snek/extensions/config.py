@@ -3,8 +3,6 @@ import argparse
 from pathlib import Path
 from typing import TYPE_CHECKING, List
 
-from configupdater import ConfigUpdater
-
 from .. import api, info, operations, templates
 from . import Extension, store_with
 
@@ -54,6 +52,8 @@ class Config(Extension):
 
 def save(struct: "Structure", opts: "ScaffoldOpts") -> "ActionParams":
     """Save the given opts as preferences in a snek's config file."""
+    from configupdater import ConfigUpdater
+
     config = ConfigUpdater()
 
     if not opts.get("save_config"):
@@ -0,0 +1,259 @@
+"""
+Extension that keeps a manifest of the files generated by snek, so updates can be
+incremental and refresh the files the user never touched.
+"""
+
+import hashlib
+import json
+from functools import wraps
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+from .. import file_system as fs
+from .. import structure
+from ..actions import Action, ActionParams, ScaffoldOpts, Structure
+from ..identification import get_id
+from ..log import logger
+from ..operations import FileContents, FileOp, create
+from ..structure import AbstractContent, Leaf
+from . import Extension
+
+MANIFEST_FILE = ".snek-manifest.json"
+"""Name of the manifest file, in the root of the project"""
+
+IGNORED_OPTIONS = {
+    "archive",
+    "archive_git",
+    "command",
+    "config_files",
+    "diff",
+    "force",
+    "func",
+    "jobs",
+    "log_events",
+    "log_level",
+    "native_git",
+    "pretend",
+    "profile",
+    "project_path",
+    "save_config",
+    "skip_unchanged",
+    "update",
+}
+"""Options that control how snek runs, but do not influence the generated files.
+They are not part of the fingerprint of the template inputs (neither are the options
+whose names start with ``_``).
+"""
+
+_TRACKER = "_manifest_tracker"
+
+
+class Manifest(Extension):
+    """Keep a manifest of the generated files (path, template, inputs and hash),
+    so later updates only re-render templates whose inputs changed and safely
+    refresh generated files that were never modified
+    """
+
+    def activate(self, actions: List[Action]) -> List[Action]:
+        """Activate extension, see :obj:`~snek.extension.Extension.activate`."""
+        target = get_id(structure.create_structure)
+        actions = [track_files(a) if get_id(a) == target else a for a in actions]
+        return self.register(actions, save_manifest, after="create_structure")
+
+
+def track_files(create_structure: Action) -> Action:
+    """Wrap the ``create_structure`` action, so files whose template and inputs did
+    not change since the last run are not rendered again, and pristine generated
+    files (i.e. not modified since written by snek) are refreshed even when their
+    file ops would not overwrite them.
+
+    The leaves are only wrapped for the duration of ``create_structure``, so the
+    other actions always see the original structure. The wrapper keeps the
+    identifier of ``create_structure`` (see :obj:`~snek.identification.get_id`),
+    so extensions can still register actions relative to it.
+    """
+
+    @wraps(create_structure)
+    def _create_tracked_structure(
+        struct: Structure, opts: ScaffoldOpts
+    ) -> ActionParams:
+        project = Path(opts.get("project_path", "."))
+        tracker = _Tracker(read_manifest(project) if opts.get("update") else {})
+        tracked = _wrap(struct, tracker, project, Path())
+        changed, opts = cast(ActionParams, create_structure(tracked, opts))
+        return changed, {**opts, _TRACKER: tracker}
+
+    return _create_tracked_structure
+
+
+def save_manifest(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
+    """Write the manifest file, including it in the structure of changed files"""
+    tracker: Optional[_Tracker] = opts.get(_TRACKER)
+    if tracker is None:
+        return struct, opts
+
+    opts = {k: v for k, v in opts.items() if k != _TRACKER}
+    from .. import __version__
+
+    manifest = {"version": __version__, "files": dict(sorted(tracker.entries.items()))}
+    content = json.dumps(manifest, indent=2) + "\n"
+    path = Path(opts.get("project_path", "."), MANIFEST_FILE)
+    if create(path, content, opts):
+        struct = structure.merge(struct, {MANIFEST_FILE: content})
+    return struct, opts
+
+
+def read_manifest(project_path: fs.PathLike) -> Dict[str, dict]:
+    """Entries of the existing manifest, indexed by (POSIX) path relative to the
+    project (empty if the manifest does not exist)
+    """
+    file = Path(project_path, MANIFEST_FILE)
+    try:
+        return json.loads(fs.backend().read_text(file, encoding="utf-8"))["files"]
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        logger.warning(f"Ignoring invalid manifest: {file}")
+        return {}
+
+
+def template_id(content: AbstractContent) -> str:
+    """Identify the *recipe* used to render a file"""
+    if isinstance(content, Template):
+        return f"template:{_hash(content.template)[:16]}"
+    if callable(content):
+        module = getattr(content, "__module__", None) or type(content).__module__
+        name = getattr(content, "__qualname__", None) or type(content).__qualname__
+        return f"{module}:{name}"
+    return "literal"
+
+
+def fingerprint(content: AbstractContent, opts: ScaffoldOpts) -> str:
+    """Hash of everything that influences the rendering of ``content``.
+
+    For :obj:`string.Template` objects, only the placeholders used in the template
+    are considered. Functions might use any option, so all of them are considered
+    (except for :obj:`IGNORED_OPTIONS`).
+    """
+    if isinstance(content, Template):
+        names = set()
+        for match in type(content).pattern.finditer(content.template):
+            names.add(match.group("named") or match.group("braced"))
+        inputs: Any = {k: _jsonable(opts.get(k)) for k in sorted(names - {None})}
+    elif callable(content):
+        options = ((k, v) for k, v in opts.items() if k not in IGNORED_OPTIONS)
+        inputs = {k: _jsonable(v) for k, v in sorted(options) if k[0] != "_"}
+    else:
+        inputs = content
+    return _hash(json.dumps(inputs, sort_keys=True, default=str))
+
+
+class _Tracker:
+    """Compare the structure with the previous manifest and collect the new entries"""
+
+    def __init__(self, previous: Dict[str, dict]):
+        self.previous = previous
+        self.entries: Dict[str, dict] = {}
+
+    def is_pristine(self, name: str, path: Path) -> bool:
+        """The file was written by snek and not modified since then"""
+        entry = self.previous.get(name)
+        return entry is not None and entry.get("hash") == _file_hash(path)
+
+    def record(self, name: str, template: str, inputs: str, content: FileContents):
+        self.entries[name] = {"template": template, "inputs": inputs}
+        self.entries[name]["hash"] = _hash(content or "")
+
+    def keep(self, name: str):
+        if name in self.previous:
+            self.entries[name] = self.previous[name]
+
+
+def _wrap(struct: Structure, tracker: _Tracker, project: Path, rel: Path) -> Structure:
+    return {
+        name: _wrap(node, tracker, project, rel / name)
+        if isinstance(node, dict)
+        else _wrap_leaf(node, tracker, project / rel / name, (rel / name).as_posix())
+        for name, node in struct.items()
+    }
+
+
+def _wrap_leaf(leaf: Leaf, tracker: _Tracker, path: Path, name: str) -> Leaf:
+    content, file_op = structure.resolve_leaf(leaf)
+    if content is None:
+        return leaf  # e.g. files being removed are not tracked
+
+    tracked = _TrackedLeaf(tracker, name, path, content, file_op)
+    return (tracked.content, tracked.file_op)
+
+
+class _TrackedLeaf:
+    """Content and file op of a leaf, sharing what was decided when rendering it"""
+
+    def __init__(
+        self,
+        tracker: _Tracker,
+        name: str,
+        path: Path,
+        content: AbstractContent,
+        file_op: FileOp,
+    ):
+        self.tracker = tracker
+        self.name = name
+        self.path = path
+        self._content = content
+        self._file_op = file_op
+        self.skipped = False
+        self.inputs: Tuple[str, str] = (template_id(content), "")
+
+    def content(self, opts: ScaffoldOpts) -> FileContents:
+        self.inputs = (self.inputs[0], fingerprint(self._content, opts))
+        previous = self.tracker.previous.get(self.name, {})
+        unchanged = (previous.get("template"), previous.get("inputs")) == self.inputs
+        if unchanged and self.tracker.is_pristine(self.name, self.path):
+            self.skipped = True
+            return None  # nothing changed since the last time: no need to render
+
+        return structure.reify_content(self._content, opts)
+
+    def file_op(self, path: Path, contents: FileContents, opts: ScaffoldOpts):
+        if self.skipped:
+            logger.report("unchanged", path)
+            self.tracker.keep(self.name)
+            return None
+
+        op = self._file_op
+        if opts.get("update") and self.tracker.is_pristine(self.name, path):
+            op = create  # refresh files that were generated but never modified
+
+        written = op(path, contents, opts)
+        if written or _file_hash(path) == _hash(contents or ""):
+            self.tracker.record(self.name, *self.inputs, contents)
+        else:
+            self.tracker.keep(self.name)
+        return written
+
+
+def _jsonable(value):
+    if isinstance(value, Extension):
+        return value.name
+    if isinstance(value, (list, tuple, set)):
+        items = [_jsonable(v) for v in value]
+        return sorted(items, key=str) if isinstance(value, set) else items
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _file_hash(path: Path) -> Optional[str]:
+    try:
+        return _hash(fs.backend().read_text(path, encoding="utf-8"))
+    except (OSError, UnicodeDecodeError):
+        return None
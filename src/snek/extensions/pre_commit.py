@@ -7,9 +7,8 @@ from functools import partial
 from typing import List
 
 from .. import shell, structure
-from ..actions import Action, ActionParams, ScaffoldOpts, Structure
+from ..actions import Action, ActionParams, ScaffoldOpts, Structure, declare
 from ..exceptions import ShellCommandException
-from ..file_system import chdir
 from ..log import logger
 from ..operations import FileOp, no_overwrite
 from ..structure import AbstractContent, ResolvedLeaf
@@ -109,6 +108,11 @@ def find_executable(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
     return struct, opts
 
 
+@declare(
+    reads={"git", "venv", "opts.project_path", "opts.venv", "opts.pretend"}
+    | {f"opts.{CMD_OPT}"},
+    writes={"git"},
+)
 def install(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
     """Attempts to install pre-commit in the project"""
     project_path = opts.get("project_path", "PROJECT_DIR")
@@ -116,8 +120,8 @@ def install(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
     # ^  try again after venv, maybe it was installed
     if pre_commit:
         try:
-            with chdir(opts.get("project_path", "."), **opts):
-                pre_commit("install", pretend=opts.get("pretend"))
+            cwd = str(opts.get("project_path", "."))
+            pre_commit("install", cwd=cwd, pretend=opts.get("pretend"))
             logger.warning(SUCCESS_MSG)
             return struct, opts
         except ShellCommandException:
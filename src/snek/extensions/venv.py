@@ -1,20 +1,35 @@
 """Create a virtual environment for the project"""
 import argparse
+import errno
+import hashlib
+import json
+import os
+import shutil
+import sys
+import sysconfig
+import tempfile
 from contextlib import suppress
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
 from .. import dependencies as deps
-from ..actions import Action, ActionParams, ScaffoldOpts, Structure
-from ..file_system import PathLike, chdir
+from .. import info
+from ..actions import Action, ActionParams, ScaffoldOpts, Structure, declare
+from ..file_system import PathLike, rm_rf, write_atomically
 from ..identification import get_id
 from ..log import logger
-from ..shell import get_command, get_executable
+from ..shell import IS_POSIX, ShellCommand, get_command, get_executable
 from . import Extension, store_with
 
 DEFAULT: PathLike = ".venv"
 """Default directory name for collocated virtual environment that will be created"""
 
+CACHE_MARKER = ".snek-venv-cache.json"
+"""File stored inside of each cached venv, recording how it was built"""
+
+LOCKS_DIR = "snek-locks"
+"""Directory inside of the wheelhouse where the resolved package sets are recorded"""
+
 
 class Venv(Extension):
     """\
@@ -55,6 +70,27 @@ class Venv(Extension):
             "`requirements.txt` file, but remember to use quotes to avoid messing with "
             "the terminal",
         )
+        parser.add_argument(
+            "--venv-cache",
+            action=store_with(self),
+            nargs="?",
+            const=True,
+            default=argparse.SUPPRESS,
+            metavar="DIR",
+            help="clone the venv from a cache of prebuilt environments (one per "
+            "interpreter and set of `--venv-install` packages) instead of building it "
+            "from scratch. DIR defaults to a `venvs` folder in snek's cache directory",
+        )
+        parser.add_argument(
+            "--venv-wheelhouse",
+            action=store_with(self),
+            default=argparse.SUPPRESS,
+            type=Path,
+            metavar="DIR",
+            help="install the `--venv-install` packages exclusively from the wheels "
+            "in DIR, without accessing the network. The resolved versions are recorded "
+            "in DIR, so later installations of the same packages skip the resolution",
+        )
         return self
 
     def activate(self, actions: List[Action]) -> List[Action]:
@@ -64,28 +100,45 @@ class Venv(Extension):
         return self.register(actions, instruct_user, before="report_done")
 
 
+_OPTIONS = {"opts.project_path", "opts.venv", "opts.venv_install", "opts.pretend"}
+
+
+@declare(
+    reads=_OPTIONS | {"opts.venv_cache", "opts.venv_wheelhouse"},
+    writes={"venv", "opts.venv_install", "opts._venv_from_cache"},
+)
 def run(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
     """Action that will create a virtualenv for the project"""
 
-    project_path = opts["project_path"]
-    venv_path = Path(opts.get("venv", DEFAULT))
+    venv_path = Path(opts["project_path"], opts.get("venv", DEFAULT))
+    # ^  no `chdir`, so this action can run concurrently with others
+    opts = _fix_opts(opts)
 
-    with chdir(project_path, **opts):
-        if venv_path.is_dir():
-            logger.report("skip", venv_path)
-            return struct, _fix_opts(opts)
+    if venv_path.is_dir():
+        logger.report("skip", venv_path)
+        return struct, opts
 
-        create(venv_path, opts.get("pretend"))
+    cache = get_cache_path(opts)
+    if cache:
+        packages = opts.get("venv_install") or []
+        wheelhouse, pretend = opts.get("venv_wheelhouse"), opts.get("pretend")
+        create_from_cache(venv_path, cache, packages, pretend, wheelhouse)
+        return struct, {**opts, "_venv_from_cache": True}
 
-    return struct, _fix_opts(opts)
+    create(venv_path, opts.get("pretend"))
+    return struct, opts
 
 
+@declare(
+    reads=_OPTIONS | {"venv", "opts._venv_from_cache", "opts.venv_wheelhouse"},
+    writes={"venv"},
+)
 def install_packages(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
     """Install the specified packages inside the created venv."""
 
     packages = opts.get("venv_install")
-    if not packages:
-        return struct, opts
+    if not packages or opts.get("_venv_from_cache"):
+        return struct, opts  # cached venvs already contain the packages
 
     pretend = opts.get("pretend")
     venv_path = get_path(opts)
@@ -94,12 +147,56 @@ def install_packages(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
         pip = get_command("pip", venv_path, include_path=False)
         if not pip:
             raise NotInstalled(f"pip cannot be found inside {venv_path}")
-        pip("install", "-U", *deps.deduplicate(packages))
+        pip_install(pip, packages, opts.get("venv_wheelhouse"))
 
     logger.report("run", f"pip install -U {' '.join(packages)} [{venv_path}]")
     return struct, opts
 
 
+def pip_install(
+    pip: ShellCommand, packages: Sequence[str], wheelhouse: Optional[PathLike] = None
+):
+    """Install ``packages`` with the given ``pip`` command.
+
+    When a ``wheelhouse`` directory is given, the index is never accessed: all the
+    packages have to be available as wheels (or sdists) inside of it.
+    The first installation of a set of packages records the resolved versions
+    (``pip freeze``) in a lock file inside of :obj:`LOCKS_DIR`, so the following
+    installations of the same set just install the pinned files without resolving
+    the dependencies again.
+    """
+    packages = deps.deduplicate(packages)
+    if not wheelhouse:
+        pip("install", "-U", *packages)
+        return
+
+    offline = ("--no-index", "--find-links", str(wheelhouse))
+    lock = lock_file(wheelhouse, packages)
+    if lock.exists():
+        pip("install", *offline, "--no-deps", "-r", str(lock))
+        return
+
+    pip("install", *offline, *packages)
+    try:
+        lock.parent.mkdir(parents=True, exist_ok=True)
+        write_atomically(lock, "".join(f"{line}\n" for line in pip("freeze")))
+        logger.report("create", lock)
+    except OSError as ex:  # e.g. read-only wheelhouse
+        logger.warning(f"Could not record the resolved packages in {lock}: {ex}")
+
+
+def lock_file(wheelhouse: PathLike, packages: Sequence[str]) -> Path:
+    """Lock file that records the resolution of ``packages`` from ``wheelhouse`` for
+    the running interpreter and platform.
+    """
+    impl = sys.implementation.name
+    tag = f"{impl}{sys.version_info[0]}{sys.version_info[1]}-{sysconfig.get_platform()}"
+    key = json.dumps(sorted(deps.deduplicate(packages)))
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return Path(wheelhouse, LOCKS_DIR, f"{tag}-{digest}.txt")
+
+
+@declare(reads=_OPTIONS | {"venv"})
 def instruct_user(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
     """Simply display a message reminding the user to activate the venv."""
 
@@ -109,10 +206,9 @@ def instruct_user(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
         return struct, opts
 
     project = Path(opts["project_path"]).resolve()
-    with chdir(project, **opts):
-        venv_path = Path(venv)
-        python_exe = get_executable("python", venv_path, include_path=False)
-        pip_exe = get_executable("pip", venv_path, include_path=False)
+    venv_path = Path(venv)
+    python_exe = get_executable("python", project / venv_path, include_path=False)
+    pip_exe = get_executable("pip", project / venv_path, include_path=False)
 
     if python_exe and pip_exe:
         python = Path(python_exe).relative_to(project)
@@ -129,8 +225,7 @@ def instruct_user(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
 
 def get_path(opts: ScaffoldOpts, default=DEFAULT) -> Path:
     """Get the path to the venv that will be created."""
-    with chdir(opts.get("project_path", "."), **opts):
-        return Path(opts.get("venv", default)).resolve()
+    return Path(opts.get("project_path", "."), opts.get("venv", default)).resolve()
 
 
 def create_with_virtualenv(path: Path, pretend=False):
@@ -170,6 +265,139 @@ def create(path: Path, pretend=False):
         raise NotInstalled()
 
 
+def get_cache_path(opts: ScaffoldOpts) -> Optional[Path]:
+    """Directory where cached venvs are stored (``None`` if caching is disabled).
+
+    Caching is only supported in POSIX systems, since on Windows the launchers of the
+    console scripts have the path of the venv embedded in binary form.
+    """
+    cache = opts.get("venv_cache")
+    if not cache or not IS_POSIX:
+        return None
+    if cache is True:
+        root = info.cache_dir()
+        return root / "venvs" if root else None
+    return Path(cache)
+
+
+def cache_key(
+    packages: Sequence[str] = (), wheelhouse: Optional[PathLike] = None
+) -> str:
+    """Identify a cached venv by the interpreter and the packages installed on it"""
+    interpreter = [sys.executable, sys.version, *_available_creators()]
+    source = wheelhouse and str(Path(wheelhouse).resolve())
+    key = json.dumps([interpreter, sorted(deps.deduplicate(packages)), source])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def create_from_cache(
+    path: Path,
+    cache: Path,
+    packages: Sequence[str] = (),
+    pretend=False,
+    wheelhouse: Optional[PathLike] = None,
+) -> Path:
+    """Materialise a venv in ``path`` by cloning a prebuilt one from ``cache``
+    (which is built first if necessary, including the given ``packages``,
+    see :obj:`pip_install` for ``wheelhouse``).
+
+    Files are hardlinked when possible, except for the ones that contain the
+    location of the venv (e.g. scripts in the ``bin`` directory), which are copied
+    and relocated.
+    """
+    cached = cache / cache_key(packages, wheelhouse)
+    if pretend:
+        logger.report("clone", path, context=cached)
+        return cached
+
+    if not (cached / CACHE_MARKER).exists():
+        build_cache(cached, packages, wheelhouse)
+
+    prefix = json.loads((cached / CACHE_MARKER).read_text(encoding="utf-8"))["prefix"]
+    _clone(cached, path.resolve(), prefix)
+    logger.report("clone", path, context=cached)
+    return cached
+
+
+def build_cache(
+    cached: Path, packages: Sequence[str] = (), wheelhouse: Optional[PathLike] = None
+):
+    """Build a venv to be stored in the cache (in a temporary directory that is
+    renamed at the end, so a half-built venv is never used).
+    """
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    building = Path(tempfile.mkdtemp(prefix=".building-", dir=cached.parent)).resolve()
+    try:
+        prefix = building / "venv"
+        create(prefix)
+        if packages:
+            pip = get_command("pip", prefix, include_path=False)
+            if not pip:
+                raise NotInstalled(f"pip cannot be found inside {prefix}")
+            pip_install(pip, packages, wheelhouse)
+            logger.report("run", f"pip install -U {' '.join(packages)} [{prefix}]")
+        marker = {"prefix": str(prefix), "packages": list(packages)}
+        (prefix / CACHE_MARKER).write_text(json.dumps(marker), encoding="utf-8")
+        try:
+            os.rename(prefix, cached)
+        except OSError as ex:
+            # another process might have cached the same venv concurrently
+            if not isinstance(ex, FileExistsError) and ex.errno != errno.ENOTEMPTY:
+                raise
+    finally:
+        rm_rf(building)
+
+
+def _available_creators() -> List[str]:
+    try:
+        import virtualenv
+
+        return ["virtualenv", getattr(virtualenv, "__version__", "")]
+    except ImportError:
+        return ["venv"]
+
+
+def _clone(source: Path, target: Path, prefix: str):
+    """Copy the venv in ``source`` to ``target`` replacing ``prefix`` in the scripts
+    and configuration files (and hardlinking all the other files).
+    """
+    old, new = prefix.encode(), str(target).encode()
+    for root, dirs, files in os.walk(source):
+        rel = Path(root).relative_to(source)
+        dest = target / rel
+        dest.mkdir(parents=True, exist_ok=True)
+        for name in dirs:
+            if (Path(root) / name).is_symlink():
+                os.symlink(os.readlink(Path(root, name)), dest / name)
+        for name in files:
+            if rel == Path() and name == CACHE_MARKER:
+                continue
+            _clone_file(Path(root, name), dest / name, old, new, relocate=_in_bin(rel))
+
+
+def _in_bin(rel: Path) -> bool:
+    return rel == Path() or rel.parts[0] in ("bin", "Scripts")
+
+
+def _clone_file(src: Path, dest: Path, old: bytes, new: bytes, relocate: bool):
+    if src.is_symlink():
+        link = os.readlink(src)
+        os.symlink(link.replace(old.decode(), new.decode()), dest)
+        return
+
+    if relocate:
+        content = src.read_bytes()
+        if old in content and b"\0" not in content:
+            dest.write_bytes(content.replace(old, new))
+            shutil.copymode(src, dest)
+            return
+
+    try:
+        os.link(src, dest)
+    except OSError:  # e.g. cache and project in different file systems
+        shutil.copy2(src, dest)
+
+
 class NotInstalled(ImportError):
     """Neither virtualenv or venv are installed in the computer. Please check the
     following alternatives:
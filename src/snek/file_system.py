@@ -11,18 +11,293 @@ import errno
 import os
 import shutil
 import stat
+import threading
 from contextlib import contextmanager
-from functools import partial
+from contextvars import ContextVar
 from pathlib import Path
 from tempfile import mkstemp
-from typing import Callable, Optional, Union
+from typing import Dict, Iterator, List, Optional, Set, Union
 
+from . import profiling
 from .log import logger
 from .shell import IS_WINDOWS
 
 PathLike = Union[str, os.PathLike]
 
 
+# -------- Backends --------
+
+
+class FileSystem:
+    """Backend used by the functions in this module (and by the
+    :obj:`file operations <snek.operations>`) to access the files of the project.
+
+    This default implementation works directly on the disk. Other backends (e.g.
+    :obj:`MemoryFileSystem`) can be activated with :obj:`use_backend`.
+    """
+
+    on_disk = True
+    """The files are written to the disk, so they can be used by external commands
+    (e.g. ``git``)
+    """
+
+    def exists(self, path: Path) -> bool:
+        return path.exists()
+
+    def is_dir(self, path: Path) -> bool:
+        return path.is_dir()
+
+    def is_file(self, path: Path) -> bool:
+        return path.is_file()
+
+    def mode(self, path: Path) -> int:
+        """Equivalent to ``path.stat().st_mode``"""
+        return path.stat().st_mode
+
+    def size(self, path: Path) -> int:
+        """Equivalent to ``path.stat().st_size``"""
+        return path.stat().st_size
+
+    def read_bytes(self, path: Path) -> bytes:
+        return path.read_bytes()
+
+    def read_text(self, path: Path, encoding="utf-8") -> str:
+        return path.read_text(encoding=encoding)
+
+    def write_bytes(self, path: Path, content: bytes):
+        path.write_bytes(content)
+
+    def write_text(self, path: Path, content: str, encoding="utf-8"):
+        path.write_text(content, encoding=encoding)
+
+    def write_atomically(self, path: Path, content: str, encoding="utf-8"):
+        """Equivalent to :obj:`write_text`, but the file is replaced in a single step
+        (via a temporary file in the same directory). The permissions of an existing
+        file are preserved.
+        """
+        fd, tmp = mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding=encoding) as file:
+                file.write(content)
+            if path.exists():
+                shutil.copymode(str(path), tmp)
+            else:
+                os.chmod(tmp, 0o666 & ~_umask())  # same as a file created via `open`
+            os.replace(tmp, str(path))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def mkdir(self, path: Path):
+        """Create a directory and its parents (if they don't exist yet)"""
+        path.mkdir(parents=True, exist_ok=True)
+
+    def chmod(self, path: Path, mode: int):
+        path.chmod(mode)
+
+    def remove(self, path: Path):
+        """Remove a file or a directory (with all its contents)"""
+        if path.is_dir():
+            shutil.rmtree(path, onerror=on_ro_error)
+        else:
+            path.unlink()
+
+
+DISK = FileSystem()
+"""Default backend (see :obj:`FileSystem`)"""
+
+_BACKEND: ContextVar[FileSystem] = ContextVar("file_system", default=DISK)
+
+
+def backend() -> FileSystem:
+    """Backend currently in use (in this thread or :mod:`asyncio` task)"""
+    return _BACKEND.get()
+
+
+@contextmanager
+def use_backend(filesystem: FileSystem) -> Iterator[FileSystem]:
+    """Context manager that activates a different :obj:`FileSystem` backend.
+
+    Example:
+
+        .. code-block:: python
+
+            with use_backend(MemoryFileSystem()) as memory:
+                create_structure({"README.md": "# Project"}, {"project_path": "proj"})
+
+            memory.flush()  # write everything to the disk at once
+
+    Note:
+        Only the files generated by snek go through the backend. Actions that
+        run external commands (e.g. ``git`` or the creation of virtual environments)
+        need the files on the disk, so the default ones are skipped when the backend
+        is not :obj:`~FileSystem.on_disk` (see :obj:`snek.actions.init_git`).
+    """
+    token = _BACKEND.set(filesystem)
+    try:
+        yield filesystem
+    finally:
+        _BACKEND.reset(token)
+
+
+class MemoryFileSystem(FileSystem):
+    """:obj:`FileSystem` backend that keeps all the changes in memory, so they can be
+    later written to the disk (or another backend) in a single batch via
+    :obj:`flush`.
+
+    Args:
+        fallback: backend used to read the files not touched in memory (e.g.
+            :obj:`DISK`, to preview updates of existing projects). By default,
+            the memory starts empty.
+
+    Paths are considered relative to the working directory at the moment each
+    operation is performed.
+    """
+
+    on_disk = False
+
+    def __init__(self, fallback: Optional[FileSystem] = None):
+        self.fallback = fallback
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        self.files: Dict[Path, bytes] = {}
+        self.dirs: Set[Path] = set()
+        self.modes: Dict[Path, int] = {}
+        self.removed: Set[Path] = set()  # hide the files in the fallback
+
+    def exists(self, path: Path) -> bool:
+        return self.is_file(path) or self.is_dir(path)
+
+    def is_dir(self, path: Path) -> bool:
+        key = _key(path)
+        if key in self.dirs or not key.parents:  # the root always exists
+            return True
+        return key not in self.files and self._fallback(key, "is_dir")
+
+    def is_file(self, path: Path) -> bool:
+        key = _key(path)
+        if key in self.files:
+            return True
+        return key not in self.dirs and self._fallback(key, "is_file")
+
+    def mode(self, path: Path) -> int:
+        key = _key(path)
+        if key in self.modes:
+            return self.modes[key]
+        if key in self.files:
+            return stat.S_IFREG | (0o666 & ~_umask())  # same as created via `open`
+        if key in self.dirs:
+            return stat.S_IFDIR | (0o777 & ~_umask())
+        return self._fallback(key, "mode", missing=_not_found(path))
+
+    def size(self, path: Path) -> int:
+        return len(self.read_bytes(path))
+
+    def read_bytes(self, path: Path) -> bytes:
+        key = _key(path)
+        if key in self.files:
+            return self.files[key]
+        if key in self.dirs:
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), str(path))
+        return self._fallback(key, "read_bytes", missing=_not_found(path))
+
+    def read_text(self, path: Path, encoding="utf-8") -> str:
+        text = self.read_bytes(path).decode(encoding)
+        return text.replace("\r\n", "\n").replace("\r", "\n")  # universal newlines
+
+    def write_bytes(self, path: Path, content: bytes):
+        key = _key(path)
+        with self._lock:
+            if not self.is_dir(key.parent):
+                raise _not_found(path)
+            if key in self.dirs:
+                raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+            self.files[key] = content
+
+    def write_text(self, path: Path, content: str, encoding="utf-8"):
+        # text mode translates newlines when writing
+        self.write_bytes(path, content.replace("\n", os.linesep).encode(encoding))
+
+    def write_atomically(self, path: Path, content: str, encoding="utf-8"):
+        # changes in memory are never seen half-written
+        self.write_text(path, content, encoding=encoding)
+
+    def mkdir(self, path: Path):
+        key = _key(path)
+        with self._lock:
+            if self.is_file(key):
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), path)
+            for directory in (key, *key.parents):
+                if self.is_dir(directory):
+                    break
+                self.dirs.add(directory)
+
+    def chmod(self, path: Path, mode: int):
+        key = _key(path)
+        with self._lock:
+            file_type = stat.S_IFMT(self.mode(key))
+            self.modes[key] = file_type | stat.S_IMODE(mode)
+
+    def remove(self, path: Path):
+        key = _key(path)
+        with self._lock:
+            if not self.exists(key):
+                raise _not_found(path)
+            for collection in (self.files, self.modes):
+                for entry in [p for p in collection if _is_within(p, key)]:
+                    del collection[entry]
+            self.dirs -= {p for p in self.dirs if _is_within(p, key)}
+            self.removed -= {p for p in self.removed if _is_within(p, key)}
+            if self._fallback(key, "exists"):
+                self.removed.add(key)
+
+    def flush(self, target: FileSystem = DISK) -> List[Path]:
+        """Apply all the changes kept in memory to the ``target`` backend (by
+        default the disk) and clear the memory.
+
+        Returns:
+            Paths of the files written
+        """
+        with self._lock:
+            for path in sorted(self.removed):
+                if target.exists(path):
+                    target.remove(path)
+            for path in sorted(self.dirs):
+                target.mkdir(path)
+            written = sorted(self.files)
+            for path in written:
+                target.write_bytes(path, self.files[path])
+            for path, mode in self.modes.items():
+                target.chmod(path, stat.S_IMODE(mode))
+            self._clear()
+        return written
+
+    def _fallback(self, key: Path, method: str, missing=False):
+        hidden = any(_is_within(key, removed) for removed in self.removed)
+        if self.fallback is None or hidden:
+            if isinstance(missing, BaseException):
+                raise missing
+            return missing
+        return getattr(self.fallback, method)(key)
+
+
+def _key(path: PathLike) -> Path:
+    return Path(os.path.abspath(path))
+
+
+def _is_within(path: Path, parent: Path) -> bool:
+    return path == parent or parent in path.parents
+
+
+def _not_found(path: PathLike) -> FileNotFoundError:
+    return FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), str(path))
+
+
+# -------- Functions --------
+
+
 @contextmanager
 def tmpfile(**kwargs):
     """Context manager that yields a temporary :obj:`Path`"""
@@ -83,7 +358,13 @@ def move(*src: PathLike, target: PathLike, **kwargs):
         logger.report("move", path, target=target)
 
 
-def create_file(path: PathLike, content: str, pretend=False, encoding="utf-8"):
+def create_file(
+    path: PathLike,
+    content: str,
+    pretend=False,
+    encoding="utf-8",
+    skip_unchanged=False,
+) -> Optional[Path]:
     """Create a file in the given path.
 
     This function reports the operation in the logs.
@@ -93,18 +374,68 @@ def create_file(path: PathLike, content: str, pretend=False, encoding="utf-8"):
         content: what will be written.
         pretend (bool): false by default. File is not written when pretending,
             but operation is logged.
+        skip_unchanged (bool): false by default. When true, an existing file whose
+            contents are byte-identical to ``content`` is not written again
+            (preserving its modification time).
 
     Returns:
-        Path: given path
+        Path: given path (or ``None`` if the file was skipped because unchanged)
     """
     path = Path(path)
+    if skip_unchanged and is_unchanged(path, content, encoding):
+        logger.report("unchanged", path)
+        return None
+
     if not pretend:
-        path.write_text(content, encoding=encoding)
+        backend().write_text(path, content, encoding=encoding)
+        profiling.count("files_written")
 
     logger.report("create", path)
     return path
 
 
+def write_atomically(path: PathLike, content: str, encoding="utf-8") -> Path:
+    """Replace the contents of a file in a single step, so an interrupted run never
+    leaves it half-written (see :obj:`FileSystem.write_atomically`).
+    """
+    path = Path(path)
+    backend().write_atomically(path, content, encoding=encoding)
+    return path
+
+
+def _read_umask() -> int:
+    current = os.umask(0)
+    os.umask(current)
+    return current
+
+
+_UMASK = _read_umask()
+"""The umask can only be read by changing it, which is not safe when other threads
+might be creating files, so it is read once (when this module is imported)
+"""
+
+
+def _umask() -> int:
+    return _UMASK
+
+
+def is_unchanged(path: PathLike, content: str, encoding="utf-8") -> bool:
+    """Check if the file in the given path already contains exactly ``content``.
+
+    The (cheaper) comparison of file sizes is done first, so only files with the
+    same size are read.
+    """
+    expected = content.replace("\n", os.linesep).encode(encoding)
+    # ^  text mode translates newlines when writing
+    filesystem = backend()
+    try:
+        if filesystem.size(Path(path)) != len(expected):
+            return False
+        return filesystem.read_bytes(Path(path)) == expected
+    except OSError:
+        return False
+
+
 def create_directory(path: PathLike, update=False, pretend=False) -> Optional[Path]:
     """Create a directory in the given path.
 
@@ -118,13 +449,13 @@ def create_directory(path: PathLike, update=False, pretend=False) -> Optional[Pa
             pretending, but operation is logged.
     """
     path = Path(path)
-    if path.is_dir() and update:
+    if update and backend().is_dir(path):
         logger.report("skip", path)
         return None
 
     if not pretend:
         try:
-            path.mkdir(parents=True, exist_ok=True)
+            backend().mkdir(path)
         except OSError:
             if not update:
                 raise
@@ -150,7 +481,7 @@ def chmod(path: PathLike, mode: int, pretend=False) -> Path:
     mode = stat.S_IMODE(mode)
 
     if not pretend:
-        path.chmod(mode)
+        backend().chmod(path, mode)
 
     logger.report(f"chmod {mode:03o}", path)
     return path
@@ -283,16 +614,11 @@ def on_ro_error(func, path, exc_info):
 def rm_rf(path: PathLike, pretend=False):
     """Remove ``path`` by all means like ``rm -rf`` in Linux"""
     target = Path(path)
-    if not target.exists():
+    if not backend().exists(target):
         return None
 
-    if target.is_dir():
-        remove: Callable = partial(shutil.rmtree, onerror=on_ro_error)
-    else:
-        remove = Path.unlink
-
     if not pretend:
-        remove(target)
+        backend().remove(target)
 
     logger.report("remove", target)
     return path
@@ -8,13 +8,11 @@ import os
 import socket
 import sys
 from enum import Enum
-from operator import itemgetter
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Set, cast, overload
+from typing import TYPE_CHECKING, Dict, NamedTuple, Optional, Set, Tuple, cast, overload
 
 import platformdirs
-from configupdater import ConfigUpdater
-from packaging.version import Version
 
 from . import __name__ as PKG_NAME
 from . import shell, toml
@@ -23,14 +21,19 @@ from .exceptions import (
     GitNotConfigured,
     GitNotInstalled,
     ImpossibleToFindConfigDir,
-    SnekTooOld,
     ShellCommandException,
+    SnekTooOld,
 )
-from .file_system import PathLike, chdir
+from .file_system import PathLike, backend, chdir
 from .identification import deterministic_sort, levenshtein, underscore
 from .log import logger
 from .templates import ScaffoldOpts, licenses, parse_extensions
 
+if TYPE_CHECKING:  # pragma: no cover
+    # Third-party modules are imported only when used (faster CLI)
+    from configupdater import ConfigUpdater
+    from packaging.version import Version
+
 CONFIG_FILE = "default.cfg"
 """Snek's own config file name"""
 
@@ -47,21 +50,53 @@ class GitEnv(Enum):
     committer_date = "GIT_COMMITTER_DATE"
 
 
+class GitSnapshot(NamedTuple):
+    """Facts about the git installation, see :obj:`git_snapshot`"""
+
+    installed: bool
+    config: Dict[str, str]
+    """Effective git configuration (keys in lower case, as in ``git config -l``)"""
+
+
+# ToDo: Change this to just `cache` from Python 3.9 on.
+@lru_cache(maxsize=None)
+def git_snapshot() -> GitSnapshot:
+    """Probe git only once per process, collecting all the configuration with a
+    single ``git config --list`` call (``git --version`` is only called when that
+    fails, to distinguish a missing installation from a missing configuration).
+
+    Use ``git_snapshot.cache_clear()`` to force reading the configuration again.
+    """
+    try:
+        output = "\n".join(shell.git("config", "--list", "--null"))
+    except ShellCommandException:
+        try:
+            shell.git("--version")
+        except ShellCommandException:
+            return GitSnapshot(False, {})
+        return GitSnapshot(True, {})
+
+    config: Dict[str, str] = {}
+    for entry in output.split("\0"):
+        key, _, value = entry.strip("\n").partition("\n")
+        if key:
+            config[key.lower()] = value  # last value wins, as in `git config --get`
+    return GitSnapshot(True, config)
+
+
 def username() -> str:
     """Retrieve the user's name"""
     user = os.getenv(GitEnv.author_name.value)
     if user is None:
+        user = git_snapshot().config.get("user.name", "").strip()
+    if not user:
         try:
-            user = next(shell.git("config", "--get", "user.name"))
-            user = user.strip()
-        except ShellCommandException:
-            try:
-                # On Windows the getpass commands might fail if 'USERNAME'
-                # env var is not set
-                user = getpass.getuser()
-            except Exception as ex:
-                logger.debug("Impossible to find hostname", exc_info=True)
-                raise GitNotConfigured from ex
+            # On Windows the getpass commands might fail if 'USERNAME'
+            # env var is not set
+            user = getpass.getuser()
+        except Exception as ex:
+            logger.debug("Impossible to find hostname", exc_info=True)
+            raise GitNotConfigured from ex
     return user
 
 
@@ -69,29 +104,23 @@ def email() -> str:
     """Retrieve the user's email"""
     mail = os.getenv(GitEnv.author_email.value)
     if mail is None:
+        mail = git_snapshot().config.get("user.email", "").strip()
+    if not mail:
         try:
-            mail = next(shell.git("config", "--get", "user.email"))
-            mail = mail.strip()
-        except ShellCommandException:
-            try:
-                # On Windows the getpass commands might fail
-                user = getpass.getuser()
-                host = socket.gethostname()
-                mail = f"{user}@{host}"
-            except Exception as ex:
-                logger.debug("Impossible to determine email", exc_info=True)
-                raise GitNotConfigured from ex
+            # On Windows the getpass commands might fail
+            user = getpass.getuser()
+            host = socket.gethostname()
+            mail = f"{user}@{host}"
+        except Exception as ex:
+            logger.debug("Impossible to determine email", exc_info=True)
+            raise GitNotConfigured from ex
     return mail
 
 
 def is_git_installed() -> bool:
     """Check if git is installed"""
     logger.report("check", "is git installed...")
-    try:
-        shell.git("--version")
-    except ShellCommandException:
-        return False
-    return True
+    return git_snapshot().installed
 
 
 def is_git_configured() -> bool:
@@ -106,14 +135,8 @@ def is_git_configured() -> bool:
     logger.report("check", "is git configured...")
     if os.getenv(GitEnv.author_name.value) and os.getenv(GitEnv.author_email.value):
         return True
-    else:
-        try:
-            for attr in ("name", "email"):
-                shell.git("config", "--get", f"user.{attr}")
-        except ShellCommandException:
-            return False
-        else:
-            return True
+    config = git_snapshot().config
+    return all(config.get(f"user.{attr}") for attr in ("name", "email"))
 
 
 def check_git():
@@ -229,16 +252,45 @@ def project(
 
 
 def best_fit_license(txt: Optional[str]) -> str:
-    """Finds proper license name for the license defined in txt"""
+    """Finds proper license name for the license defined in txt
+
+    Exact matches (ignoring case, dashes, underscores and terms like ``-only``) are
+    looked up in an index. Only when there is no exact match, the closest license
+    name is found by comparing the Levenshtein distances.
+    The results are memoized (the index is rebuilt when :obj:`~.templates.licenses`
+    change).
+    """
+    return _best_fit_license(txt, tuple(licenses.items()))
+
+
+@lru_cache(maxsize=256)
+def _best_fit_license(txt: Optional[str], available: Tuple[Tuple[str, str], ...]):
+    candidates = _license_index(available)
+    lic = underscore(txt or available[0][0]).replace("_", "")
+    if lic in candidates:
+        return candidates[lic]
+
+    # Candidates with similar lengths are compared first, so the distance computation
+    # can stop early for most of the others.
+    # When there is a tie, the first candidate in the index wins.
+    ranked = sorted(enumerate(candidates), key=lambda c: abs(len(c[1]) - len(lic)))
+    best = (len(lic) + max(len(k) for k in candidates), len(candidates))
+    for i, key in ranked:
+        if abs(len(key) - len(lic)) > best[0]:
+            break  # the remaining candidates are even further away
+        best = min(best, (levenshtein(lic, key, max_distance=best[0]), i))
+    return list(candidates.values())[best[1]]
+
+
+@lru_cache(maxsize=4)
+def _license_index(available: Tuple[Tuple[str, str], ...]) -> Dict[str, str]:
+    """Normalized names/aliases of the available licenses => license name"""
     corresponding = {
-        **{v.replace("license_", ""): k for k, v in licenses.items()},
-        **{_simplify_license_name(k): k for k in licenses},
-        **{k: k for k in licenses},  # last defined: possibly overwrite
+        **{v.replace("license_", ""): k for k, v in available},
+        **{_simplify_license_name(k): k for k, _ in available},
+        **{k: k for k, _ in available},  # last defined: possibly overwrite
     }
-    lic = underscore(txt or list(licenses)[0]).replace("_", "")
-    candidates = {underscore(k).replace("_", ""): v for k, v in corresponding.items()}
-    ratings = {k: levenshtein(lic.lower(), k.lower()) for k, v in candidates.items()}
-    return candidates[min(ratings.items(), key=itemgetter(1))[0]]
+    return {underscore(k).replace("_", ""): v for k, v in corresponding.items()}
 
 
 def _simplify_license_name(name: str) -> str:
@@ -247,7 +299,7 @@ def _simplify_license_name(name: str) -> str:
     return name
 
 
-def read_setupcfg(path: PathLike, filename=SETUP_CFG) -> ConfigUpdater:
+def read_setupcfg(path: PathLike, filename=SETUP_CFG) -> "ConfigUpdater":
     """Reads-in a configuration file that follows a setup.cfg format.
     Useful for retrieving stored information (e.g. during updates)
 
@@ -259,12 +311,14 @@ def read_setupcfg(path: PathLike, filename=SETUP_CFG) -> ConfigUpdater:
     Returns:
         Object that can be used to read/edit configuration parameters.
     """
+    from configupdater import ConfigUpdater
+
     path = Path(path)
-    if path.is_dir():
+    if backend().is_dir(path):
         path = path / (filename or SETUP_CFG)
 
     updater = ConfigUpdater()
-    updater.read(str(path), encoding="utf-8")
+    updater.read_string(backend().read_text(path, encoding="utf-8"), source=str(path))
 
     logger.report("read", path)
 
@@ -283,15 +337,15 @@ def read_pyproject(path: PathLike, filename=PYPROJECT_TOML) -> toml.TOMLMapping:
         Object that can be used to read/edit configuration parameters.
     """
     file = Path(path)
-    if file.is_dir():
+    if backend().is_dir(file):
         file = file / (filename or PYPROJECT_TOML)
 
-    config = toml.loads(file.read_text(encoding="utf-8"))
+    config = toml.loads(backend().read_text(file, encoding="utf-8"))
     logger.report("read", file)
     return config
 
 
-def get_curr_version(project_path: PathLike):
+def get_curr_version(project_path: PathLike) -> "Version":
     """Retrieves the Snek version that put up the scaffold
 
     Args:
@@ -300,6 +354,8 @@ def get_curr_version(project_path: PathLike):
     Returns:
         Version: version specifier
     """
+    from packaging.version import Version
+
     setupcfg = read_setupcfg(project_path).to_dict()
     return Version(str(setupcfg["snek"]["version"]))
 
@@ -348,6 +404,17 @@ def config_dir(prog=PKG_NAME, org=None, default=RAISE_EXCEPTION):
         raise ImpossibleToFindConfigDir() from ex
 
 
+def cache_dir(prog: str = PKG_NAME, org: Optional[str] = None) -> Optional[Path]:
+    """Finds the place where to store caches for the given app.
+    Since caches are optional, ``None`` is returned if that is not possible.
+    """
+    try:
+        return Path(platformdirs.user_cache_dir(prog, org))
+    except Exception as ex:
+        logger.debug("Error when finding cache dir %s", ex, exc_info=True)
+        return None
+
+
 @overload
 def config_file(
     name: str = CONFIG_FILE, prog: str = PKG_NAME, org: Optional[str] = None
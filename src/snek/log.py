@@ -1,13 +1,31 @@
 """
 Custom logging infrastructure to provide execution information for the user.
 """
+import atexit
+import json
 import logging
+import os
+import threading
+import time
 from collections import defaultdict
 from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
 from logging import INFO, Formatter, Handler, LoggerAdapter, StreamHandler, getLogger
 from os.path import realpath, relpath
 from os.path import sep as pathsep
-from typing import DefaultDict, Optional, Sequence, cast
+from typing import (
+    IO,
+    Callable,
+    DefaultDict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+    cast,
+)
 
 from . import termui
 
@@ -15,6 +33,7 @@ DEFAULT_LOGGER = __name__
 """Name of snek's default logger (it can be used with :obj:`logging.getLogger`)"""
 
 Styles = Sequence[str]
+PathLike = Union[str, os.PathLike]
 
 
 def _are_equal_paths(path1, path2):
@@ -128,6 +147,7 @@ class ColoredReportFormatter(ReportFormatter):
         remove=("red", "bold"),
         delete=("red", "bold"),
         skip=("yellow", "bold"),
+        unchanged=("yellow", "bold"),
         run=("magenta", "bold"),
         invoke=("bold",),
     )
@@ -161,6 +181,68 @@ class ColoredReportFormatter(ReportFormatter):
         return super().format_default(record)
 
 
+class JSONLinesSink:
+    """Machine-readable destination for the events reported via
+    :obj:`ReportLogger.report`, written as `JSON lines`_.
+
+    Each line is an object with the fields ``activity``, ``subject``, ``context``,
+    ``target``, ``nesting``, ``timestamp`` (seconds since the epoch) and ``duration``
+    (seconds elapsed until the next event, or until the sink is closed).
+    Since the duration is only known when the next event arrives, there is always
+    one event pending: call :obj:`close` to make sure it is written.
+
+    Args:
+        destination: path of the file to be written or an already open file
+            descriptor (that is not closed by the sink).
+
+    .. _JSON lines: https://jsonlines.org
+    """
+
+    def __init__(self, destination: Union[PathLike, int]):
+        closefd = not isinstance(destination, int)
+        self._file: IO[str] = open(destination, "w", encoding="utf-8", closefd=closefd)
+        self._pending: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    def event(self, activity, subject, context=None, target=None, nesting=0) -> dict:
+        """Create an event (to be later passed to :obj:`emit`)"""
+        return {
+            "activity": activity,
+            "subject": _str_or_none(subject),
+            "context": _str_or_none(context),
+            "target": _str_or_none(target),
+            "nesting": nesting,
+            "timestamp": time.time(),
+            "_clock": time.perf_counter(),
+        }
+
+    def emit(self, event: dict):
+        """Write the pending event (now that its duration is known) and keep the
+        given ``event`` pending.
+        """
+        with self._lock:
+            self._write_pending(event["_clock"])
+            self._pending = event
+
+    def close(self):
+        """Write the pending event and close the destination"""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._write_pending(time.perf_counter())
+            self._file.close()
+
+    def _write_pending(self, clock: float):
+        event, self._pending = self._pending, None
+        if event is not None:
+            event["duration"] = max(clock - event.pop("_clock"), 0)
+            self._file.write(json.dumps(event) + "\n")
+
+
+def _str_or_none(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
 class ReportLogger(LoggerAdapter):
     """Suitable wrapper for snek CLI interactive execution reports.
 
@@ -176,9 +258,8 @@ class ReportLogger(LoggerAdapter):
             Options, empty by default.
         propagate (bool): whether or not to propagate messages in the logging hierarchy,
             ``False`` by default. See :obj:`logging.Logger.propagate`.
-
-    Attributes:
-        nesting (int): current nesting level of the report.
+        sink (JSONLinesSink): optional destination for the reported events,
+            regardless of the log level.
     """
 
     def __init__(
@@ -188,8 +269,12 @@ class ReportLogger(LoggerAdapter):
         formatter: Optional[logging.Formatter] = None,
         extra: Optional[dict] = None,
         propagate=False,
+        sink: Optional[JSONLinesSink] = None,
     ):
-        self.nesting = 0
+        self._nesting: ContextVar[int] = ContextVar(f"nesting_{id(self)}", default=0)
+        self._buffer: ContextVar[Optional[List[Callable[[], None]]]]
+        self._buffer = ContextVar(f"buffer_{id(self)}", default=None)
+        self._sink = sink
         self._wrapped: logging.Logger = logger or getLogger(DEFAULT_LOGGER)
         self.propagate = propagate
         self.extra = extra or {}
@@ -241,6 +326,34 @@ class ReportLogger(LoggerAdapter):
         self._formatter = value
         self.handler.setFormatter(value)
 
+    @property
+    def nesting(self) -> int:
+        """Current nesting level of the report.
+
+        The nesting level (as the buffer used by :obj:`buffered`) is stored in a
+        :obj:`~contextvars.ContextVar`, so concurrent :mod:`asyncio` tasks and
+        threads started via :obj:`contextvars.copy_context` do not interfere with
+        each other.
+        """
+        return self._nesting.get()
+
+    @nesting.setter
+    def nesting(self, value: int):
+        self._nesting.set(value)
+
+    @property
+    def sink(self) -> Optional[JSONLinesSink]:
+        """Structured destination for the reported events (see :obj:`report`).
+        When replaced, the previous sink is closed.
+        """
+        return self._sink
+
+    @sink.setter
+    def sink(self, value: Optional[JSONLinesSink]):
+        previous, self._sink = self._sink, value
+        if previous is not None and previous is not value:
+            previous.close()
+
     @property
     def level(self):
         """Effective level of the logger"""
@@ -288,18 +401,75 @@ class ReportLogger(LoggerAdapter):
 
                 logger.report('copy', 'my/file', target='my/awesome/path')
                 logger.report('run', 'command', context='current/working/dir')
+
+            When neither the log level nor a :obj:`sink` require the event, this
+            method returns before creating any object.
         """
-        return self.wrapped.log(
-            level,
-            "",
-            extra={
-                "activity": activity,
-                "subject": subject,
-                "context": context,
-                "target": target,
-                "nesting": nesting or self.nesting,
-            },
-        )
+        sink = self._sink
+        if sink is None and not self._wrapped.isEnabledFor(level):
+            return None
+
+        nesting = nesting or self.nesting
+        event = sink and sink.event(activity, subject, context, target, nesting)
+        extra = {
+            "activity": activity,
+            "subject": subject,
+            "context": context,
+            "target": target,
+            "nesting": nesting,
+        }
+        buffer = self._buffer.get()
+        if buffer is not None:
+            return buffer.append(partial(self._report, level, extra, sink, event))
+
+        return self._report(level, extra, sink, event)
+
+    def _report(self, level, extra, sink, event):
+        if sink is not None:
+            sink.emit(event)
+        self._wrapped.log(level, "", extra=extra)
+
+    def log(self, level, msg, *args, **kwargs):
+        """Delegate a log call to the underlying logger (or buffer it, see
+        :obj:`buffered`).
+        """
+        if not self.isEnabledFor(level):
+            return None
+
+        buffer = self._buffer.get()
+        if buffer is not None:
+            return buffer.append(partial(super().log, level, msg, *args, **kwargs))
+
+        return super().log(level, msg, *args, **kwargs)
+
+    @contextmanager
+    def buffered(self) -> Iterator[List[Callable[[], None]]]:
+        """Collect the log calls performed by the current thread (or :mod:`asyncio`
+        task) while executing a context, instead of emitting them.
+
+        The yielded list can be later passed to :obj:`replay`, so logs produced
+        concurrently by multiple threads can be emitted in a deterministic order.
+
+        Example:
+
+            .. code-block:: python
+
+                with logger.buffered() as records:
+                    logger.report("create", "some/file/path")  # nothing shown
+
+                logger.replay(records)  # now the log is emitted
+        """
+        records: List[Callable[[], None]] = []
+        token = self._buffer.set(records)
+        try:
+            yield records
+        finally:
+            self._buffer.reset(token)
+
+    def replay(self, records: Iterable[Callable[[], None]]):
+        """Emit the log calls collected by :obj:`buffered`"""
+        for record in records:
+            record()
 
     @contextmanager
     def indent(self, count=1):
@@ -324,7 +494,8 @@ class ReportLogger(LoggerAdapter):
                 # second entry is greater than the equivalent in the first one.
 
         Note:
-            This method is not thread-safe and should be used with care.
+            The nesting level is local to the current thread or :mod:`asyncio` task
+            (see :obj:`nesting`).
         """
         prev = self.nesting
         self.nesting += count
@@ -340,7 +511,12 @@ class ReportLogger(LoggerAdapter):
         indentation consistent.
         """
         clone = self.__class__(
-            self.wrapped, self.handler, self.formatter, self.extra, self.propagate
+            self.wrapped,
+            self.handler,
+            self.formatter,
+            self.extra,
+            self.propagate,
+            self.sink,
         )
         clone.nesting = self.nesting
 
@@ -356,6 +532,8 @@ class ReportLogger(LoggerAdapter):
             log_level: One of the log levels specified in the :obj:`logging` module.
             use_colors: automatically set a colored formatter to the logger
                 if ANSI codes support is detected. (Defaults to `True`).
+            log_events: path or file descriptor where a :obj:`JSONLinesSink` should
+                write the reported events (closed when the interpreter exits).
 
         Additional keyword arguments will be ignored.
         """
@@ -365,6 +543,10 @@ class ReportLogger(LoggerAdapter):
         if "log_level" in opts:
             self.level = opts["log_level"]
 
+        if opts.get("log_events") is not None:
+            self.sink = JSONLinesSink(opts["log_events"])
+            atexit.register(self.sink.close)
+
         # if terminal supports, use colors
         stream = getattr(self.handler, "stream", None)
         if opts.get("use_colors", True) and termui.supports_color(stream):
@@ -0,0 +1,464 @@
+"""
+Pure Python writer for the initial commit of brand new git repositories.
+
+For brand new projects, all the information required to create the first commit
+(file contents, author, commit message) is already available in memory, so there is no
+real need for spawning ``git`` subprocesses. This module writes the loose objects
+(blobs, trees and commit), the index and the refs directly, producing the same
+repository that ``git init && git add ... && git commit`` would (objects, refs, index
+and reflogs, with the exception of the inert ``hooks/*.sample`` files).
+
+Only a well-known subset of git's configuration is supported. Whenever something
+outside of this subset is found (e.g. ``include`` directives, commit signing, hooks or
+content filters) an :obj:`Unsupported` exception is raised, so the caller can fall
+back to the git CLI.
+
+Warning:
+    This is an **experimental** module and might be subject to incompatible changes
+    (or complete removal) even in minor/patch releases.
+"""
+import hashlib
+import os
+import re
+import struct as binary
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .file_system import PathLike
+from .log import logger
+
+GitConfig = Dict[str, str]
+"""Flat representation of git's configuration: ``{"section[.subsection].key": value}``
+(section and key names are lower case, as git treats them case-insensitively).
+"""
+
+DEFAULT_BRANCH = "master"
+COMMIT_MESSAGE = "Initial commit"
+
+CONFIG = """\
+[core]
+\trepositoryformatversion = 0
+\tfilemode = true
+\tbare = false
+\tlogallrefupdates = true
+"""
+
+DESCRIPTION = (
+    "Unnamed repository; edit this file 'description' to name the repository.\n"
+)
+
+EXCLUDE = """\
+# git ls-files --others --exclude-from=.git/info/exclude
+# Lines that start with '#' are comments.
+# For a project mostly in C, the following would be a good set of
+# exclude patterns (uncomment them if you want to use them):
+# *.[oa]
+# *~
+"""
+
+UNSUPPORTED_CONFIG = (
+    "include.",
+    "includeif.",
+    "commit.gpgsign",
+    "commit.template",
+    "core.autocrlf",
+    "core.eol",
+    "core.hookspath",
+    "core.sharedrepository",
+    "core.fsmonitor",
+    "extensions.",
+    "i18n.commitencoding",
+    "index.",
+    "feature.",
+    "init.defaultobjectformat",
+    "init.templatedir",
+)
+"""Configuration keys (or prefixes) that change how the initial commit looks like,
+and therefore are not supported by this module.
+"""
+
+UNSUPPORTED_ENV = (
+    "GIT_DIR",
+    "GIT_WORK_TREE",
+    "GIT_INDEX_FILE",
+    "GIT_OBJECT_DIRECTORY",
+    "GIT_TEMPLATE_DIR",
+    "GIT_CONFIG_PARAMETERS",
+    "GIT_CONFIG_COUNT",
+)
+"""Environment variables that would change git's behaviour"""
+
+UNSUPPORTED_FILES = {".gitattributes"}
+"""Files that would change git's behaviour"""
+
+
+class Unsupported(RuntimeError):
+    """The native writer cannot reproduce what the git CLI would do."""
+
+
+# -------- Configuration --------
+
+
+def config_files() -> List[Path]:
+    """List the (system, XDG and global) git config files, in the same order git
+    reads them.
+    """
+    files: List[Path] = []
+    if not os.getenv("GIT_CONFIG_NOSYSTEM"):
+        files.append(Path(os.getenv("GIT_CONFIG_SYSTEM") or "/etc/gitconfig"))
+
+    global_file = os.getenv("GIT_CONFIG_GLOBAL")
+    if global_file:
+        return files + [Path(global_file)]
+
+    home = os.path.expanduser("~")
+    xdg = os.getenv("XDG_CONFIG_HOME") or os.path.join(home, ".config")
+    files.append(Path(xdg, "git", "config"))
+    files.append(Path(home, ".gitconfig"))
+    return files
+
+
+_SECTION = re.compile(r'\[\s*([\w.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+_KEY = re.compile(r"([A-Za-z][\w-]*)\s*(?:=(.*))?$")
+
+
+def parse_config(text: str, config: Optional[GitConfig] = None) -> GitConfig:
+    """Parse the contents of a git config file (later values overwrite previous ones).
+
+    Args:
+        text: contents of the file
+        config: existing configuration to be updated (a new dict by default)
+
+    Raises:
+        :obj:`Unsupported`: when the syntax is not understood
+    """
+    config = {} if config is None else config
+    section = ""
+    lines = iter(text.splitlines())
+    for raw in lines:
+        line = raw.strip()
+        while line.endswith("\\") and not line.endswith("\\\\"):
+            line = line[:-1] + next(lines, "").strip()  # line continuation
+
+        if not line or line[0] in "#;":
+            continue
+
+        if line.startswith("["):
+            match = _SECTION.match(line)
+            if not match:
+                raise Unsupported(f"git config line not understood: {raw!r}")
+            name, sub = match.groups()
+            section = name.lower() if sub is None else f"{name.lower()}.{sub}"
+            line = line[match.end() :].strip()
+            if not line or line[0] in "#;":
+                continue
+
+        match = _KEY.match(line)
+        if not match or not section:
+            raise Unsupported(f"git config line not understood: {raw!r}")
+        key, value = match.groups()
+        config[f"{section}.{key.lower()}"] = _config_value(value)
+
+    return config
+
+
+def _config_value(value: Optional[str]) -> str:
+    if value is None:
+        return "true"  # a key without value is a boolean "true"
+
+    result, quoted, escaped = [], False, False
+    for char in value.strip():
+        if escaped:
+            result.append({"n": "\n", "t": "\t", "b": "\b"}.get(char, char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif char in "#;" and not quoted:
+            break
+        else:
+            result.append(char)
+
+    return "".join(result).strip()
+
+
+def read_config(files: Optional[Iterable[PathLike]] = None) -> GitConfig:
+    """Read git's configuration from the given files (:obj:`config_files` by default)"""
+    config: GitConfig = {}
+    for file in files or config_files():
+        path = Path(file)
+        if path.is_file():
+            parse_config(path.read_text(encoding="utf-8"), config)
+    return config
+
+
+def _is_true(value: Optional[str]) -> bool:
+    return str(value).lower() in ("true", "yes", "on", "1")
+
+
+def check_supported(config: GitConfig, env=os.environ):
+    """Raise :obj:`Unsupported` if the environment or the configuration indicate the
+    git CLI would produce something different from this module.
+    """
+    if os.name != "posix" or sys.platform == "darwin":
+        raise Unsupported(f"platform {sys.platform!r}")
+
+    for var in UNSUPPORTED_ENV:
+        if env.get(var):
+            raise Unsupported(f"environment variable {var}")
+
+    for key, value in config.items():
+        if key == "commit.gpgsign" and not _is_true(value):
+            continue  # explicitly disabled, nothing to worry about
+        if key.startswith(UNSUPPORTED_CONFIG):
+            raise Unsupported(f"git config {key}")
+
+
+# -------- Identity --------
+
+
+def identity(role: str, config: GitConfig, env=os.environ) -> Tuple[str, str]:
+    """Name and email for the given ``role`` (``author`` or ``committer``),
+    in the same precedence order used by git.
+    """
+    role_var = role.upper()
+    name = (
+        env.get(f"GIT_{role_var}_NAME")
+        or config.get(f"{role}.name")
+        or config.get("user.name")
+    )
+    email = (
+        env.get(f"GIT_{role_var}_EMAIL")
+        or config.get(f"{role}.email")
+        or config.get("user.email")
+        or env.get("EMAIL")
+    )
+    if not name or not email:
+        raise Unsupported(f"git does not know the {role}'s identity")
+
+    return name, email
+
+
+def timestamp(role: str, env=os.environ) -> str:
+    """Date for the given ``role`` in git's internal format (``<epoch> <tz>``)."""
+    value = env.get(f"GIT_{role.upper()}_DATE")
+    if value:
+        match = re.fullmatch(r"@?(\d+)\s+([+-]\d{4})", value.strip())
+        if not match:
+            raise Unsupported(f"date format {value!r}")
+        return " ".join(match.groups())
+
+    now = time.time()
+    offset = time.localtime(now).tm_gmtoff // 60
+    sign = "-" if offset < 0 else "+"
+    hours, minutes = divmod(abs(offset), 60)
+    return f"{int(now)} {sign}{hours:02d}{minutes:02d}"
+
+
+def _signature(role: str, config: GitConfig, env=os.environ) -> str:
+    name, email = identity(role, config, env)
+    return f"{name} <{email}> {timestamp(role, env)}"
+
+
+# -------- Objects --------
+
+
+class ObjectWriter:
+    """Write (zlib-compressed) loose objects to a git object database"""
+
+    def __init__(self, git_dir: Path):
+        self.objects = git_dir / "objects"
+
+    def write(self, kind: str, content: bytes) -> bytes:
+        """Write the object (if not existing yet) and return its binary SHA-1"""
+        data = f"{kind} {len(content)}\0".encode() + content
+        sha = hashlib.sha1(data).digest()
+        hexsha = sha.hex()
+        path = self.objects / hexsha[:2] / hexsha[2:]
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(zlib.compress(data))
+            path.chmod(0o444)
+        return sha
+
+
+def _tree_key(entry: Tuple[str, str, bytes]) -> bytes:
+    mode, name, _ = entry
+    return name.encode() + (b"/" if mode == "40000" else b"")
+
+
+TreeEntries = Dict[str, Union["TreeEntries", Tuple[int, bytes]]]
+"""Nested dict mapping names to sub-trees or ``(mode, binary sha)`` tuples"""
+
+
+def write_tree(writer: ObjectWriter, entries: TreeEntries) -> bytes:
+    """Recursively write tree objects.
+
+    Args:
+        entries: see :obj:`TreeEntries`
+    """
+    items = []
+    for name, value in entries.items():
+        if isinstance(value, dict):
+            items.append(("40000", name, write_tree(writer, value)))
+        else:
+            mode, sha = value
+            items.append((f"{mode:o}", name, sha))
+
+    content = b"".join(
+        mode.encode() + b" " + name.encode() + b"\0" + sha
+        for mode, name, sha in sorted(items, key=_tree_key)
+    )
+    return writer.write("tree", content)
+
+
+IndexEntry = Tuple[str, os.stat_result, int, bytes]
+"""``(path, stat, mode, binary sha)``"""
+
+
+def index_bytes(entries: Iterable[IndexEntry]) -> bytes:
+    """Serialize a version 2 git index"""
+    sorted_entries = sorted(entries, key=lambda e: e[0].encode())
+    chunks = [b"DIRC" + binary.pack(">LL", 2, len(sorted_entries))]
+    for path, st, mode, sha in sorted_entries:
+        name = path.encode()
+        fields = (
+            int(st.st_ctime),
+            st.st_ctime_ns % 1_000_000_000,
+            int(st.st_mtime),
+            st.st_mtime_ns % 1_000_000_000,
+            st.st_dev,
+            st.st_ino,
+            mode,
+            st.st_uid,
+            st.st_gid,
+            st.st_size,
+        )
+        header = binary.pack(">10L", *(f & 0xFFFFFFFF for f in fields))
+        entry = header + sha + binary.pack(">H", min(len(name), 0xFFF)) + name
+        padding = 8 - (len(entry) % 8)  # at least one NUL
+        chunks.append(entry + b"\0" * padding)
+
+    data = b"".join(chunks)
+    return data + hashlib.sha1(data).digest()
+
+
+# -------- Repository --------
+
+
+def find_git_dir(path: PathLike) -> Optional[Path]:
+    """Find the ``.git`` entry for the repository ``path`` belongs to (if any)
+    without calling git.
+    """
+    candidate = Path(path).resolve()
+    for directory in (candidate, *candidate.parents):
+        git = directory / ".git"
+        if git.exists():
+            return git
+    return None
+
+
+def _leaves(struct: dict, prefix: Path = Path()) -> Iterable[Tuple[Path, object]]:
+    from .repo import tree_paths  # delay import to avoid circular dependency error
+
+    for path in tree_paths(struct, prefix):
+        node: object = struct
+        for part in path.parts:
+            node = node[part]  # type: ignore[index]
+        yield path, node
+
+
+def _content(file: Path, node: object, st: os.stat_result) -> bytes:
+    """Use the in-memory content whenever it matches what is in the disk"""
+    if isinstance(node, str):
+        content = node.encode("utf-8")
+        if len(content) == st.st_size:
+            return content
+    return file.read_bytes()
+
+
+def init_commit_repo(
+    project: PathLike,
+    struct: dict,
+    config: Optional[GitConfig] = None,
+    pretend=False,
+    env=os.environ,
+) -> Optional[str]:
+    """Initialize a git repository and write the initial commit for the files in
+    ``struct``, without calling git.
+
+    Args:
+        project: path to the project
+        struct: directory structure as dictionary of dictionaries
+        config: git configuration (read with :obj:`read_config` by default)
+        pretend: skip execution (but log) when pretending.
+
+    Returns:
+        The (hexadecimal) SHA-1 of the created commit (or ``None`` when pretending)
+
+    Raises:
+        :obj:`Unsupported`: when the result would diverge from the git CLI.
+            Nothing is written to the disk in this case.
+    """
+    config = read_config() if config is None else config
+    check_supported(config, env)
+    if any(name in UNSUPPORTED_FILES for name in struct):
+        raise Unsupported(f"one of the files: {', '.join(UNSUPPORTED_FILES)}")
+
+    project = Path(project)
+    author = _signature("author", config, env)
+    committer = _signature("committer", config, env)
+    branch = config.get("init.defaultbranch") or DEFAULT_BRANCH
+
+    logger.report("write", f"initial commit natively to {project / '.git'}")
+    if pretend:
+        return None
+
+    files = [(project / path, path, node) for path, node in _leaves(struct)]
+    stats = [(file, path, node, file.stat()) for file, path, node in files]
+    # ^  stat every file upfront, so missing files raise before writing anything
+
+    git_dir = project / ".git"
+    for directory in ("objects/info", "objects/pack", "refs/tags", "info"):
+        (git_dir / directory).mkdir(parents=True, exist_ok=True)
+    (git_dir / "HEAD").write_text(f"ref: refs/heads/{branch}\n")
+    (git_dir / "config").write_text(CONFIG)
+    (git_dir / "description").write_text(DESCRIPTION)
+    (git_dir / "info" / "exclude").write_text(EXCLUDE)
+
+    writer = ObjectWriter(git_dir)
+    tree: TreeEntries = {}
+    index: List[IndexEntry] = []
+    for file, path, node, st in stats:
+        sha = writer.write("blob", _content(file, node, st))
+        mode = 0o100755 if st.st_mode & 0o100 else 0o100644
+        parent = tree
+        for part in path.parts[:-1]:
+            subtree = parent.setdefault(part, {})
+            assert isinstance(subtree, dict)
+            parent = subtree
+        parent[path.name] = (mode, sha)
+        index.append((path.as_posix(), st, mode, sha))
+
+    tree_sha = write_tree(writer, tree)
+    message = f"{COMMIT_MESSAGE}\n"
+    commit = f"tree {tree_sha.hex()}\nauthor {author}\ncommitter {committer}\n\n"
+    commit_sha = writer.write("commit", (commit + message).encode()).hex()
+
+    (git_dir / "index").write_bytes(index_bytes(index))
+    (git_dir / "COMMIT_EDITMSG").write_text(message)
+    ref = git_dir / "refs" / "heads" / branch
+    ref.parent.mkdir(parents=True, exist_ok=True)
+    ref.write_text(commit_sha + "\n")
+
+    reflog = f"{'0' * 40} {commit_sha} {committer}\tcommit (initial): {message}"
+    for log in (Path("HEAD"), Path("refs", "heads", branch)):
+        log = git_dir / "logs" / log
+        log.parent.mkdir(parents=True, exist_ok=True)
+        log.write_text(reflog)
+
+    return commit_sha
@@ -96,19 +96,26 @@ Note:
 def create(path: Path, contents: FileContents, opts: ScaffoldOpts) -> Union[Path, None]:
     """
     Default :obj:`FileOp`: always create/write the file even during (forced) updates.
+
+    During (forced) updates, files whose contents are byte-identical to the existing
+    ones are not written again (and therefore not reported as changed). This
+    behaviour can be controlled explicitly with the ``skip_unchanged`` option.
     """
     if contents is None:
         return None
 
-    if not path.parent.is_dir():
+    if not fs.backend().is_dir(path.parent):
         fs.create_directory(path.parent, pretend=opts.get("pretend"))
 
-    return fs.create_file(path, contents, pretend=opts.get("pretend"))
+    skip_unchanged = opts.get("skip_unchanged", opts.get("update") or opts.get("force"))
+    return fs.create_file(
+        path, contents, pretend=opts.get("pretend"), skip_unchanged=skip_unchanged
+    )
 
 
 def remove(path: Path, _content: FileContents, opts: ScaffoldOpts) -> Union[Path, None]:
     """Remove the file if it exists in the disk"""
-    if not path.exists():
+    if not fs.backend().exists(path):
         return None
 
     return fs.rm_rf(path, pretend=opts.get("pretend"))
@@ -126,7 +133,7 @@ def no_overwrite(file_op: FileOp = create) -> FileOp:
 
     def _no_overwrite(path: Path, contents: FileContents, opts: ScaffoldOpts):
         """See ``snek.operations.no_overwrite``"""
-        if opts.get("force") or not path.exists():
+        if opts.get("force") or not fs.backend().exists(path):
             return file_op(path, contents, opts)
 
         logger.report("skip", path)
@@ -189,8 +196,11 @@ def add_permissions(permissions: int, file_op: FileOp = create) -> FileOp:
         """See ``snek.operations.add_permissions``"""
         return_value = file_op(path, contents, opts)
 
-        if path.exists():
-            mode = path.stat().st_mode | permissions
+        if fs.backend().exists(path):
+            current = fs.backend().mode(path)
+            mode = current | permissions
+            if return_value is None and mode == current:
+                return None  # neither the contents nor the permissions changed
             return fs.chmod(path, mode, pretend=opts.get("pretend"))
 
         return return_value
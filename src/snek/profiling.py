@@ -0,0 +1,179 @@
+"""Per-action profiling of the action pipeline.
+
+When a profiling :obj:`session` is active, :obj:`snek.actions.invoke` measures each
+action (including nested ones, e.g. the steps of
+:obj:`snek.update.version_migration`) with :obj:`measure`. Low level functions, such
+as :obj:`snek.shell.ShellCommand.run` and :obj:`snek.file_system.create_file`, report
+their work via :obj:`count`, which is a no-op outside of a session.
+
+All the measurements are inclusive, i.e. the numbers of an action also account for
+the actions nested inside of it.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO, Union
+
+PathLike = Union[str, os.PathLike]
+
+DEFAULT_FILE = "snek-profile.json"
+"""File written by :obj:`session` when no explicit destination is given"""
+
+COUNTERS = ("subprocesses", "files_written")
+"""Events that can be reported via :obj:`count`"""
+
+COLUMNS = {
+    "wall_time": ("wall (s)", "{:.3f}"),
+    "cpu_time": ("cpu (s)", "{:.3f}"),
+    "memory_peak_kib": ("mem (KiB)", "{:.0f}"),
+    "subprocesses": ("procs", "{}"),
+    "files_written": ("files", "{}"),
+}
+
+
+class Profiler:
+    """Collect the measurements of each action invoked during a session.
+
+    Records are stored in :obj:`records` in the order the actions were invoked, with
+    a ``depth`` field representing nesting.
+    """
+
+    def __init__(self):
+        self.records: List[dict] = []
+        self._stack: List[dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, action_id: str):
+        import tracemalloc
+
+        record: dict = {"action": action_id, "depth": len(self._stack)}
+        record.update({c: 0 for c in COUNTERS})
+        self.records.append(record)
+        if self._stack:
+            _update_peak(self._stack[-1])
+        _reset_peak()
+
+        start_mem = tracemalloc.get_traced_memory()[0]
+        record["_peak"] = start_mem
+        self._stack.append(record)
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_time"] = time.perf_counter() - start_wall
+            record["cpu_time"] = time.process_time() - start_cpu
+            _update_peak(record)
+            peak = record.pop("_peak")
+            record["memory_peak_kib"] = max(peak - start_mem, 0) / 1024
+            self._stack.pop()
+            if self._stack:
+                parent = self._stack[-1]
+                parent["_peak"] = max(parent["_peak"], peak)
+                for counter in COUNTERS:
+                    parent[counter] += record[counter]
+            _reset_peak()
+
+    def count(self, counter: str, amount: int = 1):
+        with self._lock:  # files can be written concurrently by different threads
+            if self._stack:
+                self._stack[-1][counter] += amount
+
+    def totals(self) -> Dict[str, float]:
+        top_level = [r for r in self.records if r["depth"] == 0]
+        return {k: sum(r[k] for r in top_level) for k in COLUMNS}
+
+    def to_json(self) -> dict:
+        from . import __version__
+
+        totals, actions = self.totals(), self.records
+        return {"version": __version__, "totals": totals, "actions": actions}
+
+    def print_table(self, file: Optional[TextIO] = None):
+        """Print a human readable table of the records (``stderr`` by default)"""
+
+        def _cells(name, values):
+            return [name] + [fmt.format(values[k]) for k, (_, fmt) in COLUMNS.items()]
+
+        rows = [_cells("  " * r["depth"] + r["action"], r) for r in self.records]
+        rows.append(_cells("TOTAL", self.totals()))
+        header = ["action"] + [title for title, _ in COLUMNS.values()]
+        widths = [max(len(cell) for cell in column) for column in zip(header, *rows)]
+
+        def _line(row):
+            first, *others = row
+            cells = [first.ljust(widths[0])]
+            cells += [c.rjust(w) for c, w in zip(others, widths[1:])]
+            return "  ".join(cells)
+
+        lines = [_line(header), "-" * len(_line(header))]
+        lines += [_line(row) for row in rows]
+        print("\n".join(lines), file=file or sys.stderr)
+
+
+_current: Optional[Profiler] = None
+
+
+@contextmanager
+def session(destination: Union[PathLike, bool, None] = True) -> Iterator[Profiler]:
+    """Profile all the actions invoked inside of the ``with`` block.
+
+    When the block ends, a table is printed to ``stderr`` and the records are saved
+    as JSON to ``destination`` (:obj:`DEFAULT_FILE` when ``True``).
+    """
+    import tracemalloc  # only needed when profiling, keep it out of the cold start
+
+    global _current
+    previous, _current = _current, Profiler()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        yield _current
+    finally:
+        profiler, _current = _current, previous
+        if not tracing:
+            tracemalloc.stop()
+
+    profiler.print_table()
+    if destination:
+        file = Path(DEFAULT_FILE if destination is True else destination)
+        file.write_text(json.dumps(profiler.to_json(), indent=2), encoding="utf-8")
+
+
+@contextmanager
+def measure(action_id: str):
+    """Measure the code inside of the ``with`` block, if a :obj:`session` is active"""
+    if _current is None:
+        yield None
+    else:
+        with _current.measure(action_id) as record:
+            yield record
+
+
+def count(counter: str, amount: int = 1):
+    """Add ``amount`` to a counter (see :obj:`COUNTERS`) of the innermost action
+    being measured. This is a no-op when no :obj:`session` is active.
+    """
+    if _current is not None:
+        _current.count(counter, amount)
+
+
+def _update_peak(record: dict):
+    import tracemalloc
+
+    record["_peak"] = max(record["_peak"], tracemalloc.get_traced_memory()[1])
+
+
+def _reset_peak():
+    import tracemalloc
+
+    # TODO: Call `tracemalloc.reset_peak` directly when `python_requires = >= 3.9`
+    #       Before that, peaks of nested actions can only be approximated.
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
@@ -3,7 +3,7 @@ Functionality for working with a git repository
 """
 
 from pathlib import Path
-from typing import Optional, TypeVar, Union
+from typing import Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
 
 from . import shell
 from .exceptions import ShellCommandException
@@ -12,25 +12,110 @@ from .log import logger
 
 T = TypeVar("T")
 
+_ADD_CHUNK = 500
+"""Maximum number of paths passed as arguments to a single ``git add`` (fallback)"""
 
-def git_tree_add(struct: dict, prefix: PathLike = "", **kwargs):
-    """Adds recursively a directory structure to git
+
+def tree_paths(struct: dict, prefix: PathLike = "") -> Iterator[Path]:
+    """Iterate over the paths of all the files in a directory structure
 
     Args:
         struct: directory structure as dictionary of dictionaries
         prefix: prefix for the given directory structure
 
-    Additional keyword arguments are passed to the
-    :obj:`git <snek.shell.ShellCommand>` callable object.
+    Raises:
+        TypeError: raised if content type in struct is unknown
     """
     prefix = Path(prefix)
     for name, content in struct.items():
         if isinstance(content, dict):
-            git_tree_add(struct[name], prefix=prefix / name, **kwargs)
+            yield from tree_paths(content, prefix=prefix / name)
         elif content is None or isinstance(content, str):
-            shell.git("add", str(prefix / name), **kwargs)
+            yield prefix / name
         else:
-            raise TypeError(f"Don't know what to do with content type {type}.")
+            raise TypeError(f"Don't know what to do with content type {type(content)}.")
+
+
+def git_tree_add(struct: dict, prefix: PathLike = "", **kwargs) -> int:
+    """Adds recursively a directory structure to git
+
+    All the files are staged at once, with the list of paths being fed to git via
+    ``stdin`` (instead of spawning one ``git add`` subprocess per file).
+
+    Args:
+        struct: directory structure as dictionary of dictionaries
+        prefix: prefix for the given directory structure
+
+    Returns:
+        Number of files staged
+
+    Additional keyword arguments are passed to the
+    :obj:`git <snek.shell.ShellCommand>` callable object.
+    """
+    plan = _GitAddPlan([str(p) for p in tree_paths(struct, prefix)])
+    for args, pathspec in plan:
+        try:
+            shell.git(*args, input=pathspec, **kwargs)
+        except ShellCommandException as ex:
+            plan.failed(ex)
+    return plan.report()
+
+
+async def git_tree_add_async(struct: dict, prefix: PathLike = "", **kwargs) -> int:
+    """Awaitable equivalent of :obj:`git_tree_add`. Instead of changing the working
+    directory, the project should be given via the ``cwd`` keyword argument.
+    """
+    plan = _GitAddPlan([str(p) for p in tree_paths(struct, prefix)])
+    for args, pathspec in plan:
+        try:
+            await shell.git_async(*args, input=pathspec, **kwargs)
+        except ShellCommandException as ex:
+            plan.failed(ex)
+    return plan.report()
+
+
+class _GitAddPlan:
+    """``git add`` calls that stage all the ``paths`` (shared by :obj:`git_tree_add`
+    and :obj:`git_tree_add_async`, that only run them).
+
+    At first, all the paths are staged at once, with the pathspec given via ``stdin``.
+    Since git < 2.25 does not support reading pathspecs from ``stdin``, when that
+    call :obj:`failed`, the paths are staged in chunks of :obj:`_ADD_CHUNK` instead.
+    """
+
+    BATCH = ("add", "--pathspec-from-file=-", "--pathspec-file-nul")
+
+    def __init__(self, paths: List[str]):
+        self.paths = paths
+        self.calls = 0
+        self._old_git = False
+
+    def __iter__(self) -> Iterator[Tuple[Sequence[str], Optional[str]]]:
+        if not self.paths:
+            return
+
+        self.calls += 1
+        yield self.BATCH, "\0".join(self.paths)
+        if not self._old_git:
+            return
+
+        for i in range(0, len(self.paths), _ADD_CHUNK):
+            self.calls += 1
+            yield ("add", "--", *self.paths[i : i + _ADD_CHUNK]), None
+
+    def failed(self, ex: ShellCommandException):
+        """Use the fallback if ``ex`` was raised by an old git, re-raise it otherwise"""
+        if self.calls > 1 or "pathspec-from-file" not in str(ex):
+            raise ex
+        self._old_git = True
+
+    def report(self) -> int:
+        """Log the staged files and return their number"""
+        if self.paths:
+            saved = max(len(self.paths) - self.calls, 0)
+            files = len(self.paths)
+            logger.report("stage", f"{files} files ({saved} git subprocesses saved)")
+        return len(self.paths)
 
 
 def add_tag(project: PathLike, tag_name: str, message: Optional[str] = None, **kwargs):
@@ -51,23 +136,61 @@ def add_tag(project: PathLike, tag_name: str, message: Optional[str] = None, **k
             shell.git("tag", "-a", tag_name, "-m", message, **kwargs)
 
 
-def init_commit_repo(project: PathLike, struct: dict, **kwargs):
+def init_commit_repo(project: PathLike, struct: dict, native=False, **kwargs):
     """Initialize a git repository
 
     Args:
         project: path to the project
         struct: directory structure as dictionary of dictionaries
+        native: write the repository directly from Python (see
+            :mod:`snek.native_git`) instead of calling git. The git CLI is still
+            used as a fallback, when the native writer is not able to reproduce
+            its results.
 
     Additional keyword arguments are passed to the
     :obj:`git <snek.shell.ShellCommand>` callable object.
     """
     logger.report("initialize", f"git repo in {project}...")
+    if native:
+        from . import native_git  # only loaded when required
+
+        try:
+            native_git.init_commit_repo(project, struct, pretend=kwargs.get("pretend"))
+            return
+        except native_git.Unsupported as ex:
+            logger.report("fallback", f"git CLI (not supported natively: {ex})")
+
     with chdir(project, pretend=kwargs.get("pretend")):
         shell.git("init", **kwargs)
         git_tree_add(struct, **kwargs)
         shell.git("commit", "-m", "Initial commit", **kwargs)
 
 
+async def init_commit_repo_async(
+    project: PathLike, struct: dict, native=False, **kwargs
+):
+    """Awaitable equivalent of :obj:`init_commit_repo`.
+
+    The git commands run with ``project`` as their working directory, so (unlike
+    :obj:`init_commit_repo`) the working directory of the process is never changed
+    and other tasks can run concurrently.
+    """
+    logger.report("initialize", f"git repo in {project}...")
+    if native:
+        from . import native_git  # only loaded when required
+
+        try:
+            native_git.init_commit_repo(project, struct, pretend=kwargs.get("pretend"))
+            return
+        except native_git.Unsupported as ex:
+            logger.report("fallback", f"git CLI (not supported natively: {ex})")
+
+    kwargs = {**kwargs, "cwd": str(project)}
+    await shell.git_async("init", **kwargs)
+    await git_tree_add_async(struct, **kwargs)
+    await shell.git_async("commit", "-m", "Initial commit", **kwargs)
+
+
 def is_git_repo(path: PathLike):
     """Check if path is a git repository"""
     path = Path(path)
@@ -75,12 +198,11 @@ def is_git_repo(path: PathLike):
     if not path.is_dir():
         return False
 
-    with chdir(path):
-        try:
-            shell.git("rev-parse", "--git-dir")
-        except ShellCommandException:
-            return False
-        return True
+    try:
+        shell.git("rev-parse", "--git-dir", cwd=str(path))
+    except ShellCommandException:
+        return False
+    return True
 
 
 def get_git_root(default: Optional[T] = None) -> Union[None, T, str]:
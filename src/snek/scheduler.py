@@ -0,0 +1,150 @@
+"""Concurrent execution of the action pipeline.
+
+By default the actions in the pipeline run one after the other (see
+:obj:`snek.api.create_project`). When ``opts["jobs"]`` is greater than 1, the
+pipeline runs via :obj:`run` instead: actions that declare the resources they read
+and produce (see :obj:`snek.actions.declare`) run concurrently with the other actions
+they do not conflict with, e.g. :obj:`snek.actions.init_git_async` (that replaces
+:obj:`~snek.actions.init_git`, see :obj:`snek.actions.asynchronous`) and the
+creation of a virtual environment. The total time then approaches the critical path
+of the pipeline instead of the sum of all the steps.
+
+Actions without declarations (e.g. the ones from extensions written for the list
+based API) work as barriers: they run alone, in the same order as they appear in
+the pipeline, so they are guaranteed to see the results of all the previous
+actions.
+
+The logs of each action are buffered and emitted in the order of the pipeline, so
+they look the same regardless of the concurrency.
+"""
+
+import asyncio
+from contextvars import copy_context
+from typing import Callable, FrozenSet, List, Optional, Sequence, Set
+
+from .actions import Action, ActionParams, invoke, invoke_async
+from .log import logger
+
+Records = List[Callable[[], None]]
+
+
+def resources(action: Action, kind: str) -> Optional[FrozenSet[str]]:
+    """Resources of a given ``kind`` (``"reads"`` or ``"writes"``) declared by the
+    action (``None`` when the action was not declared)
+    """
+    return getattr(action, kind, None)
+
+
+def conflict(first: Action, second: Action) -> bool:
+    """Check if 2 actions cannot run concurrently (i.e. one of them produces something
+    that the other reads or produces).
+    """
+    reads1, writes1 = resources(first, "reads"), resources(first, "writes")
+    reads2, writes2 = resources(second, "reads"), resources(second, "writes")
+    if None in (reads1, writes1, reads2, writes2):
+        return True  # actions without declaration work as barriers
+
+    return any(
+        _overlap(a, b)
+        for a, b in ((writes1, reads2), (writes1, writes2), (reads1, writes2))
+    )
+
+
+def dependencies(pipeline: Sequence[Action]) -> List[Set[int]]:
+    """For each action in the pipeline, the indexes of the previous actions that
+    have to finish before it can start
+    """
+    return [
+        {j for j in range(i) if conflict(pipeline[j], action)}
+        for i, action in enumerate(pipeline)
+    ]
+
+
+async def run(
+    pipeline: Sequence[Action], struct_and_opts: ActionParams, jobs: int = 4
+) -> ActionParams:
+    """Run the ``pipeline`` with at most ``jobs`` actions executing at the same time.
+    Coroutine actions run in the event loop, while regular functions run in a pool of
+    threads.
+    """
+    struct, opts = struct_and_opts
+    state = [struct, dict(opts)]
+    deps = dependencies(pipeline)
+    semaphore = asyncio.Semaphore(max(jobs, 1))
+    loop = asyncio.get_running_loop()
+    pending: List[Optional[Records]] = [None] * len(pipeline)
+    emitted = 0
+
+    def _replay_in_order():
+        nonlocal emitted
+        while emitted < len(pending) and pending[emitted] is not None:
+            logger.replay(pending[emitted] or [])
+            pending[emitted] = []  # release the memory
+            emitted += 1
+
+    async def _invoke(action: Action, params: ActionParams) -> ActionParams:
+        if asyncio.iscoroutinefunction(action):
+            return await invoke_async(params, action)
+        # regular functions run in a thread, so they do not block the event loop
+        # (and can even use `asyncio.run` themselves)
+        ctx = copy_context()
+        return await loop.run_in_executor(None, ctx.run, invoke, params, action)
+
+    async def _run(index: int, action: Action):
+        await asyncio.gather(*(tasks[j] for j in deps[index]))
+        async with semaphore:
+            params = (state[0], dict(state[1]))
+            if resources(action, "writes") is None:
+                # barrier: all the previous logs were already emitted
+                pending[index] = []
+                result = await _invoke(action, params)
+            else:
+                with logger.buffered() as records:
+                    try:
+                        result = await _invoke(action, params)
+                    finally:
+                        pending[index] = records
+        _merge(state, action, result)
+        _replay_in_order()
+
+    tasks: List[asyncio.Future] = [
+        asyncio.ensure_future(_run(i, a)) for i, a in enumerate(pipeline)
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for records in pending[emitted:]:
+            logger.replay(records or [])  # logs of what run before the error
+
+    return state[0], state[1]
+
+
+def _merge(state: list, action: Action, result: ActionParams):
+    """Incorporate the declared results of ``action`` in the shared ``state``"""
+    struct, opts = result
+    writes = resources(action, "writes")
+    if writes is None or "opts" in writes:
+        state[1] = dict(opts)
+    else:
+        for key in (w[len("opts.") :] for w in writes if w.startswith("opts.")):
+            if key in opts:
+                state[1][key] = opts[key]
+            else:
+                state[1].pop(key, None)
+
+    if writes is None or "struct" in writes:
+        state[0] = struct
+
+
+def _overlap(first: Optional[FrozenSet[str]], second: Optional[FrozenSet[str]]) -> bool:
+    if first is None or second is None:
+        return True  # undeclared resources might be anything
+    if first & second:
+        return True
+    # "opts" (i.e. all the options) overlaps with any "opts.<key>"
+    has_opts1 = "opts" in first or any(r.startswith("opts.") for r in first)
+    has_opts2 = "opts" in second or any(r.startswith("opts.") for r in second)
+    return ("opts" in first and has_opts2) or ("opts" in second and has_opts1)
@@ -10,8 +10,19 @@ import subprocess
 import sys
 from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
-
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+
+from . import profiling
 from .exceptions import ShellCommandException
 from .log import logger
 
@@ -77,12 +88,40 @@ class ShellCommand:
 
     def run(self, *args, **kwargs) -> subprocess.CompletedProcess:
         """Execute command with the given arguments via :obj:`subprocess.run`."""
-        command = f"{self._command} {join(args)}".strip()
-        logger.report("run", command, context=self._cwd)
+        command, opts = self._prepare(args, kwargs)
+        if opts is None:
+            return subprocess.CompletedProcess(command, 0, None, None)
+
+        profiling.count("subprocesses")
+        if self._shell:
+            return subprocess.run(command, **opts)
+            # ^ `check_output` does not seem to support terminal editors
+        return subprocess.run(shlex.split(command, posix=IS_POSIX), **opts)
+        # ^ Joining and then splitting is the only way of supporting all the cases
+
+    def __call__(self, *args, **kwargs) -> Iterator[str]:
+        """Execute the command, returning an iterator for the resulting text output"""
+        try:
+            completed = self.run(*args, **kwargs)
+        except FileNotFoundError as e:
+            logger.report("info", f'last command failed with "{e!s}"')
+            raise ShellCommandException(str(e)) from e
 
+        return _output_lines(completed)
+
+    def to_async(self) -> "AsyncShellCommand":
+        """Awaitable equivalent of this command, see :obj:`AsyncShellCommand`"""
+        return AsyncShellCommand(self._command, self._shell, self._cwd)
+
+    def _prepare(self, args, kwargs) -> Tuple[str, Optional[dict]]:
+        """Log the command and compute the options for :obj:`subprocess.run`
+        (``None`` when pretending, i.e. nothing should be executed).
+        """
+        command = f"{self._command} {join(args)}".strip()
         should_pretend = kwargs.pop("pretend", False)
+        logger.report("run", command, context=kwargs.get("cwd", self._cwd))
         if should_pretend:
-            return subprocess.CompletedProcess(command, 0, None, None)
+            return command, None
 
         opts: dict = {
             "shell": self._shell,
@@ -97,31 +136,76 @@ class ShellCommand:
             },
             **kwargs,  # allow overwriting defaults
         }
-        if self._shell:
-            return subprocess.run(command, **opts)
-            # ^ `check_output` does not seem to support terminal editors
-        return subprocess.run(shlex.split(command, posix=IS_POSIX), **opts)
-        # ^ Joining and then splitting is the only way of supporting all the cases
+        return command, opts
 
-    def __call__(self, *args, **kwargs) -> Iterator[str]:
+
+class AsyncShellCommand(ShellCommand):
+    """Awaitable variant of :obj:`ShellCommand`, based on :mod:`asyncio` subprocesses.
+
+    It has the same logging and ``pretend`` semantics, but calling the command
+    returns a coroutine, so several commands (e.g. from independent actions) can run
+    concurrently in the same event loop. Since the working directory is global to the
+    process, concurrent commands should use the ``cwd`` argument (or keyword
+    argument) instead of :obj:`~snek.file_system.chdir`.
+
+    The keyword arguments ``cwd``, ``env`` and ``input`` are supported.
+    """
+
+    async def run(  # type: ignore[override]
+        self, *args, **kwargs
+    ) -> subprocess.CompletedProcess:
+        """Execute command with the given arguments via :mod:`asyncio` subprocesses"""
+        import asyncio
+
+        command, opts = self._prepare(args, kwargs)
+        if opts is None:
+            return subprocess.CompletedProcess(command, 0, None, None)
+
+        data = opts.pop("input", None)
+        options = {k: opts[k] for k in ("cwd", "env", "stdout", "stderr")}
+        stdin = subprocess.PIPE if data is not None else subprocess.DEVNULL
+        profiling.count("subprocesses")
+        if self._shell:
+            proc = await asyncio.create_subprocess_shell(
+                command, stdin=stdin, **options
+            )
+        else:
+            argv = shlex.split(command, posix=IS_POSIX)
+            proc = await asyncio.create_subprocess_exec(*argv, stdin=stdin, **options)
+
+        stdout, _ = await proc.communicate(data.encode() if data is not None else None)
+        output = stdout.decode(errors="replace") if stdout is not None else None
+        return subprocess.CompletedProcess(command, cast(int, proc.returncode), output)
+
+    async def __call__(self, *args, **kwargs) -> Iterator[str]:  # type: ignore
         """Execute the command, returning an iterator for the resulting text output"""
         try:
-            completed = self.run(*args, **kwargs)
+            completed = await self.run(*args, **kwargs)
         except FileNotFoundError as e:
             logger.report("info", f'last command failed with "{e!s}"')
             raise ShellCommandException(str(e)) from e
 
-        try:
-            completed.check_returncode()
-        except subprocess.CalledProcessError as e:
-            stdout, stderr = (e or "" for e in (completed.stdout, completed.stderr))
-            stdout, stderr = (e.strip() for e in (stdout, stderr))
-            sep = "; " if stdout and stderr else ""
-            msg = sep.join([stdout, stderr])
-            logger.report("info", f'last command failed with "{msg}"')
-            raise ShellCommandException(msg) from e
+        return _output_lines(completed)
 
-        return (line for line in (completed.stdout or "").splitlines())
+    def to_async(self) -> "AsyncShellCommand":
+        return self
+
+
+def _output_lines(completed: subprocess.CompletedProcess) -> Iterator[str]:
+    """Raise :obj:`ShellCommandException` if the command failed or produce an
+    iterator for the lines of its output
+    """
+    try:
+        completed.check_returncode()
+    except subprocess.CalledProcessError as e:
+        stdout, stderr = (e or "" for e in (completed.stdout, completed.stderr))
+        stdout, stderr = (e.strip() for e in (stdout, stderr))
+        sep = "; " if stdout and stderr else ""
+        msg = sep.join([stdout, stderr])
+        logger.report("info", f'last command failed with "{msg}"')
+        raise ShellCommandException(msg) from e
+
+    return (line for line in (completed.stdout or "").splitlines())
 
 
 def shell_command_error2exit_decorator(func: Callable):
@@ -260,5 +344,10 @@ def git(*args, **kwargs) -> Iterator[str]:
     return get_git_cmd()(*args, **kwargs)  # delayed, so errors show up with --verbose
 
 
+async def git_async(*args, **kwargs) -> Iterator[str]:
+    """Awaitable command for git (see :obj:`AsyncShellCommand`)"""
+    return await get_git_cmd().to_async()(*args, **kwargs)
+
+
 #: Command for python
 python = ShellCommand(sys.executable)
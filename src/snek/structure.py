@@ -5,13 +5,31 @@
    contents. They will be called with snek's ``opts`` (:obj:`string.Template` via
    :obj:`~string.Template.safe_substitute`)
 """
-from copy import deepcopy
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import Context, copy_context
+from functools import lru_cache
 from pathlib import Path
 from string import Template
-from typing import Callable, Dict, Optional, Tuple, Union, cast
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
 
 from . import templates
 from .file_system import PathLike, create_directory
+from .log import logger
 from .operations import (
     FileContents,
     FileOp,
@@ -100,6 +118,14 @@ present.
 
 Note:
     :obj:`None` file contents are ignored and not created in disk.
+
+Note:
+    The functions manipulating the project structure (:obj:`merge`, :obj:`modify`,
+    :obj:`ensure` and :obj:`reject`) never change their arguments. Instead, they
+    copy only the directories in the path from the root to the changed node, and
+    share all the remaining nodes with the original structure. Therefore, a
+    structure should be treated as immutable: please use these functions instead of
+    modifying nested dicts in place.
 """
 
 ActionParams = Tuple[Structure, ScaffoldOpts]
@@ -178,6 +204,17 @@ def create_structure(
     Raises:
         TypeError: raised if content type in struct is unknown
 
+    When ``opts["jobs"]`` is greater than 1, all the directories are created first
+    and then the files are rendered and written concurrently by a pool of threads
+    (useful for file systems with high latency, e.g. NFS).
+    The returned structure and the logs are the same regardless of ``jobs``, except
+    for the fact that directories are logged before files.
+
+    When ``opts["diff"]`` is given, nothing is written to the disk. Instead the files
+    are rendered and compared to the existing ones concurrently and a unified diff is
+    written to ``opts["diff"]`` (see :mod:`snek.diff`). In this case, the returned
+    structure contains only the files whose contents would change.
+
     .. versionchanged:: 4.0
        Also accepts :obj:`string.Template` and :obj:`callable` objects as file contents.
     """
@@ -187,6 +224,12 @@ def create_structure(
     if prefix is None:
         prefix = cast(Path, opts.get("project_path", "."))
         create_directory(prefix, update, pretend)
+        struct = render_templates(struct, opts)
+        if opts.get("diff"):
+            return _diff_structure(struct, opts, Path(prefix))
+        jobs = opts.get("jobs") or 1
+        if jobs > 1:
+            return _create_structure_concurrently(struct, opts, Path(prefix), jobs)
     prefix = Path(prefix)
 
     changed: Structure = {}
@@ -204,6 +247,89 @@ def create_structure(
     return changed, opts
 
 
+def _create_structure_concurrently(
+    struct: Structure,
+    opts: ScaffoldOpts,
+    prefix: Path,
+    jobs: Optional[int],
+    process: Optional[Callable[[Path, Leaf], Tuple[FileContents, bool]]] = None,
+) -> ActionParams:
+    """Implementation of :obj:`create_structure` for ``opts["jobs"] > 1``.
+    ``process`` replaces the default behaviour of reifying each leaf and calling its
+    file op, and should return the file contents and whether the file changed.
+    """
+    update = opts.get("update") or opts.get("force")
+    pretend = opts.get("pretend")
+    leaves: List[Tuple[dict, str, Path, Leaf]] = []
+
+    def _create_directories(struct: Structure, prefix: Path) -> Structure:
+        changed: Structure = {}
+        for name, node in struct.items():
+            path = prefix / name
+            if isinstance(node, dict):
+                create_directory(path, update, pretend)
+                changed[name] = _create_directories(node, path)
+            else:
+                changed[name] = None  # placeholder, preserves the order of the keys
+                leaves.append((changed, name, path, node))
+        return changed
+
+    def _reify(path: Path, node: Leaf) -> Tuple[FileContents, bool]:
+        content, file_op = reify_leaf(node, opts)
+        return content, bool(file_op(path, content, opts))
+
+    def _create_file(leaf: Tuple[dict, str, Path, Leaf]):
+        _changed, _name, path, node = leaf
+        with logger.buffered() as records:
+            return (*(process or _reify)(path, node), records)
+
+    def _create_file_in_context(ctx: Context, leaf: Tuple[dict, str, Path, Leaf]):
+        return ctx.run(_create_file, leaf)
+
+    changed = _create_directories(struct, prefix)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        contexts = [copy_context() for _ in leaves]  # keep the logger's nesting
+        results = executor.map(_create_file_in_context, contexts, leaves)
+        for (parent, name, _, _), (content, written, records) in zip(leaves, results):
+            logger.replay(records)  # the logs keep the same order of the structure
+            if written:
+                parent[name] = content
+            else:
+                del parent[name]
+
+    return changed, opts
+
+
+def _diff_structure(
+    struct: Structure, opts: ScaffoldOpts, prefix: Path
+) -> ActionParams:
+    """Implementation of :obj:`create_structure` for ``opts["diff"]``"""
+    from . import diff  # difflib is only needed for the previews
+
+    opts = {**opts, "pretend": True}  # nothing is written in the diff mode
+    diffs: Dict[Path, str] = {}
+
+    def _preview(path: Path, node: Leaf) -> Tuple[FileContents, bool]:
+        content, file_op = reify_leaf(node, opts)
+        if not file_op(path, content, opts):
+            return content, False  # e.g. files skipped during updates
+        diffs[path] = diff.unified_diff(path, content, relative_to=prefix)
+        return content, bool(diffs[path])
+
+    jobs = opts.get("jobs")  # the comparisons run concurrently even when not given
+    changed, _ = _create_structure_concurrently(struct, opts, prefix, jobs, _preview)
+    diff.write(opts["diff"], (diffs[path] for path in _walk(changed, prefix)))
+    return changed, opts
+
+
+def _walk(struct: Structure, prefix: Path) -> Iterator[Path]:
+    for name, node in struct.items():
+        if isinstance(node, dict):
+            yield from _walk(node, prefix / name)
+        else:
+            yield prefix / name
+
+
 # -------- Auxiliary Functions --------
 
 
@@ -221,10 +347,33 @@ def reify_content(content: AbstractContent, opts: ScaffoldOpts) -> FileContents:
     if callable(content):
         return content(opts)
     if isinstance(content, Template):
-        return content.safe_substitute(opts)
+        return templates.compile_template(content).safe_substitute(opts)
     return content
 
 
+def render_templates(struct: Structure, opts: ScaffoldOpts) -> Structure:
+    """Render all the :obj:`string.Template` leaves of the structure at once
+    (compiling them and preparing ``opts`` only once, see :obj:`templates.prepare`).
+
+    File operations are preserved, while other leaves (e.g. functions) are left
+    untouched.
+    """
+    prepared = templates.prepare(opts)
+
+    def _render(node: Union[Structure, Leaf]) -> Union[Structure, Leaf]:
+        if isinstance(node, dict):
+            return {name: _render(child) for name, child in node.items()}
+        content, file_op = resolve_leaf(node)
+        if not isinstance(content, Template):
+            return node
+        template = templates.compile_template(content)
+        if isinstance(template, templates.CompiledTemplate):
+            return (template.render(prepared), file_op)
+        return (template.safe_substitute(opts), file_op)
+
+    return cast(Structure, _render(struct))
+
+
 def reify_leaf(contents: Leaf, opts: ScaffoldOpts) -> ReifiedLeaf:
     """Similar to :obj:`resolve_leaf` but applies :obj:`reify_content` to the first
     element of the returned tuple.
@@ -287,12 +436,9 @@ def modify(
     # Retrieve a list of parts from a path-like object
     path_parts = Path(path).parts
 
-    # Walk the entire path, creating parents if necessary.
-    root = deepcopy(struct)
-    last_parent: dict = root
+    # Walk the entire path, copying the spine (creating parents if necessary).
+    root, last_parent = _copy_spine(struct, path_parts[:-1])
     name = path_parts[-1]
-    for parent in path_parts[:-1]:
-        last_parent = last_parent.setdefault(parent, {})
 
     # Get the old value if existent.
     old_value = resolve_leaf(last_parent.get(name))
@@ -361,17 +507,15 @@ def reject(struct: Structure, path: PathLike) -> Structure:
     # Retrieve a list of parts from a path-like object
     path_parts = Path(path).parts
 
-    # Walk the entire path, creating parents if necessary.
-    root = deepcopy(struct)
-    last_parent: dict = root
-    name = path_parts[-1]
-    for parent in path_parts[:-1]:
-        if parent not in last_parent:
-            return root  # one ancestor already does not exist, do nothing
-        last_parent = last_parent[parent]
+    # Make sure the path exists, before copying anything
+    node: Node = struct
+    for part in path_parts:
+        if not isinstance(node, dict) or part not in node:
+            return struct.copy()  # the file or one ancestor does not exist, do nothing
+        node = node[part]
 
-    if name in last_parent:
-        del last_parent[name]
+    root, last_parent = _copy_spine(struct, path_parts[:-1])
+    del last_parent[path_parts[-1]]
 
     return root
 
@@ -397,27 +541,281 @@ def merge(old: Structure, new: Structure) -> Structure:
         Use an empty string as content to ensure a file is created empty.
         (``None`` contents will not be created).
     """
-    return _inplace_merge(deepcopy(old), new)
-
-
-def _inplace_merge(old: Structure, new: Structure) -> Structure:
-    """Similar to :obj:`~.merge` but modifies the first dict."""
+    merged = old.copy()
 
     for key, value in new.items():
         old_value = old.get(key, None)
         new_is_dict = isinstance(value, dict)
         old_is_dict = isinstance(old_value, dict)
         if new_is_dict and old_is_dict:
-            old[key] = _inplace_merge(
-                cast(Structure, old_value), cast(Structure, value)
-            )
+            merged[key] = merge(cast(Structure, old_value), cast(Structure, value))
         elif old_value is not None and not new_is_dict and not old_is_dict:
             # both are defined and final leaves
-            old[key] = _merge_leaf(cast(Leaf, old_value), cast(Leaf, value))
+            merged[key] = _merge_leaf(cast(Leaf, old_value), cast(Leaf, value))
+        elif new_is_dict:
+            merged[key] = _copy_dirs(cast(Structure, value))
         else:
-            old[key] = deepcopy(value)
+            merged[key] = value
+
+    return merged
+
+
+# -------- Path Index --------
+
+Modifier = Callable[[AbstractContent, FileOp], ResolvedLeaf]
+"""Function that receives the old content and file operation and returns the new
+ones (see :obj:`modify`)
+"""
+
+
+class StructureIndex:
+    """Flat view of a :obj:`Structure`, indexed by (POSIX) paths relative to the
+    project root (e.g. ``"src/pkg/__init__.py"``).
+
+    :obj:`modify`, :obj:`ensure` and :obj:`reject` copy the directories from the root
+    to the changed node in every call. When many files are edited at once (e.g. by
+    extensions generating lots of modules), it is more efficient to index the
+    structure once, apply all the edits directly to the index (each one is a
+    dictionary operation, regardless of the depth of the path) and convert it back
+    with :obj:`to_struct`. Example::
+
+        index = StructureIndex(struct)
+        for path in index.select("src/**/*.py"):
+            index.modify(path, add_license_header)
+        index.reject("tests/conftest.py")
+        struct = index.to_struct()
+
+    See also :obj:`edit`.
+    """
+
+    def __init__(self, struct: Optional[Structure] = None):
+        self.leaves: Dict[str, Leaf] = {}
+        self._children: Dict[str, Dict[str, None]] = {"": {}}
+        # ^  directory => names of its children (dicts preserve insertion order)
+        self._struct: Structure = struct or {}
+        self._owned: Dict[int, Structure] = {}
+        # ^  directories of `_struct` copied by the index (i.e. not shared with
+        #    other structures), that can be changed in place
+        self._add_dir("", self._struct)
+
+    def __contains__(self, path: PathLike) -> bool:
+        key = _key(path)
+        return key in self.leaves or key in self._children
+
+    def __getitem__(self, path: PathLike) -> Leaf:
+        return self.leaves[_key(path)]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.leaves)
+
+    def __len__(self) -> int:
+        return len(self.leaves)
+
+    def is_dir(self, path: PathLike) -> bool:
+        return _key(path) in self._children
+
+    def select(self, pattern: str) -> List[str]:
+        """Paths of the files matching a glob-style ``pattern``, in the same order as
+        they appear in the structure.
+
+        ``*`` and ``?`` do not match ``/``, while ``**/`` matches any number of
+        directories (e.g. ``src/**/*.py`` selects all the Python files in ``src``).
+        """
+        regex = _glob_regex(pattern)
+        return [path for path in self.leaves if regex.match(path)]
+
+    def modify(self, path: PathLike, modifier: Modifier) -> "StructureIndex":
+        """Same as :obj:`snek.structure.modify`, but changing the index in place"""
+        key = _key(path)
+        old_value = resolve_leaf(self.leaves.get(key))
+        new_value = modifier(*old_value)
+        self._set(key, _merge_leaf(old_value, new_value))
+        return self
+
+    def ensure(
+        self, path: PathLike, content: AbstractContent = None, file_op: FileOp = create
+    ) -> "StructureIndex":
+        """Same as :obj:`snek.structure.ensure`, but changing the index in place"""
+        return self.modify(
+            path, lambda old, _: (old if content is None else content, file_op)
+        )
+
+    def reject(self, path: PathLike) -> "StructureIndex":
+        """Same as :obj:`snek.structure.reject` (also works for directories), but
+        changing the index in place
+        """
+        key = _key(path)
+        if not key:
+            raise ValueError("The root of the project structure cannot be rejected")
+        if key not in self:
+            return self
+
+        parent, _, name = key.rpartition("/")
+        del self._children[parent][name]
+        del self._dir(parent)[name]
+        pending = [key]
+        while pending:
+            current = pending.pop()
+            if current in self.leaves:
+                del self.leaves[current]
+            else:
+                pending.extend(_join(current, c) for c in self._children.pop(current))
+        return self
+
+    def to_struct(self) -> Structure:
+        """Nested representation of the index.
+
+        The structure is kept up to date by the edits, so this is a constant time
+        operation. As in :obj:`~.modify`, it shares the unchanged directories with
+        the original structure (and the later edits do not change it).
+        """
+        self._owned.clear()  # the next edits should copy the directories again
+        return self._struct
+
+    def _add_dir(self, directory: str, struct: Structure):
+        children = self._children[directory]
+        for name, node in struct.items():
+            path = _join(directory, name)
+            children[name] = None
+            if isinstance(node, dict):
+                self._children.setdefault(path, {})
+                self._add_dir(path, node)
+            else:
+                self.leaves[path] = node
+
+    def _set(self, key: str, leaf: Leaf):
+        if key in self._children:
+            raise IsADirectoryError(f"{key!r} is a directory in the project structure")
+
+        parent, _, name = key.rpartition("/")
+        if parent not in self._children:
+            self._set_dir(parent)
+        self._children[parent][name] = None
+        self.leaves[key] = leaf
+        self._dir(parent)[name] = leaf
+
+    def _set_dir(self, key: str):
+        if key in self.leaves:
+            raise NotADirectoryError(f"{key!r} is a file in the project structure")
+        parent, _, name = key.rpartition("/")
+        if parent not in self._children:
+            self._set_dir(parent)
+        self._children[parent][name] = None
+        self._children[key] = {}
+
+    def _dir(self, key: str) -> Structure:
+        """Directory of the nested structure corresponding to ``key``, ready to be
+        changed in place (i.e. copied, if shared with other structures)
+        """
+        self._struct = node = self._own(self._struct)
+        for part in key.split("/") if key else ():
+            child = self._own(cast(Structure, node.get(part, {})))
+            node[part] = child
+            node = child
+        return node
+
+    def _own(self, directory: Structure) -> Structure:
+        if id(directory) not in self._owned:
+            directory = directory.copy()
+            self._owned[id(directory)] = directory
+        return directory
+
+
+def edit(
+    struct: Structure,
+    ensure: Optional[Mapping[PathLike, Leaf]] = None,
+    modify: Optional[Mapping[str, Modifier]] = None,
+    reject: Iterable[PathLike] = (),
+) -> Structure:
+    """Apply many edits to the project structure at once (see :obj:`StructureIndex`).
+
+    Args:
+        struct: project representation as (possibly) nested.
+        ensure: files that should exist, with their contents (or ``(content,
+            file_op)`` tuples), see :obj:`~.ensure`
+        modify: modifier functions (see :obj:`~.modify`) for each path. Keys with
+            glob-style patterns (e.g. ``src/**/*.py``) apply the modifier to all the
+            existing files they match.
+        reject: paths (or glob-style patterns) of the files to be removed, see
+            :obj:`~.reject`
+
+    The edits are applied in this order: ``ensure``, ``modify`` and then ``reject``.
+
+    The index of the returned structure is kept, so a sequence of calls to ``edit``
+    (each one receiving the result of the previous) does not index the whole
+    structure every time. As any other argument of the actions, the returned
+    structure should not be changed in place.
+
+    Returns:
+        Updated project tree representation (the original ``struct`` is not changed)
+    """
+    last = getattr(_last_edit, "value", None)
+    _last_edit.value = None  # the index is not reused if the edits below fail
+    index = last[1] if last and last[0] is struct else StructureIndex(struct)
+    for path, leaf in (ensure or {}).items():
+        content, file_op = resolve_leaf(leaf)
+        index.ensure(path, content, file_op)
+    for path, modifier in (modify or {}).items():
+        for selected in _expand(index, path):
+            index.modify(selected, modifier)
+    for path in reject:
+        for selected in _expand(index, path):
+            index.reject(selected)
+
+    edited = index.to_struct()
+    _last_edit.value = (edited, index)
+    return edited
+
 
-    return old
+_last_edit = threading.local()
+"""Last structure returned by :obj:`edit` (in each thread) and its index"""
+
+
+def _expand(index: StructureIndex, path: PathLike) -> List[str]:
+    text = str(path)
+    return index.select(text) if any(c in text for c in "*?") else [_key(text)]
+
+
+def _key(path: PathLike) -> str:
+    return "/".join(Path(path).parts)
+
+
+def _join(directory: str, name: str) -> str:
+    return f"{directory}/{name}" if directory else name
+
+
+@lru_cache(maxsize=128)
+def _glob_regex(pattern: str) -> Pattern[str]:
+    parts = re.split(r"(\*\*/|\*\*|\*|\?)", _key(pattern))
+    translate = {"**/": "(?:.*/)?", "**": ".*", "*": "[^/]*", "?": "[^/]"}
+    return re.compile("".join(translate.get(p, re.escape(p)) for p in parts) + "$")
+
+
+def _copy_spine(struct: Structure, parts: Sequence[str]) -> Tuple[Structure, dict]:
+    """Copy the directories from the root of the ``struct`` until the one
+    corresponding to ``parts`` (creating them if necessary).
+    All the other nodes are shared between ``struct`` and the returned copy.
+
+    Returns:
+        The root of the copied structure and the directory corresponding to ``parts``
+    """
+    root = struct.copy()
+    last_parent: dict = root
+    for parent in parts:
+        last_parent[parent] = last_parent.get(parent, {}).copy()
+        last_parent = last_parent[parent]
+
+    return root, last_parent
+
+
+def _copy_dirs(struct: Structure) -> Structure:
+    """Copy the directories (but not the leaves) of a structure, so it does not share
+    mutable nodes with external objects.
+    """
+    return {
+        k: _copy_dirs(cast(Structure, v)) if isinstance(v, dict) else v
+        for k, v in struct.items()
+    }
 
 
 def _merge_leaf(old_value: Leaf, new_value: Leaf) -> Leaf:
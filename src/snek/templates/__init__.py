@@ -6,16 +6,28 @@ under the BSD 0-Clause license.
 import os
 import string
 import sys
+from functools import lru_cache
 from types import ModuleType
 from types import SimpleNamespace as Object
-from typing import Any, Dict, Set, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
-from configupdater import ConfigUpdater
-
-from .. import __version__ as snek_version
 from .. import dependencies as deps
 from .. import toml
 
+if TYPE_CHECKING:  # pragma: no cover
+    from configupdater import ConfigUpdater  # imported only when used (faster CLI)
+
 if sys.version_info[:2] >= (3, 7):
     # TODO: Import directly (no need for workaround) when `python_requires = >= 3.7`
     from importlib.resources import read_text  # pragma: no cover
@@ -61,6 +73,124 @@ licenses = {
 # MIT goes first so it behaves like the default if an empty string is passed
 
 
+Segments = List[Union[str, Tuple[str, str]]]
+"""Compiled form of a template: literal strings and ``(name, placeholder)`` tuples"""
+
+
+class CompiledTemplate(string.Template):
+    """Drop-in replacement for :obj:`string.Template` that parses the template text
+    only once, instead of scanning it with a regular expression in every call to
+    :obj:`~string.Template.substitute` or :obj:`~string.Template.safe_substitute`.
+
+    Templates with invalid placeholders (e.g. a ``$`` not followed by a valid name)
+    are handled by :obj:`string.Template` itself, so the error messages and the
+    results are always the same.
+    """
+
+    def __init__(self, template: str):
+        super().__init__(template)
+        self._compiled: Tuple[Optional[str], Optional[Segments]] = (None, None)
+
+    def compile(self) -> Optional[Segments]:
+        """Segments of the template (``None`` when it has invalid placeholders)"""
+        text, segments = self._compiled
+        if text is not self.template:  # also recompiles if the text is replaced
+            segments = _compile(self.template, self.pattern, self.delimiter)
+            self._compiled = (self.template, segments)
+        return segments
+
+    def render(self, mapping: Mapping[str, Any], safe=True) -> str:
+        """Similar to :obj:`~string.Template.safe_substitute` (or
+        :obj:`~string.Template.substitute` when ``safe`` is false), but receiving
+        a single mapping (e.g. the result of :obj:`prepare`).
+        """
+        segments = self.compile()
+        if segments is None:
+            method = super().safe_substitute if safe else super().substitute
+            return method(mapping)
+
+        parts = []
+        for segment in segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
+            name, placeholder = segment
+            try:
+                parts.append(str(mapping[name]))
+            except KeyError:
+                if not safe:
+                    raise
+                parts.append(placeholder)
+        return "".join(parts)
+
+    def substitute(self, *args, **kwargs) -> str:
+        return self.render(_mapping(args, kwargs), safe=False)
+
+    def safe_substitute(self, *args, **kwargs) -> str:
+        return self.render(_mapping(args, kwargs))
+
+
+def _compile(text: str, pattern, delimiter: str) -> Optional[Segments]:
+    segments: Segments = []
+    start = 0
+    for match in pattern.finditer(text):
+        if match.group("invalid") is not None:
+            return None
+        segments.append(text[start : match.start()])
+        start = match.end()
+        if match.group("escaped") is not None:
+            segments.append(delimiter)
+        else:
+            name = match.group("named") or match.group("braced")
+            segments.append((name, match.group()))
+    segments.append(text[start:])
+    return [s for s in segments if s != ""]
+
+
+def _mapping(args: tuple, kwargs: dict) -> Mapping[str, Any]:
+    if len(args) > 1:
+        raise TypeError("Too many positional arguments")
+    if not args:
+        return kwargs
+    return {**args[0], **kwargs} if kwargs else args[0]
+
+
+def prepare(opts: ScaffoldOpts) -> Mapping[str, str]:
+    """Prepare the options for rendering many templates at once with
+    :obj:`CompiledTemplate.render`.
+
+    The values are converted to strings only once (and only when used by a
+    template), regardless of how many templates are rendered.
+    """
+    return _Prepared(opts)
+
+
+class _Prepared(Dict[str, str]):
+    def __init__(self, opts: ScaffoldOpts):
+        super().__init__()
+        self.opts = opts
+
+    def __missing__(self, key: str) -> str:
+        value = self[key] = str(self.opts[key])
+        return value
+
+
+def compile_template(template: string.Template) -> string.Template:
+    """Compiled version of a :obj:`string.Template` (see :obj:`CompiledTemplate`).
+
+    Subclasses of :obj:`string.Template` (e.g. with custom delimiters or methods),
+    are returned unchanged.
+    """
+    if type(template) is string.Template:
+        return _compile_text(template.template)
+    return template
+
+
+@lru_cache(maxsize=1024)
+def _compile_text(text: str) -> CompiledTemplate:
+    return CompiledTemplate(text)
+
+
 def get_template(
     name: str, relative_to: Union[str, ModuleType] = __name__
 ) -> string.Template:
@@ -109,19 +239,69 @@ def get_template(
     `relative_to=parent` to deal with relative imports.
 
     Returns:
-        :obj:`string.Template`: template
+        :obj:`string.Template`: template (a :obj:`CompiledTemplate`)
+
+    Note:
+        Templates are loaded only once and then cached for the rest of the process
+        (the same object is returned in subsequent calls, so please don't modify it).
+        Use :obj:`clear_cache` if the template files can change during the execution.
 
     .. versionchanged :: 3.3
         New parameter **relative_to**.
     """
-    file_name = f"{name}.template"
     if isinstance(relative_to, ModuleType):
         relative_to = relative_to.__name__
 
-    data = read_text(relative_to, file_name, encoding="utf-8")
+    return _load_template(relative_to, name)
+
+
+@lru_cache(maxsize=None)
+def _load_template(relative_to: str, name: str) -> string.Template:
+    data = read_text(relative_to, f"{name}.template", encoding="utf-8")
     # we assure that line endings are converted to '\n' for all OS
     content = data.replace(os.linesep, "\n")
-    return string.Template(content)
+    return CompiledTemplate(content)
+
+
+def clear_cache():
+    """Invalidate the cache of templates used by :obj:`get_template`"""
+    _load_template.cache_clear()
+    _compile_text.cache_clear()
+
+
+def warm_cache(relative_to: Union[str, ModuleType] = __name__) -> List[str]:
+    """Load (and cache) all the templates available in a package at once.
+
+    Args:
+        relative_to: package object or name where the ``.template`` files are
+            (see :obj:`get_template`). Default value: ``snek.templates``.
+
+    Returns:
+        Names of the loaded templates
+    """
+    if isinstance(relative_to, ModuleType):
+        relative_to = relative_to.__name__
+
+    names = sorted(
+        file[: -len(".template")]
+        for file in _list_resources(relative_to)
+        if file.endswith(".template")
+    )
+    for name in names:
+        _load_template(relative_to, name)
+
+    return names
+
+
+def _list_resources(package: str) -> List[str]:
+    if sys.version_info[:2] >= (3, 9):
+        from importlib.resources import files  # pragma: no cover
+
+        return [file.name for file in files(package).iterdir()]  # pragma: no cover
+
+    from importlib.resources import contents  # pragma: no cover
+
+    return list(contents(package))  # pragma: no cover
 
 
 def setup_cfg(opts: ScaffoldOpts) -> str:
@@ -134,6 +314,8 @@ def setup_cfg(opts: ScaffoldOpts) -> str:
         str: file content as string
     """
 
+    from configupdater import ConfigUpdater
+
     template = get_template("setup_cfg")
 
     # template needs single-line `description`,
@@ -159,10 +341,12 @@ def setup_cfg(opts: ScaffoldOpts) -> str:
     return str(updater)
 
 
-def add_snek(config: ConfigUpdater, opts: ScaffoldOpts) -> ConfigUpdater:
+def add_snek(config: "ConfigUpdater", opts: ScaffoldOpts) -> "ConfigUpdater":
     """Add snek section to a ``setup.cfg``-like file + snek's version +
     extensions and their associated options.
     """
+    from .. import __version__ as snek_version
+
     if "snek" not in config:
         config.add_section("snek")
 
@@ -196,7 +380,13 @@ def parse_extensions(extensions: str) -> Set[str]:
 
 def pyproject_toml(opts: ScaffoldOpts) -> str:
     template = get_template("pyproject_toml")
-    config = toml.loads(template.safe_substitute(opts))
+    return _pyproject_toml(template.safe_substitute(opts))
+
+
+@lru_cache(maxsize=32)
+def _pyproject_toml(text: str) -> str:
+    # the TOML round trip only depends on the rendered text
+    config = toml.loads(text)
     config["build-system"]["requires"] = list(deps.ISOLATED)
     return toml.dumps(config)
 
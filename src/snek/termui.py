@@ -77,9 +77,23 @@ def curses_available():
         return False
 
 
-SYSTEM_SUPPORTS_COLOR = curses_available() or init_colorama()
-"""Handy indicator of the system capabilities (relies on colorama if available)"""
-# Eagerly executed, in order to avoid calling colorama.init multiple times
+globals().pop("SYSTEM_SUPPORTS_COLOR", None)  # ensure `reload` checks it again
+
+
+def __getattr__(name):
+    # ``SYSTEM_SUPPORTS_COLOR`` is a handy indicator of the system capabilities
+    # (relies on colorama if available).
+    # It is computed only once, in order to avoid calling colorama.init multiple
+    # times, but only when needed, since importing curses slows the CLI down.
+    if name != "SYSTEM_SUPPORTS_COLOR":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _system_supports_color()
+
+
+def _system_supports_color() -> bool:
+    if "SYSTEM_SUPPORTS_COLOR" not in globals():
+        globals()["SYSTEM_SUPPORTS_COLOR"] = curses_available() or init_colorama()
+    return globals()["SYSTEM_SUPPORTS_COLOR"]
 
 
 def supports_color(stream=None):
@@ -88,7 +102,7 @@ def supports_color(stream=None):
     Returns:
         bool: result of check
     """
-    return isatty(stream) and SYSTEM_SUPPORTS_COLOR
+    return isatty(stream) and _system_supports_color()
 
 
 def decorate(msg, *styles):
@@ -8,8 +8,6 @@ to swap implementations (e.g. replace `tomlkit`_ with `toml`_).
 """
 from typing import Any, List, MutableMapping, NewType, Tuple, TypeVar, Union, cast
 
-import tomlkit
-
 TOMLMapping = NewType("TOMLMapping", MutableMapping)
 """Abstraction on the value returned by :obj:`loads`.
 
@@ -24,6 +22,8 @@ def loads(text: str) -> TOMLMapping:
     """Parse a string containing TOML into a dict-like object,
     preserving style somehow.
     """
+    import tomlkit  # delayed: parsing TOML is not required by most of the actions
+
     return TOMLMapping(cast(MutableMapping, tomlkit.loads(text)))
 
 
@@ -34,6 +34,8 @@ def dumps(obj: Union[TOMLMapping, dict]) -> str:
     """Serialize a dict-like object into a TOML str,
     If the object was generated via :obj:`loads`, then the style will be preserved.
     """
+    import tomlkit
+
     return tomlkit.dumps(obj)  # type: ignore[arg-type]
     # TODO: Once tomlkit improves dumps' type hints, remove type ignore comment
 
@@ -4,27 +4,21 @@ Functionality to update one snek version to another
 from enum import Enum
 from functools import reduce, wraps
 from itertools import chain
+from pathlib import Path
 from types import SimpleNamespace as Object
-from typing import TYPE_CHECKING, Callable, Iterable, Tuple, cast
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, Set, Tuple, cast
 
-from configupdater import ConfigUpdater
-from packaging.version import Version
-
-from . import __version__ as snek_version
 from . import dependencies as deps
 from . import templates, toml
-from .info import (
-    PYPROJECT_TOML,
-    SETUP_CFG,
-    get_curr_version,
-    read_pyproject,
-    read_setupcfg,
-)
+from .file_system import PathLike, write_atomically
+from .info import PYPROJECT_TOML, SETUP_CFG, read_pyproject, read_setupcfg
 from .log import logger
 from .structure import ScaffoldOpts, Structure
 
 if TYPE_CHECKING:  # pragma: no cover
     # ^  avoid circular dependencies in runtime
+    from configupdater import ConfigUpdater  # <- only needed when updating
+
     from .actions import Action, ActionParams
 
 
@@ -39,9 +33,13 @@ def version_migration(struct: Structure, opts: ScaffoldOpts) -> "ActionParams":
     if not update:
         return struct, opts
 
+    from packaging.version import Version
+
+    from . import __version__ as snek_version
     from .actions import invoke  # delay import to avoid circular dependency error
 
-    curr_version = get_curr_version(opts["project_path"])
+    transaction = UpdateTransaction(opts["project_path"])
+    curr_version = Version(str(transaction.setupcfg["snek"]["version"].value))
 
     # specify how to migrate from one version to another as ordered list
     v4_plan = [
@@ -62,38 +60,109 @@ def version_migration(struct: Structure, opts: ScaffoldOpts) -> "ActionParams":
     )
 
     # replace the old version with the updated one
-    opts["version"] = snek_version
-    return reduce(invoke, plan_actions, (struct, opts))
+    opts = {**opts, "version": snek_version, UpdateTransaction.KEY: transaction}
+    struct, opts = reduce(invoke, plan_actions, (struct, opts))
+    opts = {k: v for k, v in opts.items() if k != UpdateTransaction.KEY}
+
+    transaction.commit(pretend=opts.get("pretend", False))
+    return struct, opts
+
+
+class UpdateTransaction:
+    """``setup.cfg`` and ``pyproject.toml`` documents shared by all the steps of
+    :obj:`version_migration`: each file is parsed at most once and written at most
+    once (atomically, with :obj:`~snek.file_system.write_atomically`), in the end.
+
+    During the migration, the transaction is available to the steps via
+    ``opts[UpdateTransaction.KEY]``. When a step is called on its own (outside of
+    :obj:`version_migration`), it creates and commits its own transaction.
+    """
+
+    KEY = "_update_transaction"
+
+    def __init__(self, project_path):
+        self.project_path = Path(project_path)
+        self._setupcfg: Optional["ConfigUpdater"] = None
+        self._pyproject: Optional[toml.TOMLMapping] = None
+        self._changed: Set[PathLike] = set()
+
+    @classmethod
+    def of(cls, opts: ScaffoldOpts) -> Tuple["UpdateTransaction", bool]:
+        """Return the transaction shared via ``opts`` (or a new one) and a flag
+        indicating if the caller owns it (i.e. has to commit it).
+        """
+        existing = opts.get(cls.KEY)
+        if existing is not None:
+            return existing, False
+        return cls(opts["project_path"]), True
+
+    @property
+    def setupcfg(self) -> "ConfigUpdater":
+        if self._setupcfg is None:
+            self._setupcfg = read_setupcfg(self.project_path)
+        return self._setupcfg
+
+    @setupcfg.setter
+    def setupcfg(self, value: "ConfigUpdater"):
+        self._setupcfg = value
+        self._changed.add(SETUP_CFG)
+
+    def pyproject(self, default: Callable[[], toml.TOMLMapping]) -> toml.TOMLMapping:
+        """Parsed ``pyproject.toml`` (or ``default()`` when the file does not exist)"""
+        if self._pyproject is None:
+            try:
+                self._pyproject = read_pyproject(self.project_path)
+            except FileNotFoundError:
+                self._pyproject = default()
+        self._changed.add(PYPROJECT_TOML)
+        return self._pyproject
+
+    def commit(self, pretend=False):
+        """Write the modified documents (only log the operations when pretending)"""
+        if SETUP_CFG in self._changed:
+            self.setupcfg.validate_format()
+            self._write(SETUP_CFG, str(self.setupcfg), pretend)
+        if PYPROJECT_TOML in self._changed:
+            self._write(PYPROJECT_TOML, toml.dumps(self._pyproject or {}), pretend)
+        self._changed.clear()
+
+    def _write(self, name: str, content: str, pretend: bool):
+        file = self.project_path / name
+        if not pretend:
+            write_atomically(file, content)
+        logger.report("updated", file)
 
 
 def _change_setupcfg(
-    fn: Callable[[ConfigUpdater, ScaffoldOpts], Tuple[ConfigUpdater, ScaffoldOpts]]
+    fn: Callable[["ConfigUpdater", ScaffoldOpts], Tuple["ConfigUpdater", ScaffoldOpts]]
 ) -> Callable[[Structure, ScaffoldOpts], "ActionParams"]:
     @wraps(fn)
     def _wrapped(struct: Structure, opts: ScaffoldOpts) -> "ActionParams":
-        setupcfg = read_setupcfg(opts["project_path"])
-        setupcfg, opts = fn(setupcfg, opts)
-        if not opts["pretend"]:
+        transaction, owned = UpdateTransaction.of(opts)
+        setupcfg, opts = fn(transaction.setupcfg, opts)
+        transaction.setupcfg = setupcfg
+        if owned:
             try:
-                setupcfg.update_file()
+                transaction.commit(pretend=opts["pretend"])
             except Exception:  # pragma: no cover
                 msg = f"Problems with {fn.__name__}. `setup.cfg` content:\n\n"
                 logger.debug(msg + str(setupcfg) + "\n\n")
                 raise
 
-        logger.report("updated", opts["project_path"] / SETUP_CFG)
         return struct, opts
 
     return _wrapped
 
 
 @_change_setupcfg
-def add_entrypoints(setupcfg: ConfigUpdater, opts: ScaffoldOpts):
+def add_entrypoints(setupcfg: "ConfigUpdater", opts: ScaffoldOpts):
     """Add [options.entry_points] to setup.cfg"""
     new_section_name = "options.entry_points"
     if new_section_name in setupcfg:
         return setupcfg, opts
 
+    from configupdater import ConfigUpdater
+
     cfg = ConfigUpdater().read_string(templates.setup_cfg(opts))
     new_section = cfg[new_section_name].detach()
 
@@ -108,9 +177,11 @@ def add_entrypoints(setupcfg: ConfigUpdater, opts: ScaffoldOpts):
 
 
 @_change_setupcfg
-def update_setup_cfg(setupcfg: ConfigUpdater, opts: ScaffoldOpts):
+def update_setup_cfg(setupcfg: "ConfigUpdater", opts: ScaffoldOpts):
     """Update `snek` in setupcfg and ensure some values are there as expected"""
     if "options" not in setupcfg:
+        from configupdater import ConfigUpdater
+
         template = templates.setup_cfg(opts)
         new_section = ConfigUpdater().read_string(template)["options"]
         setupcfg["metadata"].add_after.section(new_section.detach())
@@ -121,7 +192,7 @@ def update_setup_cfg(setupcfg: ConfigUpdater, opts: ScaffoldOpts):
 
 
 @_change_setupcfg
-def add_dependencies(setupcfg: ConfigUpdater, opts: ScaffoldOpts):
+def add_dependencies(setupcfg: "ConfigUpdater", opts: ScaffoldOpts):
     """Add dependencies"""
     # TODO: Revise the need for `deps.RUNTIME` once `python_requires = >= 3.8`
     options = setupcfg["options"]
@@ -138,7 +209,7 @@ def add_dependencies(setupcfg: ConfigUpdater, opts: ScaffoldOpts):
 
 
 @_change_setupcfg
-def replace_find_with_find_namespace(setupcfg: ConfigUpdater, opts: ScaffoldOpts):
+def replace_find_with_find_namespace(setupcfg: "ConfigUpdater", opts: ScaffoldOpts):
     setupcfg["options"].set("packages", "find_namespace:")
     return setupcfg, opts
 
@@ -150,7 +221,7 @@ def replace_find_with_find_namespace(setupcfg: ConfigUpdater, opts: ScaffoldOpts
 
 
 @_change_setupcfg
-def handover_setup_requires(setupcfg: ConfigUpdater, opts: ScaffoldOpts):
+def handover_setup_requires(setupcfg: "ConfigUpdater", opts: ScaffoldOpts):
     """When paired with :obj:`update_pyproject_toml`, this will transfer ``setup.cfg ::
     options.setup_requires`` to ``pyproject.toml :: build-system.requires``
     """
@@ -171,11 +242,10 @@ def update_pyproject_toml(struct: Structure, opts: ScaffoldOpts) -> "ActionParam
     if opts.get("pretend") or not opts.get("isolated_build", True):
         return struct, opts
 
-    try:
-        config = read_pyproject(opts["project_path"])
-    except FileNotFoundError:
-        # We still need to transfer ``setup_requires`` to pyproject.toml
-        config = toml.loads(templates.pyproject_toml(opts))
+    transaction, owned = UpdateTransaction.of(opts)
+    config = transaction.pyproject(lambda: toml.loads(templates.pyproject_toml(opts)))
+    # ^  We still need to transfer ``setup_requires`` to pyproject.toml, when the
+    #    file does not exist
 
     build = config["build-system"]
     existing = deps.add(opts.get("build_deps", []), build.get("requires", []))
@@ -184,6 +254,6 @@ def update_pyproject_toml(struct: Structure, opts: ScaffoldOpts) -> "ActionParam
     toml.setdefault(build, "build-backend", "setuptools.build_meta")
     toml.setdefault(config, "tool.setuptools_scm.version_scheme", "no-guess-dev")
 
-    (opts["project_path"] / PYPROJECT_TOML).write_text(toml.dumps(config), "utf-8")
-    logger.report("updated", opts["project_path"] / PYPROJECT_TOML)
+    if owned:
+        transaction.commit()
     return struct, opts
@@ -0,0 +1,67 @@
+"""Benchmarks of the scaffolding engine.
+
+They are marked as ``slow`` and ``benchmark``, and can be run with::
+
+    SNEK_BENCHMARK_OUTPUT=.benchmarks/$(git rev-parse --short HEAD).json \
+        pytest tests/benchmarks -m benchmark -p no:cacheprovider --no-cov
+
+The results (minimum and median times of each benchmark) are saved as JSON to
+``SNEK_BENCHMARK_OUTPUT``. When ``SNEK_BENCHMARK_BASELINE`` points to the results of
+a previous run (e.g. of another commit), benchmarks slower than the baseline by more
+than ``SNEK_BENCHMARK_TOLERANCE`` (default: 1.5 times) are reported as errors.
+By default only the smaller synthetic structures are used, ``SNEK_BENCHMARK_FULL=1``
+enables all the sizes in :obj:`.helpers.SIZES`.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from . import helpers
+
+_results: dict = {}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def benchmark_results():
+    yield _results
+    if not _results:
+        return
+
+    output = os.getenv(helpers.OUTPUT_ENV)
+    if output:
+        helpers.save(_results, output)
+
+    baseline = os.getenv(helpers.BASELINE_ENV)
+    if baseline:
+        tolerance = float(os.getenv(helpers.TOLERANCE_ENV, 1.5))
+        regressions = helpers.compare(helpers.load(baseline), _results, tolerance)
+        if regressions:
+            pytest.fail("Performance regressions:\n" + "\n".join(regressions))
+
+
+@pytest.fixture
+def benchmark(request):
+    """Time a function, see :obj:`.helpers.Benchmark`"""
+    return helpers.Benchmark(_results, request.node.name)
+
+
+@pytest.fixture
+def fast_dir(monkeypatch):
+    """Working directory in a memory-backed file system (``/dev/shm``) when available,
+    so the benchmarks measure snek and not the disk
+    """
+    shm = Path("/dev/shm")
+    parent = str(shm) if shm.is_dir() and os.access(shm, os.W_OK) else None
+    with tempfile.TemporaryDirectory(prefix="snek-bench-", dir=parent) as tmp:
+        monkeypatch.chdir(tmp)
+        yield Path(tmp)
+
+
+def pytest_generate_tests(metafunc):
+    if "leaves" in metafunc.fixturenames:
+        full = os.getenv("SNEK_BENCHMARK_FULL", "").lower() in ("1", "true")
+        sizes = helpers.SIZES if full else helpers.SIZES[:1]
+        metafunc.parametrize("leaves", sizes)
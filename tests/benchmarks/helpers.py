@@ -0,0 +1,122 @@
+"""Synthetic inputs for the benchmarks"""
+
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from string import Template
+from typing import Callable, Dict, List, Optional
+
+from snek.extensions import Extension
+from snek.operations import no_overwrite
+from snek.structure import Structure
+
+BASELINE_ENV = "SNEK_BENCHMARK_BASELINE"
+"""Environment variable with the path of a JSON file produced by a previous run"""
+
+OUTPUT_ENV = "SNEK_BENCHMARK_OUTPUT"
+"""Environment variable with the path where the results of the run are saved"""
+
+TOLERANCE_ENV = "SNEK_BENCHMARK_TOLERANCE"
+"""Maximum accepted slowdown when comparing with the baseline (default: 1.5 = 50%)"""
+
+SIZES = (1_000, 10_000, 50_000)
+"""Number of leaves of the synthetic structures"""
+
+
+def synthetic_structure(leaves: int, width: int = 10) -> Structure:
+    """Nested structure with the given number of ``leaves``, mixing strings,
+    templates, functions and file ops (``width`` entries per directory)
+    """
+    kinds = [
+        lambda i: f"content {i}\n",
+        lambda i: Template(f"# $name {i}\n"),
+        lambda i: (lambda opts: f"{opts['name']} {i}\n"),
+        lambda i: (f"keep {i}\n", no_overwrite()),
+    ]
+    struct: Structure = {}
+    for i in range(leaves):
+        parent = struct
+        index = i // width
+        while index:
+            index, position = divmod(index, width)
+            parent = parent.setdefault(f"dir{position}", {})
+        parent[f"file{i}.txt"] = kinds[i % len(kinds)](i)
+    return struct
+
+
+def synthetic_extensions(count: int) -> List[Extension]:
+    """Extensions that register actions in different positions of the pipeline"""
+    anchors = ["get_default_options", "define_structure", "create_structure"]
+
+    def _extension(i: int) -> Extension:
+        def _action(struct, opts):
+            return struct, opts
+
+        _action.__name__ = _action.__qualname__ = f"synthetic_action{i}"
+
+        def activate(self, actions):
+            return self.register(actions, _action, after=anchors[i % len(anchors)])
+
+        cls = type(f"Synthetic{i}", (Extension,), {"activate": activate})
+        return cls()
+
+    return [_extension(i) for i in range(count)]
+
+
+class Benchmark:
+    """Minimal timer (no third-party plugin required), storing the results of each
+    benchmark in :obj:`results`
+    """
+
+    def __init__(self, results: Dict[str, dict], name: str):
+        self.results = results
+        self.name = name
+
+    def __call__(
+        self,
+        fn: Callable,
+        *args,
+        rounds: int = 5,
+        setup: Optional[Callable] = None,
+        **kwargs,
+    ):
+        times = []
+        value = None
+        for _ in range(rounds):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            value = fn(*args, **kwargs)
+            times.append(time.perf_counter() - start)
+
+        self.results[self.name] = {
+            "min": min(times),
+            "median": statistics.median(times),
+            "rounds": rounds,
+        }
+        return value
+
+
+def save(results: Dict[str, dict], path: os.PathLike):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    content = {"benchmarks": dict(sorted(results.items()))}
+    Path(path).write_text(json.dumps(content, indent=2) + "\n", encoding="utf-8")
+
+
+def compare(
+    baseline: Dict[str, dict], results: Dict[str, dict], tolerance: float = 1.5
+) -> List[str]:
+    """Benchmarks whose minimum time exceeds ``tolerance`` times the baseline"""
+    regressions = []
+    for name, result in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous and result["min"] > previous["min"] * tolerance:
+            ratio = result["min"] / previous["min"]
+            regressions.append(f"{name}: {ratio:.2f}x slower than the baseline")
+    return regressions
+
+
+def load(path: os.PathLike) -> Dict[str, dict]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))["benchmarks"]
@@ -0,0 +1,68 @@
+import pytest
+
+from snek import actions, structure
+from snek.extensions import list_from_entry_points
+from snek.file_system import MemoryFileSystem, use_backend
+
+from .helpers import synthetic_extensions, synthetic_structure
+
+pytestmark = [pytest.mark.slow, pytest.mark.benchmark]
+
+OPTS = {"name": "bench", "project_path": "bench", "update": False}
+
+
+def test_merge(benchmark, leaves):
+    first, second = synthetic_structure(leaves), synthetic_structure(leaves, width=7)
+    merged = benchmark(structure.merge, first, second)
+    assert merged
+
+
+def test_render_templates(benchmark, leaves):
+    struct = synthetic_structure(leaves)
+    rendered = benchmark(structure.render_templates, struct, OPTS)
+    assert rendered
+
+
+def test_create_structure(benchmark, leaves, fast_dir):
+    struct = synthetic_structure(leaves)
+    opts = {**OPTS, "force": True}
+    changed, _ = benchmark(structure.create_structure, struct, opts, rounds=3)
+    assert changed
+
+
+def test_create_structure_concurrently(benchmark, leaves, fast_dir):
+    struct = synthetic_structure(leaves)
+    opts = {**OPTS, "force": True, "jobs": 4}
+    changed, _ = benchmark(structure.create_structure, struct, opts, rounds=3)
+    assert changed
+
+
+def test_create_structure_in_memory(benchmark, leaves):
+    struct = synthetic_structure(leaves)
+
+    def _create():
+        with use_backend(MemoryFileSystem()) as memory:
+            structure.create_structure(struct, OPTS)
+        return memory
+
+    memory = benchmark(_create, rounds=3)
+    assert len(memory.files) == leaves
+
+
+@pytest.mark.parametrize("count", [10, 100])
+def test_discover(benchmark, count):
+    extensions = synthetic_extensions(count)
+    pipeline = benchmark(actions.discover, extensions)
+    assert len(pipeline) == len(actions.DEFAULT) + count
+
+
+def test_load_extensions(benchmark):
+    extensions = benchmark(list_from_entry_points, rounds=10)
+    assert extensions
+
+
+def test_edit_many_files(benchmark, leaves):
+    struct = synthetic_structure(leaves)
+    header = {"**/*.txt": lambda old, op: (old, op)}
+    edited = benchmark(structure.edit, struct, modify=header, rounds=3)
+    assert len(structure.StructureIndex(edited)) == leaves
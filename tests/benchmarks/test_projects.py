@@ -0,0 +1,50 @@
+import shutil
+
+import pytest
+
+from snek import profiling
+from snek.api import create_project
+from snek.update import version_migration
+
+pytestmark = [pytest.mark.slow, pytest.mark.benchmark]
+
+
+def _create(**kwargs):
+    with profiling.session(None) as profiler:
+        create_project(**kwargs)
+    return profiler.totals()
+
+
+def _remove_project():
+    shutil.rmtree("proj", ignore_errors=True)
+
+
+def test_create_project(benchmark, fast_dir):
+    _create(project_path="proj")  # warm up the caches (e.g. git config)
+    totals = benchmark(_create, project_path="proj", rounds=3, setup=_remove_project)
+    # 2 checks for existing repositories + git init/add/commit
+    assert totals["subprocesses"] == 5
+    assert totals["files_written"] > 0
+
+
+def test_create_project_native_git(benchmark, fast_dir):
+    _create(project_path="proj")
+    kwargs = dict(project_path="proj", native_git=True)
+    totals = benchmark(_create, **kwargs, rounds=3, setup=_remove_project)
+    # only the check for a parent repository, the native writer does the rest
+    assert totals["subprocesses"] == 1
+
+
+def test_update_project(benchmark, fast_dir):
+    create_project(project_path="proj")
+    kwargs = dict(project_path="proj", update=True, force=True)
+    totals = benchmark(_create, **kwargs, rounds=3)
+    # unchanged files are not written again and git is not called
+    assert totals["subprocesses"] == 0
+    assert totals["files_written"] == 0
+
+
+def test_version_migration(benchmark, fast_dir):
+    create_project(project_path="proj")
+    opts = {"project_path": "proj", "update": True}
+    benchmark(version_migration, {}, opts, rounds=10)
@@ -204,6 +204,7 @@ def isolated_logger(request, logger, monkeypatch):
 
     monkeypatch.setattr(logger, "propagate", True)
     monkeypatch.setattr(logger, "nesting", 0)
+    monkeypatch.setattr(logger, "sink", None)
     monkeypatch.setattr(logger, "wrapped", raw_logger)
     monkeypatch.setattr(logger, "handler", new_handler)
     monkeypatch.setattr(logger, "formatter", ReportFormatter())
@@ -226,20 +227,27 @@ def tmpfolder(tmpdir):
 
 @pytest.fixture
 def git_mock(monkeypatch, logger):
+    def _response(args):
+        if "--list" in args:
+            yield "user.name\ngit@mock\0user.email\ngit@mock\0"
+        else:
+            yield "git@mock"
+
     def _git(*args, **kwargs):
         cmd = " ".join(["git"] + list(args))
 
-        logger.report("run", cmd, context=os.getcwd())
+        logger.report("run", cmd, context=kwargs.get("cwd", os.getcwd()))
 
-        def _response():
-            yield "git@mock"
+        return _response(args)
 
-        return _response()
+    async def _git_async(*args, **kwargs):
+        return _git(*args, **kwargs)
 
     def _is_git_repo(folder):
         return Path(folder, ".git").is_dir()
 
     monkeypatch.setattr("snek.shell.git", _git)
+    monkeypatch.setattr("snek.shell.git_async", _git_async)
     monkeypatch.setattr("snek.repo.is_git_repo", _is_git_repo)
 
     yield _git
@@ -319,6 +327,29 @@ def no_isatty(monkeypatch, real_isatty):
     yield
 
 
+@pytest.fixture(autouse=True)
+def fresh_git_snapshot():
+    # The git configuration is probed only once per process (see
+    # `snek.info.git_snapshot`), but tests mock git and change the config files.
+    from snek import info
+
+    info.git_snapshot.cache_clear()
+    yield
+    info.git_snapshot.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_entry_points(fake_home, monkeypatch):
+    # Entry points are indexed in a persistent cache and memoized per process
+    # (see `snek.extensions.iterate_entry_points`), but tests mock them.
+    from snek import extensions
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(Path(fake_home, ".cache")))
+    extensions.clear_entry_point_cache()
+    yield
+    extensions.clear_entry_point_cache()
+
+
 @pytest.fixture
 def orig_isatty(monkeypatch, real_isatty):
     monkeypatch.setattr("snek.termui.isatty", real_isatty)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+from pathlib import Path
+from string import Template
+
+from snek import structure
+from snek.api import create_project
+from snek.extensions import Extension
+from snek.extensions.manifest import MANIFEST_FILE, Manifest, read_manifest
+from snek.file_system import chdir
+from snek.operations import no_overwrite
+from snek.shell import git
+
+
+def add_files(struct, opts):
+    struct = {**struct, "NOTES.txt": ("notes of " + opts["name"], no_overwrite())}
+    return struct, opts
+
+
+class Notes(Manifest):
+    """Manifest extension also generating a file that is never overwritten"""
+
+    def activate(self, actions):
+        actions = self.register(actions, add_files, after="define_structure")
+        return super().activate(actions)
+
+
+def append_to_readme(struct, opts):
+    def _append(template, file_op):
+        return Template(template.template + "\nappendix\n"), file_op
+
+    return structure.modify(struct, "README.rst", _append), opts
+
+
+class Appendix(Extension):
+    """Extension activated after the manifest, changing the contents of a file"""
+
+    def activate(self, actions):
+        return self.register(actions, append_to_readme, before="create_structure")
+
+
+def test_create_project_with_manifest(tmpfolder):
+    # Given options with the manifest extension,
+    opts = dict(project_path="proj", extensions=[Manifest()])
+
+    # when the project is created,
+    create_project(opts)
+
+    # then the manifest contains the generated files
+    manifest = json.loads(Path("proj", MANIFEST_FILE).read_text())
+    entry = manifest["files"]["setup.cfg"]
+    assert set(entry) == {"template", "inputs", "hash"}
+    assert "src/proj/__init__.py" in manifest["files"]
+    assert "manifest" in Path("proj/setup.cfg").read_text()
+
+
+def test_other_actions_see_the_original_contents(tmpfolder):
+    # When an extension changes the contents of a file before they are written,
+    create_project(project_path="proj", extensions=[Manifest(), Appendix()])
+    # then the changes are written and tracked
+    contents = Path("proj/README.rst").read_text()
+    assert contents.endswith("\nappendix\n")
+    entry = read_manifest("proj")["README.rst"]
+    assert entry["hash"] == hashlib.sha256(contents.encode("utf-8")).hexdigest()
+
+
+def test_update_skips_unchanged_files(tmpfolder, caplog):
+    create_project(project_path="proj", extensions=[Manifest()])
+    previous = read_manifest("proj")
+
+    # when the project is updated without changing the inputs,
+    caplog.clear()
+    create_project(project_path="proj", update=True)
+
+    # then the files are not rendered again (the extension is persisted)
+    assert "unchanged    proj/README.rst" in caplog.text
+    assert read_manifest("proj") == previous
+
+
+def test_update_refreshes_pristine_files(tmpfolder):
+    create_project(project_path="proj", name="old", extensions=[Notes()])
+    assert Path("proj/NOTES.txt").read_text() == "notes of old"
+
+    # when the inputs change, files not modified by the user are refreshed
+    # (even if the file op says they should not be overwritten)
+    create_project(project_path="proj", name="new", update=True, extensions=[Notes()])
+    assert Path("proj/NOTES.txt").read_text() == "notes of new"
+
+
+def test_update_keeps_modified_files(tmpfolder):
+    create_project(project_path="proj", name="old", extensions=[Notes()])
+    previous = read_manifest("proj")["NOTES.txt"]
+    Path("proj/NOTES.txt").write_text("my own notes")
+    with chdir("proj"):
+        git("commit", "-am", "Change notes")
+
+    # when the project is updated after the user modified a file,
+    create_project(project_path="proj", name="new", update=True, extensions=[Notes()])
+
+    # then the file is not touched and neither is its manifest entry
+    assert Path("proj/NOTES.txt").read_text() == "my own notes"
+    assert read_manifest("proj")["NOTES.txt"] == previous
+
+
+def test_invalid_manifest(tmpfolder):
+    Path(MANIFEST_FILE).write_text("{not json")
+    assert read_manifest(".") == {}
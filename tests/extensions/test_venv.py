@@ -1,3 +1,6 @@
+import errno
+import os
+import sys
 from argparse import ArgumentError
 from inspect import cleandoc
 from itertools import chain, product
@@ -41,6 +44,10 @@ def test_cli_opts():
     opts = parse("--venv-install", "platformdirs>=1.1,<2", "six")
     assert opts["venv_install"] == ["platformdirs>=1.1,<2", "six"]
     assert [e.name for e in opts["extensions"]] == ["venv"]
+    # venv-wheelhouse
+    opts = parse("--venv-wheelhouse", "wheels")
+    assert opts["venv_wheelhouse"] == Path("wheels")
+    assert [e.name for e in opts["extensions"]] == ["venv"]
     # venv-install but no value
     with pytest.raises((ArgumentError, TypeError, SystemExit)):
         # ^  TypeError happens because argparse tries to iterate over the --config opts
@@ -91,6 +98,107 @@ def test_already_exists(monkeypatch, tmpfolder):
     venv_mock.assert_not_called()
 
 
+def fake_create(path, pretend=False):
+    path = Path(path).resolve()
+    (path / "bin").mkdir(parents=True)
+    (path / "lib").mkdir()
+    (path / "pyvenv.cfg").write_text(f"command = python -m venv {path}\n")
+    (path / "bin/activate").write_text(f'VIRTUAL_ENV="{path}"\n')
+    (path / "bin/activate").chmod(0o755)
+    (path / "bin/python").symlink_to(sys.executable)
+    (path / "lib/module.py").write_text(f"# {path}\n")
+
+
+def test_create_from_cache(monkeypatch, tmpfolder):
+    create = Mock(wraps=fake_create)
+    monkeypatch.setattr(venv, "create", create)
+    opts = {"project_path": Path(tmpfolder), "venv_cache": "cache"}
+
+    # When a venv is created with the cache for the first time,
+    venv.run({}, {**opts, "venv": "first"})
+    # then it is built and cached
+    key = venv.cache_key()
+    assert (Path("cache", key, venv.CACHE_MARKER)).exists()
+    create.assert_called_once()
+
+    # When other venvs are created,
+    _, new_opts = venv.run({}, {**opts, "venv": "second"})
+    # then they are cloned from the cache
+    create.assert_called_once()
+    assert new_opts["_venv_from_cache"]
+    second = Path("second").resolve()
+    assert Path("second/bin/activate").read_text() == f'VIRTUAL_ENV="{second}"\n'
+    assert os.access("second/bin/activate", os.X_OK)
+    assert f"venv {second}" in Path("second/pyvenv.cfg").read_text()
+    assert Path("second/bin/python").resolve() == Path(sys.executable).resolve()
+    assert not Path("second", venv.CACHE_MARKER).exists()
+    # and files that do not need to be relocated are hardlinked
+    module = Path("second/lib/module.py")
+    assert module.samefile(Path("cache", key, "lib/module.py"))
+
+    # Different packages result in a different cache
+    assert venv.cache_key(["pytest"]) != key
+    assert venv.cache_key(["pytest", "six"]) == venv.cache_key(["six", "pytest"])
+
+
+def test_build_cache_concurrently(monkeypatch, tmpfolder):
+    monkeypatch.setattr(venv, "create", fake_create)
+    # When another process already cached the same venv,
+    cached = Path("cache/key")
+    fake_create(cached)
+    venv.build_cache(cached)
+    # then the existing one is kept (and the temporary directory is removed)
+    assert not Path(cached, venv.CACHE_MARKER).exists()
+    assert list(Path("cache").iterdir()) == [cached]
+
+    # but other errors are not hidden
+    def _rename(*_):
+        raise PermissionError(errno.EACCES, os.strerror(errno.EACCES))
+
+    monkeypatch.setattr(os, "rename", _rename)
+    with pytest.raises(PermissionError):
+        venv.build_cache(Path("cache/other"))
+
+
+def test_cache_disabled(monkeypatch, fake_home):
+    assert venv.get_cache_path({}) is None
+    assert venv.get_cache_path({"venv_cache": "dir"}) == Path("dir")
+    default = venv.get_cache_path({"venv_cache": True})
+    assert default and default.name == "venvs"
+    monkeypatch.setattr(venv, "IS_POSIX", False)
+    assert venv.get_cache_path({"venv_cache": True}) is None
+
+
+def test_pip_install_from_wheelhouse(tmpfolder):
+    def fake_pip(*args):
+        return iter(["six==1.16.0", "pytest==7.0.0"] if args == ("freeze",) else [])
+
+    pip = Mock(side_effect=fake_pip)
+    wheelhouse = Path("wheels")
+    wheelhouse.mkdir()
+    offline = ("--no-index", "--find-links", "wheels")
+
+    # When packages are installed from a wheelhouse for the first time,
+    venv.pip_install(pip, ["pytest", "six"], wheelhouse)
+    # then pip is not allowed to access the index
+    assert pip.call_args_list[0][0] == ("install", *offline, "pytest", "six")
+    # and the resolution is recorded
+    lock = venv.lock_file(wheelhouse, ["six", "pytest"])
+    assert lock.parent == wheelhouse / venv.LOCKS_DIR
+    assert lock.read_text() == "six==1.16.0\npytest==7.0.0\n"
+
+    # When the same packages are installed again,
+    pip.reset_mock()
+    venv.pip_install(pip, ["six", "pytest"], wheelhouse)
+    # then the pinned versions are installed without resolving the dependencies
+    pip.assert_called_once_with("install", *offline, "--no-deps", "-r", str(lock))
+
+    # When no wheelhouse is given, the index is used
+    pip.reset_mock()
+    venv.pip_install(pip, ["six"])
+    pip.assert_called_once_with("install", "-U", "six")
+
+
 # ---- Integration tests ----
 
 
@@ -166,6 +274,21 @@ def test_install_packages_no_pip(tmpfolder, monkeypatch):
     assert "pip cannot be found" in str(ex)
 
 
+@pytest.mark.slow
+@pytest.mark.skipif(not venv.IS_POSIX, reason="venv cache only supported in POSIX")
+def test_cached_venv_is_relocated(tmpfolder):
+    cache = Path(str(tmpfolder), "cache")
+    venv.create_from_cache(Path("first"), cache)
+    venv.create_from_cache(Path("second"), cache)
+    rmpath(Path("first"))  # the clone does not depend on other venvs
+
+    python = venv.get_command("python", Path("second"), include_path=False)
+    output = python("-c", "import sys; print(sys.prefix)")
+    assert list(output) == [str(Path("second").resolve())]
+    pip = venv.get_command("pip", Path("second"), include_path=False)
+    assert pip("--version")
+
+
 @pytest.mark.slow
 def test_api_with_venv(tmpfolder):
     venv_path = Path(tmpfolder) / "proj/.venv"
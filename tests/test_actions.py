@@ -1,10 +1,18 @@
+import asyncio
 from pathlib import Path
 
 import pytest
 
-from snek.actions import discover, get_default_options
+from snek.actions import asynchronous, discover, get_default_options
 from snek.actions import init_git as orig_init_git
-from snek.actions import register, unregister, verify_project_dir
+from snek.actions import (
+    init_git_async,
+    invoke,
+    invoke_async,
+    register,
+    unregister,
+    verify_project_dir,
+)
 from snek.api import bootstrap_options
 from snek.exceptions import (
     ActionNotFound,
@@ -168,3 +176,34 @@ def test_unregister_with_undefined_action():
         pipeline = unregister(pipeline, "undefined_action")
     # And the action list should remain the same
     assert pipeline == [orig_init_git]
+
+
+def test_invoke_coroutine_action():
+    async def async_action(struct, opts):
+        await asyncio.sleep(0)
+        return {**struct, "file": "content"}, {**opts, "async": True}
+
+    struct, opts = invoke(({}, {}), async_action)
+    assert struct == {"file": "content"}
+    assert opts["async"] is True
+
+    async def _pipeline():
+        params = await invoke_async(({}, {}), async_action)
+        return await invoke_async(params, custom_action)
+
+    struct, opts = asyncio.run(_pipeline())
+    assert struct == {"file": "content"}
+    assert opts["async"] is True
+
+    async def _in_running_loop():
+        # e.g. in a notebook: the coroutine cannot run in the same loop
+        return invoke(({}, {}), async_action)
+
+    struct, opts = asyncio.run(_in_running_loop())
+    assert struct == {"file": "content"}
+    assert opts["async"] is True
+
+
+def test_asynchronous():
+    pipeline = asynchronous([get_default_options, orig_init_git])
+    assert pipeline == [get_default_options, init_git_async]
@@ -1,3 +1,6 @@
+import asyncio
+import os
+import tarfile
 from os.path import getmtime
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -7,7 +10,13 @@ import pytest
 
 from snek import cli, info, operations, structure, templates
 from snek.actions import get_default_options
-from snek.api import NO_CONFIG, bootstrap_options, create_project
+from snek.api import (
+    NO_CONFIG,
+    bootstrap_options,
+    create_project,
+    create_project_async,
+    create_projects,
+)
 from snek.exceptions import (
     DirectoryAlreadyExists,
     InvalidIdentifier,
@@ -145,6 +154,20 @@ def test_create_project_when_updating(tmpfolder, git_mock):
     assert Path("my-project").exists()
 
 
+def test_create_project_with_force_keeps_unchanged_files(tmpfolder, git_mock):
+    # Given an existing project,
+    create_project(project_path="my-project")
+    files = [p for p in Path("my-project").rglob("*") if p.is_file()]
+    for file in files:
+        os.utime(file, (0, 0))
+    Path("my-project/README.rst").write_text("changed")
+    # when it is created again with --force,
+    create_project(project_path="my-project", force=True)
+    # then only the files with different contents are written
+    written = {f.as_posix() for f in files if getmtime(f) > 0}
+    assert written == {"my-project/README.rst"}
+
+
 def test_create_project_with_license(tmpfolder, git_mock):
     _, opts = get_default_options(
         {}, dict(project_path="my-project", license="BSD-3-Clause")
@@ -197,6 +220,76 @@ def test_pretend_when_updating_does_not_make_changes(tmpfolder):
     assert "MIT License" in tmpfolder.join("proj/LICENSE.txt").read()
 
 
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_create_project_in_running_loop(tmpfolder, jobs):
+    async def _create():
+        return create_project(project_path="proj", jobs=jobs)
+
+    asyncio.run(_create())
+    assert Path("proj/.git").exists()
+
+
+def test_create_project_async(tmpfolder):
+    async def _create_both():
+        return await asyncio.gather(
+            create_project_async(project_path="proj1"),
+            create_project_async(project_path="proj2", license="MPL-2.0"),
+        )
+
+    results = asyncio.run(_create_both())
+    paths = [opts["project_path"] for _, opts in results]
+    assert paths == [Path("proj1"), Path("proj2")]
+    assert "Mozilla" in Path("proj2/LICENSE.txt").read_text()
+    for proj in ("proj1", "proj2"):
+        assert Path(proj, ".git").exists()
+    assert not Path(".git").exists()
+
+
+def test_create_projects(tmpfolder, git_mock):
+    projects = [
+        {"project_path": "proj1"},
+        {"project_path": "proj2", "license": "MPL-2.0"},
+        {"project_path": "missing", "update": True},
+    ]
+    results = create_projects(projects, description="shared description")
+
+    assert [r.project_path for r in results] == ["proj1", "proj2", "missing"]
+    assert [r.ok for r in results] == [True, True, False]
+    assert isinstance(results[2].error, NoSnekProject)
+    for proj in ("proj1", "proj2"):
+        assert "shared description" in Path(proj, "setup.cfg").read_text()
+    assert "Mozilla" in Path("proj2/LICENSE.txt").read_text()
+    assert "MIT" in Path("proj1/LICENSE.txt").read_text()
+
+
+def test_create_projects_honours_pipeline_options(tmpfolder, git_mock):
+    projects = [{"project_path": "proj1", "profile": "proj1.json"}]
+    (result,) = create_projects(projects)
+    assert result.ok
+    # the profile of the job is collected as in create_project
+    assert Path("proj1.json").exists()
+
+
+def test_create_projects_with_archive(tmpfolder, git_mock):
+    projects = [{"project_path": "b1", "archive": "b1.tar.gz"}, {"project_path": "b2"}]
+    results = create_projects(projects)
+    assert all(r.ok for r in results)
+    # the rows of the batch behave like individual calls to create_project
+    assert not Path("b1").exists()
+    with tarfile.open("b1.tar.gz") as archive:
+        assert "b1/setup.cfg" in archive.getnames()
+    assert Path("b2/setup.cfg").exists()
+
+
+def test_create_projects_in_parallel(tmpfolder):
+    projects = [{"project_path": f"proj{i}"} for i in range(3)]
+    results = create_projects(projects, jobs=2)
+    assert all(r.ok for r in results)
+    for i in range(3):
+        assert Path(f"proj{i}/.git").exists()
+        assert Path(f"proj{i}/src/proj{i}/__init__.py").exists()
+
+
 def test_bootstrap_opts_raises_when_updating_non_existing():
     with pytest.raises(NoSnekProject):
         bootstrap_options(project_path="non-existent", update=True)
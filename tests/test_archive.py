@@ -0,0 +1,124 @@
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from snek import archive, cli
+from snek import file_system as fs
+from snek.actions import discover
+from snek.api import create_project
+from snek.extensions.pre_commit import PreCommit
+from snek.extensions.venv import Venv
+from snek.identification import get_id
+from snek.shell import git
+
+
+def test_create_project_in_tar_archive(tmpfolder, git_mock):
+    # When a project is created with the archive option,
+    create_project(project_path="proj", archive="proj.tar.gz")
+
+    # then nothing is written to the disk, except for the archive
+    assert not Path("proj").exists()
+    with tarfile.open("proj.tar.gz") as archive:
+        names = archive.getnames()
+        setup_cfg = archive.extractfile("proj/setup.cfg").read().decode()
+    assert "proj/src/proj/__init__.py" in names
+    assert "name = proj" in setup_cfg
+    # and git is not initialized
+    assert "proj.bundle" not in names
+
+
+def test_create_project_in_zip_archive(tmpfolder, git_mock):
+    create_project(project_path="proj", archive="proj.zip")
+    assert not Path("proj").exists()
+    with zipfile.ZipFile("proj.zip") as archive:
+        assert "proj/src/" in archive.namelist()
+        assert "proj" in archive.read("proj/setup.cfg").decode()
+
+
+@pytest.mark.parametrize("name", ["proj.tar.gz", "proj.zip"])
+def test_archive_members_are_within_the_project(tmpfolder, git_mock, name):
+    create_project(project_path="proj", archive=name)
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(name) as zip_archive:
+            members = zip_archive.namelist()
+            zip_archive.extractall("out")
+    else:
+        with tarfile.open(name) as tar_archive:
+            members = tar_archive.getnames()
+            tar_archive.extractall("out")
+
+    assert members
+    for member in members:
+        path = Path("out", member).resolve()
+        assert Path("out/proj").resolve() in (path, *path.parents), member
+    assert Path("out/proj/setup.cfg").exists()
+
+
+def test_partial_archive_is_removed(tmpfolder, git_mock, monkeypatch):
+    def _fail(struct, opts):
+        raise RuntimeError("something went wrong")
+
+    monkeypatch.setattr(archive, "bundle_git", _fail)
+    with pytest.raises(RuntimeError):
+        create_project(project_path="proj", archive="proj.tar.gz")
+    assert not Path("proj.tar.gz").exists()
+
+
+def test_adapt_removes_actions_that_need_the_disk(caplog):
+    pipeline = discover([Venv(), PreCommit()])
+    adapted = {get_id(a) for a in archive.adapt(pipeline)}
+    assert "snek.extensions.venv:run" not in adapted
+    assert "snek.extensions.pre_commit:install" not in adapted
+    assert "snek.extensions.pre_commit:add_files" in adapted
+    assert "not supported with --archive" in caplog.text
+
+
+def test_archive_with_git_bundle(tmpfolder):
+    create_project(project_path="proj", archive="proj.tar", archive_git=True)
+    with tarfile.open("proj.tar") as archive:
+        archive.extract("proj.bundle")
+
+    # the repository can be cloned from the bundle
+    git("clone", "proj.bundle", "clone")
+    assert Path("clone/setup.cfg").exists()
+    assert not Path("proj").exists()
+
+
+def test_git_bundle_keeps_permissions(tmpfolder):
+    # Given an executable file is written to the archive,
+    opts = {"project_path": "proj", "archive_git": True}
+    with archive.stream("proj.tar", opts):
+        fs.create_directory("proj")
+        fs.create_file("proj/run.sh", "#!/bin/sh\n")
+        fs.chmod("proj/run.sh", 0o755)
+        fs.create_file("proj/README.md", "# proj\n")
+        archive.bundle_git({"run.sh": "", "README.md": ""}, opts)
+
+    # then it is also committed as an executable
+    with tarfile.open("proj.tar") as tar_archive:
+        tar_archive.extract("proj.bundle")
+    git("clone", "proj.bundle", "clone")
+    modes = dict(
+        reversed(line.split()[::3]) for line in git("ls-files", "-s", cwd="clone")
+    )
+    assert modes == {"README.md": "100644", "run.sh": "100755"}
+
+
+def test_archive_is_not_written_when_pretending(tmpfolder, git_mock):
+    Path("proj.tar.gz").write_text("existing")
+    create_project(project_path="proj", archive="proj.tar.gz", pretend=True)
+    assert Path("proj.tar.gz").read_text() == "existing"
+    assert not Path("proj").exists()
+
+
+def test_cli_with_archive_to_stdout(tmpfolder, git_mock, capsysbinary):
+    # the project (i.e. the current directory) can even be non-empty
+    Path("notes.txt").write_text("notes")
+    cli.main(["init", "--archive", "-"])
+    output = capsysbinary.readouterr().out
+    with open("out.tar.gz", "wb") as file:
+        file.write(output)
+    with tarfile.open("out.tar.gz") as archive:
+        assert "setup.cfg" in {Path(n).name for n in archive.getnames()}
@@ -1,12 +1,13 @@
 import logging
 import os
+import subprocess
 import sys
 from unittest.mock import Mock
 
 import pytest
 
 from snek import cli
-from snek.exceptions import ErrorLoadingExtension
+from snek.exceptions import ErrorLoadingExtension, ExtensionNotFound
 from snek.file_system import localize_path as lp
 
 from .log_helpers import find_report
@@ -151,6 +152,78 @@ def test_run(tmpfolder, git_mock):
     assert os.path.exists(sys.argv[1])
 
 
+def test_main_batch(tmpfolder, capsys, git_mock):
+    tmpfolder.join("projects.csv").write(
+        "project_path,extensions,namespace,update\n"
+        "proj1,,,\n"
+        "proj2,namespace no-tox,my.ns,false\n"
+        "missing,,,true\n"
+    )
+    with pytest.raises(SystemExit):
+        cli.main(["batch", "projects.csv"])
+
+    out, err = capsys.readouterr()
+    assert "proj1: ok" in out
+    assert "proj2: ok" in out
+    assert "missing: failed" in out
+    assert "1 of 3 projects failed" in err
+    assert os.path.exists("proj2/src/my/ns/proj2/__init__.py")
+    assert not os.path.exists("proj2/tox.ini")
+    assert os.path.exists("proj1/tox.ini")
+
+
+def test_read_manifest(tmpfolder):
+    tmpfolder.join("projects.json").write(
+        '[{"project_path": "a", "extensions": ["no-tox"]}, {"project_path": "b"}]'
+    )
+    projects = cli.read_manifest("projects.json")
+    assert [p["project_path"] for p in projects] == ["a", "b"]
+    assert [e.name for e in projects[0]["extensions"]] == ["no_tox"]
+    assert projects[1]["extensions"] == []
+
+    tmpfolder.join("wrong.json").write('[{"extensions": ["not-an-extension"]}]')
+    with pytest.raises(ExtensionNotFound):
+        cli.read_manifest("wrong.json")
+
+
+def test_cli_does_not_import_heavy_dependencies():
+    # Parsing the CLI should not require importing the heavy dependencies,
+    # they are only imported by the actions that need them
+    heavy = [
+        "configupdater",
+        "tomlkit",
+        "packaging",
+        "curses",
+        "tracemalloc",
+        "difflib",
+        "multiprocessing",
+        "asyncio",
+        "tarfile",
+    ]
+    code = (
+        "import sys; from snek import cli; cli.parse_args(['init']); "
+        f"print(*(m for m in {heavy!r} if m in sys.modules))"
+    )
+    out = subprocess.check_output([sys.executable, "-c", code], text=True)
+    assert out.strip() == ""
+
+
+def test_cli_discovers_version_lazily(monkeypatch):
+    import importlib.metadata
+
+    import snek
+
+    version = Mock(return_value="42.0")
+    monkeypatch.setattr(importlib.metadata, "version", version)
+    monkeypatch.delitem(vars(snek), "__version__", raising=False)
+    cli.parse_args(["init"])
+    assert version.call_count == 0
+    # The version is only discovered once, when first needed
+    assert snek.__version__ == snek.__version__ == "42.0"
+    assert version.call_count == 1
+    monkeypatch.delitem(vars(snek), "__version__")
+
+
 def test_get_log_level():
     assert cli.get_log_level([]) == logging.WARNING
     assert cli.get_log_level(["--pretend"]) == logging.INFO
@@ -1,5 +1,7 @@
 import argparse
+import os
 import sys
+from unittest.mock import Mock
 
 import pytest
 
@@ -87,6 +89,48 @@ def test_iterate_entry_points():
         assert ext in name_list
 
 
+def test_iterate_entry_points_is_cached(monkeypatch):
+    fake = EntryPoint("fake", "snekext.fake:Fake", "snek.cli")
+    entry_points_mock = Mock(return_value={"snek.cli": [fake]})
+    monkeypatch.setattr(extensions, "entry_points", entry_points_mock)
+
+    # the metadata is scanned at most once per process
+    assert [e.name for e in extensions.iterate_entry_points()] == ["fake"]
+    assert [e.value for e in extensions.iterate_entry_points()] == [fake.value]
+    assert entry_points_mock.call_count == 1
+
+    # and the index is persisted between runs
+    extensions.clear_entry_point_cache()
+    assert [e.name for e in extensions.iterate_entry_points()] == ["fake"]
+    assert entry_points_mock.call_count == 1
+
+
+def test_entry_point_cache_is_invalidated(monkeypatch, tmp_path):
+    fake = EntryPoint("fake", "snekext.fake:Fake", "snek.cli")
+    entry_points_mock = Mock(return_value={"snek.cli": [fake]})
+    monkeypatch.setattr(extensions, "entry_points", entry_points_mock)
+    list(extensions.iterate_entry_points())
+
+    # when sys.path changes (e.g. a new distribution is installed)
+    site_packages = tmp_path / "site-packages"
+    site_packages.mkdir()
+    monkeypatch.setattr(sys, "path", [*sys.path, str(site_packages)])
+    extensions.clear_entry_point_cache()
+    list(extensions.iterate_entry_points())
+    assert entry_points_mock.call_count == 2
+
+    (site_packages / "new_dist-1.0.dist-info").mkdir()  # changes the mtime
+    os.utime(site_packages, (0, 0))
+    extensions.clear_entry_point_cache()
+    list(extensions.iterate_entry_points())
+    assert entry_points_mock.call_count == 3
+
+    # the persistent cache can also be removed explicitly
+    extensions.clear_entry_point_cache(persistent=True)
+    list(extensions.iterate_entry_points())
+    assert entry_points_mock.call_count == 4
+
+
 def test_list_from_entry_points():
     # Should return a list with all the extensions registered in the entrypoints
     ext_list = extensions.list_from_entry_points()
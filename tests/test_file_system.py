@@ -2,6 +2,7 @@ import logging
 import os
 import re
 import stat
+from pathlib import Path
 
 from snek import file_system as fs
 
@@ -50,6 +51,22 @@ def test_create_file(tmpfolder):
     assert tmpfolder.join("a-file.txt").read() == "content"
 
 
+def test_create_file_skip_unchanged(tmpfolder, caplog):
+    caplog.set_level(logging.INFO)
+    file = fs.create_file("a-file.txt", "content\nwith newlines\n")
+    os.utime(file, (0, 0))
+    # When the same content is written again with skip_unchanged,
+    assert fs.create_file(file, "content\nwith newlines\n", skip_unchanged=True) is None
+    # then the file should not be touched
+    assert file.stat().st_mtime == 0
+    assert "unchanged" in caplog.text
+    # But different contents (even with the same size) are written
+    assert fs.create_file(file, "CONTENT\nwith newlines\n", skip_unchanged=True)
+    assert file.read_text() == "CONTENT\nwith newlines\n"
+    assert fs.create_file("other-file.txt", "", skip_unchanged=True)
+    assert Path("other-file.txt").exists()
+
+
 def test_pretend_create_file(tmpfolder, caplog):
     caplog.set_level(logging.INFO)
     fname = uniqstr()  # Use a unique name to get easily identifiable logs
@@ -237,3 +254,81 @@ def test_pretend_rm_rf(tmp_path, caplog):
     # But the operation should be logged
     logs = caplog.text
     assert re.search("remove.+" + dname, logs)
+
+
+def test_write_atomically(tmpfolder):
+    file = Path("file.sh")
+    fs.write_atomically(file, "first\n")
+    assert file.read_text() == "first\n"
+    file.chmod(0o751)
+    fs.write_atomically(file, "second\n")
+    assert file.read_text() == "second\n"
+    assert file.stat().st_mode & 0o777 == 0o751
+    assert not list(Path(".").glob(".file.sh.*.tmp"))  # no leftovers
+
+
+def test_write_atomically_in_memory(tmpfolder):
+    with fs.use_backend(fs.MemoryFileSystem(fallback=fs.DISK)) as memory:
+        fs.write_atomically("file.txt", "content\n")
+        assert fs.backend().read_text(Path("file.txt")) == "content\n"
+    assert not Path("file.txt").exists()
+    assert memory.flush() == [Path("file.txt").resolve()]
+    assert Path("file.txt").read_text() == "content\n"
+
+
+def test_memory_file_system(tmpfolder):
+    memory = fs.MemoryFileSystem()
+    with fs.use_backend(memory):
+        # Given files and directories are created in memory,
+        fs.create_directory("dir")
+        fs.create_file("dir/a.txt", "content\n")
+        fs.chmod("dir/a.txt", stat.S_IRUSR | stat.S_IWUSR | stat.S_IXUSR)
+        fs.create_file("b.txt", "b")
+        fs.rm_rf("b.txt")
+        # then they can be read back
+        assert fs.backend().read_text(Path("dir/a.txt")) == "content\n"
+        assert fs.is_unchanged("dir/a.txt", "content\n")
+        assert not fs.backend().exists(Path("b.txt"))
+        assert fs.backend().mode(Path("dir/a.txt")) & stat.S_IXUSR
+
+    # but nothing touches the disk
+    assert not Path("dir").exists()
+
+    # until they are flushed
+    assert memory.flush() == [Path("dir/a.txt").resolve()]
+    assert Path("dir/a.txt").read_text() == "content\n"
+    assert Path("dir/a.txt").stat().st_mode & stat.S_IXUSR
+    assert not memory.files
+
+
+def test_memory_file_system_fallback(tmpfolder):
+    Path("dir").mkdir()
+    Path("dir/old.txt").write_text("old")
+    memory = fs.MemoryFileSystem(fallback=fs.DISK)
+    with fs.use_backend(memory):
+        # Existing files are visible
+        assert fs.backend().read_text(Path("dir/old.txt")) == "old"
+        # and can be removed (hidden) without touching the disk
+        fs.rm_rf("dir")
+        assert not fs.backend().exists(Path("dir/old.txt"))
+        fs.create_directory("dir")
+        assert not fs.backend().exists(Path("dir/old.txt"))
+        fs.create_file("dir/new.txt", "new")
+
+    assert Path("dir/old.txt").exists()
+    memory.flush()
+    assert [p.name for p in Path("dir").iterdir()] == ["new.txt"]
+
+
+def test_create_project_in_memory(tmpfolder):
+    from snek.api import create_project
+
+    with fs.use_backend(fs.MemoryFileSystem()) as memory:
+        # the default pipeline runs without touching the disk (e.g. no git repo)
+        create_project(project_path="proj")
+
+    assert not Path("proj").exists()
+    assert Path("proj/setup.cfg").resolve() in memory.files
+    assert not any(".git" in p.parts for p in memory.files)
+    memory.flush()
+    assert "proj" in Path("proj/setup.cfg").read_text()
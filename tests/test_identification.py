@@ -47,6 +47,10 @@ def test_levenshtein():
     assert levenshtein(s2, s1) == 2
     s2 = ""
     assert levenshtein(s2, s1) == 4
+    # Stop early when the strings are too different
+    assert levenshtein("born", "burnt", max_distance=1) == 2
+    assert levenshtein("born", "unborn", max_distance=0) == 1
+    assert levenshtein("born", "burnt", max_distance=2) == 2
 
 
 def test_dasherize():
@@ -90,6 +90,33 @@ def test_check_git_installed_and_configured(git_mock):
     info.check_git()
 
 
+def test_git_is_probed_only_once(tmpfolder, fake_home, monkeypatch):
+    calls = []
+    original_git = info.shell.git
+
+    def _git(*args, **kwargs):
+        calls.append(args)
+        return original_git(*args, **kwargs)
+
+    monkeypatch.setattr(info.shell, "git", _git)
+    monkeypatch.delenv("GIT_AUTHOR_NAME", raising=False)
+    monkeypatch.delenv("GIT_AUTHOR_EMAIL", raising=False)
+    info.check_git()
+    assert info.username() == "Jane Doe"
+    assert info.email() == "janedoe@email"
+    assert len(calls) == 1
+
+
+def test_git_snapshot_with_multiline_values(tmpfolder, fake_home):
+    (fake_home / ".gitconfig").write_text(
+        "[user]\n  name = Jane Doe\n  email = janedoe@email\n"
+        '[alias]\n  multi = "!echo 1\\necho 2"\n'
+    )
+    config = info.git_snapshot().config
+    assert config["alias.multi"] == "!echo 1\necho 2"
+    assert config["user.email"] == "janedoe@email"
+
+
 def test_project_without_args(tmpfolder):
     old_args = [
         "my_project",
@@ -211,6 +238,14 @@ def test_best_fit_license():
     assert info.best_fit_license("") == "MIT"
 
 
+def test_best_fit_custom_license(monkeypatch):
+    # When new licenses are registered, they are found (the index is refreshed)
+    assert info.best_fit_license("blue-oak") != "BlueOak-1.0.0"
+    monkeypatch.setitem(templates.licenses, "BlueOak-1.0.0", "license_blueoak")
+    assert info.best_fit_license("blue-oak") == "BlueOak-1.0.0"
+    assert info.best_fit_license("blueoak1.0.0") == "BlueOak-1.0.0"
+
+
 def test_dirty_workspace(tmpfolder):
     project = "my_project"
     struct = {"dummyfile": "NO CONTENT"}
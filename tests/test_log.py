@@ -1,7 +1,9 @@
+import json
 import logging
 import re
 from os import getcwd
 from os.path import abspath
+from pathlib import Path
 
 import pytest
 
@@ -9,6 +11,7 @@ from snek.file_system import localize_path as lp
 from snek.log import (
     DEFAULT_LOGGER,
     ColoredReportFormatter,
+    JSONLinesSink,
     ReportFormatter,
     ReportLogger,
     logger,
@@ -223,6 +226,57 @@ def test_reconfigure(monkeypatch, caplog, uniq_raw_logger):
     assert not re.search(ansi_pattern("some2") + ".+" + name, caplog.text)
 
 
+def test_report_disabled(uniq_raw_logger):
+    # Given a logger that does not show INFO messages,
+    new_logger = ReportLogger(uniq_raw_logger)
+    new_logger.level = logging.WARNING
+    # when report is called, then nothing is even created (e.g. buffered)
+    with new_logger.buffered() as records:
+        assert new_logger.report("create", uniqstr()) is None
+        new_logger.info(uniqstr())
+    assert records == []
+    # unless the level requires it
+    with new_logger.buffered() as records:
+        new_logger.report("remove", uniqstr(), level=logging.ERROR)
+    assert len(records) == 1
+
+
+def test_json_lines_sink(tmpfolder, uniq_raw_logger):
+    # Given a logger with a sink, that does not show INFO messages,
+    sink = JSONLinesSink("events.jsonl")
+    new_logger = ReportLogger(uniq_raw_logger, sink=sink)
+    new_logger.level = logging.WARNING
+    # when events are reported,
+    new_logger.report("invoke", "action")
+    with new_logger.indent():
+        with new_logger.buffered() as records:
+            new_logger.report("create", tmpfolder / "file", target="dir")
+        new_logger.replay(records)
+    new_logger.sink = None  # closes the sink
+    # then they are written as JSON lines
+    lines = Path("events.jsonl").read_text().splitlines()
+    events = [json.loads(line) for line in lines]
+    assert [(e["activity"], e["nesting"]) for e in events] == [
+        ("invoke", 0),
+        ("create", 1),
+    ]
+    assert events[1]["subject"] == str(tmpfolder / "file")
+    assert events[1]["target"] == "dir"
+    assert events[0]["context"] is None
+    assert events[0]["timestamp"] <= events[1]["timestamp"]
+    assert all(e["duration"] >= 0 for e in events)
+
+
+def test_reconfigure_log_events(tmpfolder, uniq_raw_logger):
+    new_logger = ReportLogger(uniq_raw_logger)
+    new_logger.reconfigure(log_events="events.jsonl")
+    new_logger.report("run", "command", context="dir")
+    new_logger.sink.close()
+    event = json.loads(Path("events.jsonl").read_text())
+    assert event["activity"] == "run"
+    assert event["context"] == "dir"
+
+
 def test_other_methods(caplog):
     # Given the logger level is properly set,
     caplog.set_level(logging.DEBUG)
@@ -0,0 +1,134 @@
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from snek import native_git, repo, shell, structure
+from snek.file_system import chdir
+from snek.operations import add_permissions
+
+STRUCT = {
+    "README.rst": "Hello World!\n",
+    "setup.py": "from setuptools import setup\nsetup()\n",
+    "src": {
+        "pkg": {
+            "__init__.py": "",
+            "cli.py": ("#!/usr/bin/env python\n", add_permissions(stat.S_IXUSR)),
+        },
+        "pkg-data.txt": "data",
+    },
+    "docs": {"_static": {".gitignore": "\n"}, "index.rst": "Ünïcödé\n"},
+}
+
+
+@pytest.fixture
+def fixed_date(monkeypatch):
+    for role in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{role}_DATE", "1600000000 +0200")
+
+
+def git(project, *args):
+    with chdir(project):
+        return list(shell.git(*args))
+
+
+def create(project):
+    changed, _ = structure.create_structure(STRUCT, {"project_path": project})
+    return changed
+
+
+def test_init_commit_repo_is_identical_to_git_cli(tmpfolder, fixed_date):
+    repo.init_commit_repo("cli", create("cli"))
+    sha = native_git.init_commit_repo("native", create("native"))
+
+    assert git("native", "rev-parse", "HEAD") == git("cli", "rev-parse", "HEAD")
+    assert git("native", "rev-parse", "HEAD") == [sha]
+    assert git("native", "symbolic-ref", "HEAD") == git("cli", "symbolic-ref", "HEAD")
+    assert git("native", "ls-files", "-s") == git("cli", "ls-files", "-s")
+    assert git("native", "status", "--porcelain") == []
+    reflog = git("native", "log", "-g", "--format=%gs")
+    assert reflog == ["commit (initial): Initial commit"]
+    git("native", "fsck", "--strict")
+    for file in ("config", "HEAD", "description", "info/exclude", "COMMIT_EDITMSG"):
+        native = Path("native/.git", file).read_text()
+        assert native == Path("cli/.git", file).read_text()
+
+
+def test_init_commit_repo_respects_default_branch(tmpfolder, fixed_date):
+    config = {"init.defaultbranch": "main", "user.name": "Jane", "user.email": "j@e"}
+    native_git.init_commit_repo("native", create("native"), config=config)
+    assert git("native", "symbolic-ref", "HEAD") == ["refs/heads/main"]
+    assert git("native", "log", "--format=%an <%ae>") == ["Jane <j@e>"]
+
+
+def test_pretend_init_commit_repo(tmpfolder):
+    struct = create("native")
+    assert native_git.init_commit_repo("native", struct, pretend=True) is None
+    assert not Path("native/.git").exists()
+
+
+def test_unsupported_config(tmpfolder):
+    project = "native"
+    struct = create(project)
+    config = {"user.name": "Jane", "user.email": "j@e", "commit.gpgsign": "true"}
+    with pytest.raises(native_git.Unsupported):
+        native_git.init_commit_repo(project, struct, config=config)
+    assert not Path(project, ".git").exists()
+
+    config["commit.gpgsign"] = "false"
+    native_git.init_commit_repo(project, struct, config=config)
+    assert Path(project, ".git").exists()
+
+
+def test_unknown_identity(tmpfolder):
+    struct = create("native")
+    with pytest.raises(native_git.Unsupported):
+        native_git.init_commit_repo("native", struct, config={}, env={})
+
+
+def test_repo_falls_back_to_git_cli(tmpfolder, fake_home):
+    (fake_home / ".gitconfig").write_text(
+        "[user]\n  name = Jane Doe\n  email = janedoe@email\n"
+        "[include]\n  path = ~/.other-gitconfig\n"
+    )
+    repo.init_commit_repo("project", create("project"), native=True)
+    assert git("project", "log", "--format=%an") == ["Jane Doe"]
+    assert Path("project/.git/hooks").exists()  # created by git CLI
+
+
+def test_parse_config():
+    text = r"""
+    # comment
+    [user]
+        name = "Jane \"JD\" Doe" ; comment
+        email = jane@doe
+    [init]defaultBranch = main
+    [core]
+        bare
+    [url "git@github.com:"]
+        insteadOf = https://github.com/
+    """
+    config = native_git.parse_config(text)
+    assert config == {
+        "user.name": 'Jane "JD" Doe',
+        "user.email": "jane@doe",
+        "init.defaultbranch": "main",
+        "core.bare": "true",
+        "url.git@github.com:.insteadof": "https://github.com/",
+    }
+
+
+def test_find_git_dir(tmpfolder):
+    assert native_git.find_git_dir("project") is None
+    native_git.init_commit_repo("project", create("project"))
+    nested = Path("project", "src", "pkg")
+    assert native_git.find_git_dir(nested) == Path("project/.git").resolve()
+
+
+def test_index_keeps_executable_bit(tmpfolder):
+    native_git.init_commit_repo("project", create("project"))
+    entries = dict(line.split("\t")[::-1] for line in git("project", "ls-files", "-s"))
+    assert entries["src/pkg/cli.py"].startswith("100755")
+    assert entries["README.rst"].startswith("100644")
+    assert os.access("project/src/pkg/cli.py", os.X_OK)
@@ -123,3 +123,32 @@ def test_add_permissions(tmpfolder):
             # ^  windows executables work in a complete different way, so we just do a
             #    basic test with writeable access, just for the sake of completeness
             assert stat.S_IMODE(path.stat().st_mode) == 0o666
+
+
+def test_create_skips_unchanged_files_on_update(tmpfolder):
+    path = uniqpath()
+    assert create(path, "contents", {}) == path
+    os.utime(path, (0, 0))
+    # Unchanged files are not written during updates
+    assert create(path, "contents", {"update": True}) is None
+    assert path.stat().st_mtime == 0
+    # Unless explicitly asked
+    assert create(path, "contents", {"update": True, "skip_unchanged": False}) == path
+    assert path.stat().st_mtime > 0
+    # Changed files are always written
+    assert create(path, "other contents", {"update": True}) == path
+    assert path.read_text() == "other contents"
+
+
+def test_add_permissions_skips_unchanged_files_on_update(tmpfolder, caplog):
+    path = uniqpath()
+    executable = add_permissions(stat.S_IXUSR)
+    assert executable(path, "contents", {}) == path
+    caplog.clear()
+    # Neither the contents nor the mode change, so nothing is reported
+    assert executable(path, "contents", {"update": True}) is None
+    assert "chmod" not in caplog.text
+    # Changing only the mode is still reported
+    path.chmod(0o644)
+    assert executable(path, "contents", {"update": True}) == path
+    assert stat.S_IMODE(path.stat().st_mode) & stat.S_IXUSR
@@ -0,0 +1,57 @@
+import json
+from functools import reduce
+from pathlib import Path
+
+from snek import profiling, shell
+from snek.actions import invoke
+from snek.api import create_project
+from snek.file_system import create_file
+
+
+def write_files(struct, opts):
+    create_file("a.txt", "a")
+    create_file("b.txt", "b", pretend=True)
+    return struct, opts
+
+
+def run_echo(struct, opts):
+    shell.ShellCommand("echo")("hello")
+    return reduce(invoke, [write_files, write_files], (struct, opts))
+
+
+def test_session(tmpfolder, capsys):
+    with profiling.session("profile.json") as profiler:
+        reduce(invoke, [write_files, run_echo], ({}, {}))
+
+    records = profiler.records
+    assert [(r["action"], r["depth"]) for r in records] == [
+        ("tests.test_profiling:write_files", 0),
+        ("tests.test_profiling:run_echo", 0),
+        ("tests.test_profiling:write_files", 1),
+        ("tests.test_profiling:write_files", 1),
+    ]
+    assert [r["files_written"] for r in records] == [1, 2, 1, 1]
+    assert [r["subprocesses"] for r in records] == [0, 1, 0, 0]
+    assert records[1]["wall_time"] >= records[2]["wall_time"] + records[3]["wall_time"]
+    assert profiler.totals()["files_written"] == 3
+
+    saved = json.loads(Path("profile.json").read_text())
+    assert saved["actions"] == records
+    _, err = capsys.readouterr()
+    assert "  tests.test_profiling:write_files" in err
+    assert "TOTAL" in err
+
+
+def test_no_session():
+    with profiling.measure("action") as record:
+        profiling.count("subprocesses")
+    assert record is None
+
+
+def test_create_project_with_profile(tmpfolder, git_mock, capsys):
+    create_project(project_path="proj", profile=True)
+    saved = json.loads(Path(profiling.DEFAULT_FILE).read_text())
+    actions = {r["action"]: r for r in saved["actions"]}
+    assert actions["snek.structure:create_structure"]["files_written"] > 0
+    _, err = capsys.readouterr()
+    assert "snek.actions:init_git" in err
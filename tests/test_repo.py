@@ -1,3 +1,5 @@
+import asyncio
+import logging
 import os
 import subprocess
 import sys
@@ -6,6 +8,7 @@ from pathlib import Path
 import pytest
 
 from snek import actions, api, cli, repo, shell, structure, toml
+from snek.exceptions import ShellCommandException
 from snek.file_system import chdir, move, rm_rf
 
 
@@ -24,6 +27,17 @@ def test_init_commit_repo(tmpfolder):
         assert Path(".git").exists()
 
 
+def test_init_commit_repo_async(tmpfolder):
+    struct = {"my_file": "Some content", "my_dir": {"my_file": "More content"}}
+    structure.create_structure(struct, {"project_path": "proj"})
+    asyncio.run(repo.init_commit_repo_async("proj", struct))
+    assert Path("proj/.git").exists()
+    assert not Path(".git").exists()  # the working dir was not changed
+    with chdir("proj"):
+        files = list(shell.git("ls-files"))
+    assert sorted(files) == ["my_dir/my_file", "my_file"]
+
+
 def test_pretend_init_commit_repo(tmpfolder):
     with tmpfolder.mkdir("my_porject").as_cwd():
         struct = {
@@ -47,6 +61,98 @@ def test_init_commit_repo_with_wrong_structure(tmpfolder):
         repo.init_commit_repo(project, struct)
 
 
+def test_git_tree_add_in_a_single_call(tmpfolder, monkeypatch):
+    struct = {
+        "my_file": "Some other content",
+        "my_dir": {"my_file": "Some more content", "other file": "Spaces!"},
+    }
+    structure.create_structure(struct, {})
+    shell.git("init")
+
+    calls = []
+    orig_git = shell.git
+
+    def _git(*args, **kwargs):
+        calls.append(args)
+        return orig_git(*args, **kwargs)
+
+    monkeypatch.setattr(shell, "git", _git)
+    assert repo.git_tree_add(struct) == 3
+    assert len(calls) == 1
+
+    staged = set(orig_git("diff", "--cached", "--name-only"))
+    assert staged == {"my_file", "my_dir/my_file", "my_dir/other file"}
+
+
+def test_git_tree_add_fallback_for_old_git(tmpfolder, monkeypatch):
+    struct = {"my_file": "Some content", "my_dir": {"my_file": "Some more content"}}
+    structure.create_structure(struct, {})
+    shell.git("init")
+
+    calls = []
+    orig_git = shell.git
+
+    def _git(*args, **kwargs):
+        calls.append(args)
+        if "--pathspec-from-file=-" in args:
+            raise ShellCommandException("unknown option `pathspec-from-file=-'")
+        return orig_git(*args, **kwargs)
+
+    monkeypatch.setattr(shell, "git", _git)
+    assert repo.git_tree_add(struct) == 2
+    assert len(calls) == 2
+    staged = set(orig_git("diff", "--cached", "--name-only"))
+    assert staged == {"my_file", "my_dir/my_file"}
+
+
+def test_git_tree_add_fallback_does_not_report_negative_savings(
+    tmpfolder, monkeypatch, caplog
+):
+    caplog.set_level(logging.INFO)
+    structure.create_structure({"my_file": "Some content"}, {})
+    shell.git("init")
+    orig_git = shell.git
+
+    def _git(*args, **kwargs):
+        if "--pathspec-from-file=-" in args:
+            raise ShellCommandException("unknown option `pathspec-from-file=-'")
+        return orig_git(*args, **kwargs)
+
+    monkeypatch.setattr(shell, "git", _git)
+    assert repo.git_tree_add({"my_file": "Some content"}) == 1
+    assert "1 files (0 git subprocesses saved)" in caplog.text
+
+
+def test_git_tree_add_raises_other_errors(tmpfolder, monkeypatch):
+    def _git(*args, **kwargs):
+        raise ShellCommandException("fatal: not a git repository")
+
+    monkeypatch.setattr(shell, "git", _git)
+    with pytest.raises(ShellCommandException, match="not a git repository"):
+        repo.git_tree_add({"my_file": "Some content"})
+
+
+def test_git_tree_add_async_fallback_for_old_git(tmpfolder, monkeypatch):
+    struct = {"my_file": "Some content", "my_dir": {"my_file": "Some more content"}}
+    structure.create_structure(struct, {"project_path": "proj"})
+    shell.git("init", cwd="proj")
+
+    calls = []
+    orig_git_async = shell.git_async
+
+    async def _git_async(*args, **kwargs):
+        calls.append(args)
+        if "--pathspec-from-file=-" in args:
+            raise ShellCommandException("unknown option `pathspec-from-file=-'")
+        return await orig_git_async(*args, **kwargs)
+
+    monkeypatch.setattr(shell, "git_async", _git_async)
+    assert asyncio.run(repo.git_tree_add_async(struct, cwd="proj")) == 2
+    assert len(calls) == 2
+    staged = set(shell.git("diff", "--cached", "--name-only", cwd="proj"))
+    assert staged == {"my_file", "my_dir/my_file"}
+
+
 def test_add_tag(tmpfolder):
     project = "my_project"
     struct = {
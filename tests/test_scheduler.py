@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from pathlib import Path
+
+from snek import scheduler
+from snek.actions import declare
+from snek.api import create_project
+from snek.log import logger
+
+
+def undeclared(struct, opts):
+    return struct, {**opts, "order": opts.get("order", []) + ["undeclared"]}
+
+
+@declare(reads={"opts.a"}, writes={"opts.b"})
+def first(struct, opts):
+    return struct, {**opts, "b": opts["a"] + 1}
+
+
+@declare(reads={"opts.b"}, writes={"opts.c"})
+def second(struct, opts):
+    return struct, {**opts, "c": opts["b"] + 1}
+
+
+@declare(reads={"opts.a"}, writes={"opts.d"})
+def third(struct, opts):
+    return struct, {**opts, "d": opts["a"] * 10, "ignored": True}
+
+
+def test_dependencies():
+    pipeline = [undeclared, first, second, third, undeclared]
+    assert scheduler.dependencies(pipeline) == [
+        set(),
+        {0},
+        {0, 1},  # second reads what first produces
+        {0},  # third is independent of first and second
+        {0, 1, 2, 3},  # barrier
+    ]
+    assert scheduler.conflict(declare(writes={"opts"})(lambda s, o: (s, o)), first)
+    assert not scheduler.conflict(first, third)
+
+
+def test_run_merges_declared_results():
+    pipeline = [undeclared, first, second, third]
+    struct, opts = asyncio.run(scheduler.run(pipeline, ({}, {"a": 1}), jobs=4))
+    assert (opts["b"], opts["c"], opts["d"]) == (2, 3, 10)
+    assert opts["order"] == ["undeclared"]
+    # only the declared writes are kept
+    assert "ignored" not in opts
+
+
+def test_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    @declare(writes={"opts.x"})
+    def wait_x(struct, opts):
+        barrier.wait()  # would time out if the actions run sequentially
+        return struct, {**opts, "x": 1}
+
+    @declare(writes={"opts.y"})
+    async def wait_y(struct, opts):
+        await asyncio.get_running_loop().run_in_executor(None, barrier.wait)
+        return struct, {**opts, "y": 2}
+
+    _, opts = asyncio.run(scheduler.run([wait_x, wait_y], ({}, {}), jobs=2))
+    assert (opts["x"], opts["y"]) == (1, 2)
+
+
+def test_logs_in_pipeline_order(caplog):
+    event = threading.Event()
+
+    @declare(writes={"opts.x"})
+    def slow(struct, opts):
+        event.wait(5)
+        logger.report("run", "slow")
+        return struct, opts
+
+    @declare(writes={"opts.y"})
+    def fast(struct, opts):
+        logger.report("run", "fast")
+        event.set()
+        return struct, opts
+
+    asyncio.run(scheduler.run([slow, fast], ({}, {}), jobs=2))
+    assert caplog.text.index("slow") < caplog.text.index("fast")
+
+
+def test_create_project_with_jobs(tmpfolder, git_mock):
+    _, opts = create_project(project_path="proj", jobs=2)
+    assert Path("proj/setup.cfg").exists()
+    assert opts["project_path"] == Path("proj")
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 import re
@@ -27,6 +28,34 @@ def test_ShellCommand(tmpfolder):
     assert Path("my-file.txt").exists()
 
 
+def test_AsyncShellCommand(tmpfolder, caplog):
+    caplog.set_level(logging.INFO)
+    python = shell.ShellCommand(sys.executable).to_async()
+    code = "import os, sys; print(os.getcwd()); print(sys.stdin.read())"
+
+    async def _run_concurrently():
+        os.mkdir("subdir")
+        return await asyncio.gather(
+            python("-c", code, cwd="subdir", input="Hello stdin"),
+            python("-c", "print('Hello World')", shell=False),
+            python("-c", "import sys; sys.exit('Failed!')"),
+            return_exceptions=True,
+        )
+
+    first, second, third = asyncio.run(_run_concurrently())
+    assert list(first) == [str(Path("subdir").resolve()), "Hello stdin"]
+    assert list(second) == ["Hello World"]
+    assert isinstance(third, shell.ShellCommandException)
+    assert "Failed!" in str(third)
+    assert Path.cwd().name != "subdir"  # the working dir never changes
+
+    # Pretend
+    touch = shell.ShellCommand("touch").to_async()
+    asyncio.run(touch("my-file.txt", pretend=True))
+    assert not Path("my-file.txt").exists()
+    assert re.search(r"run.*touch\smy-file.txt", caplog.text)
+
+
 def test_shell_command_error2exit_decorator():
     @shell.shell_command_error2exit_decorator
     def func(_):
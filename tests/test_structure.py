@@ -1,5 +1,7 @@
+import logging
 from os.path import isdir, isfile
 from pathlib import Path
+from string import Template
 
 import pytest
 
@@ -215,3 +217,211 @@ def test_reject_without_file():
     assert len(struct["a"]["b"]["c"]) == 1
     assert len(struct["a"]["b"]) == 1
     assert len(struct["a"]) == 1
+
+
+def test_structural_sharing():
+    # Given a nested struct,
+    template = Template("${name}")
+    orig = {"a": {"b": {"c": "0"}, "d": {"e": template}}, "f": {"g": "1"}}
+    # when it is modified with the structure manipulation functions,
+    modified = structure.ensure(orig, "a/b/x", "2")
+    rejected = structure.reject(orig, "a/b/c")
+    merged = structure.merge(orig, {"a": {"b": {"y": "3"}}})
+    # then the original struct should not change
+    assert orig == {"a": {"b": {"c": "0"}, "d": {"e": template}}, "f": {"g": "1"}}
+    for struct in (modified, rejected, merged):
+        # and only the path to the changed node should be copied,
+        assert struct is not orig
+        assert struct["a"] is not orig["a"]
+        assert struct["a"]["b"] is not orig["a"]["b"]
+        # while the remaining nodes are shared
+        assert struct["a"]["d"] is orig["a"]["d"]
+        assert struct["f"] is orig["f"]
+        assert struct["a"]["d"]["e"] is template
+
+
+def test_merge_does_not_share_dirs_with_new():
+    new = {"a": {"b": {"c": "0"}}}
+    merged = structure.merge({}, new)
+    assert merged == new
+    assert merged["a"] is not new["a"]
+    assert merged["a"]["b"] is not new["a"]["b"]
+
+
+def test_create_structure_concurrently(tmpfolder, caplog):
+    caplog.set_level(logging.INFO)
+    struct = {
+        "my_file": "Some content",
+        "my_folder": {
+            "my_dir_file": Template("Hello ${name}"),
+            "empty_file": "",
+            "file_not_created": None,
+            "nested": {f"file{i}": str(i) for i in range(20)},
+        },
+        "empty_folder": {},
+        "last_file": ("Never written", operations.skip_on_update()),
+    }
+    opts = {"project_path": "serial", "name": "World", "update": True}
+    expected, _ = structure.create_structure(struct, opts)
+    serial_logs = [r.subject for r in caplog.records if hasattr(r, "subject")]
+    caplog.clear()
+
+    opts = {**opts, "project_path": "concurrent", "jobs": 4}
+    changed, _ = structure.create_structure(struct, opts)
+    logs = [r.subject for r in caplog.records if hasattr(r, "subject")]
+
+    assert changed == expected
+    assert list(changed) == list(expected)  # same order
+    assert "last_file" not in changed
+    assert Path("concurrent/my_folder/my_dir_file").read_text() == "Hello World"
+    assert len(list(Path("concurrent/my_folder/nested").iterdir())) == 20
+    # Directories are logged first, but files keep the order of the structure
+    serial_files = [Path(p).relative_to("serial") for p in serial_logs]
+    files = [Path(p).relative_to("concurrent") for p in logs]
+    assert sorted(files) == sorted(serial_files)
+    assert [f for f in files if f.name.startswith("file")] == [
+        f for f in serial_files if f.name.startswith("file")
+    ]
+
+
+def test_create_structure_concurrently_with_wrong_type(tmpfolder):
+    with pytest.raises(TypeError):
+        struct = {"a": {"strange_thing": 1}, "b": "ok"}
+        structure.create_structure(struct, {"jobs": 2})
+
+
+def test_create_structure_does_not_report_unchanged_files(tmpfolder):
+    struct = {"my_file": "Some content", "my_folder": {"my_dir_file": "Other content"}}
+    structure.create_structure(struct, {})
+    struct = structure.ensure(struct, "my_folder/my_dir_file", "Changed content")
+    changed, _ = structure.create_structure(struct, {"update": True, "force": True})
+    assert changed == {"my_folder": {"my_dir_file": "Changed content"}}
+
+
+def test_create_structure_diff(tmpfolder, capsys):
+    # Given an existing project
+    struct = {
+        "a": "first\nsecond\n",
+        "b": "same\n",
+        "dir": {"c": ("exists\n", NO_OVERWRITE), "d": "new\n"},
+    }
+    opts = {"project_path": "proj", "update": True}
+    structure.create_structure(struct, opts)
+    mtimes = {p: p.stat().st_mtime_ns for p in Path("proj").glob("**/*")}
+    # when its diff is computed against a modified structure
+    new = {**struct, "a": "first\nchanged\n", "e": "added"}
+    new["dir"] = {**struct["dir"], "c": ("other\n", NO_OVERWRITE)}
+    changed, _ = structure.create_structure(new, {**opts, "diff": "out.diff"})
+    # then only the files that would change are considered,
+    assert changed == {"a": "first\nchanged\n", "dir": {}, "e": "added"}
+    text = Path("out.diff").read_text()
+    assert "--- a/a\n+++ b/a\n@@ -1,2 +1,2 @@\n first\n-second\n+changed\n" in text
+    assert "--- /dev/null\n+++ b/e\n@@ -0,0 +1 @@\n+added\n" in text
+    assert "b/b" not in text and "dir/c" not in text
+    assert text.index("b/a") < text.index("b/e")  # same order as the structure
+    # and nothing is written to the disk
+    assert {p: p.stat().st_mtime_ns for p in Path("proj").glob("**/*")} == mtimes
+
+    # the diff can also be printed
+    structure.create_structure(new, {**opts, "diff": True})
+    assert capsys.readouterr().out == text
+
+
+def test_structure_index():
+    struct = {
+        "src": {"pkg": {"__init__.py": "init", "mod.py": "mod", "data.txt": "data"}},
+        "tests": {"test_mod.py": "test", "empty": {}},
+        "README.md": "readme",
+    }
+    index = structure.StructureIndex(struct)
+    assert index.to_struct() == struct
+    assert "src/pkg/mod.py" in index and index.is_dir("tests/empty")
+    assert index["src/pkg/mod.py"] == "mod"
+
+    # glob-style selection
+    assert index.select("src/**/*.py") == ["src/pkg/__init__.py", "src/pkg/mod.py"]
+    assert index.select("**/*.py") == [
+        "src/pkg/__init__.py",
+        "src/pkg/mod.py",
+        "tests/test_mod.py",
+    ]
+    assert index.select("*.md") == ["README.md"]
+
+    # edits in place
+    index.ensure("src/pkg/new/a.py", "a").reject("tests")
+    index.modify("README.md", lambda old, op: (old + "!", NO_OVERWRITE))
+    assert index.to_struct() == {
+        "src": {
+            "pkg": {
+                "__init__.py": "init",
+                "mod.py": "mod",
+                "data.txt": "data",
+                "new": {"a.py": ("a", operations.create)},
+            }
+        },
+        "README.md": ("readme!", NO_OVERWRITE),
+    }
+    with pytest.raises(NotADirectoryError):
+        index.ensure("README.md/a.py", "a")
+    with pytest.raises(ValueError):
+        index.reject("")
+
+
+def test_structure_index_sharing():
+    orig = {"a": {"b": {"c": "0"}, "d": {"e": "1"}}, "f": {"g": "2"}}
+    index = structure.StructureIndex(orig)
+    index.ensure("a/b/x", "3").reject("a/b/c")
+    struct = index.to_struct()
+    # only the path to the changed nodes is copied,
+    assert orig == {"a": {"b": {"c": "0"}, "d": {"e": "1"}}, "f": {"g": "2"}}
+    assert struct["a"]["b"] == {"x": ("3", operations.create)}
+    assert struct["a"]["d"] is orig["a"]["d"] and struct["f"] is orig["f"]
+    # and the structures returned before are not changed by later edits
+    index.reject("f").ensure("a/b/y", "4")
+    assert struct["f"] == {"g": "2"} and "y" not in struct["a"]["b"]
+    assert index.to_struct() == {
+        "a": {
+            "b": {"x": ("3", operations.create), "y": ("4", operations.create)},
+            "d": {"e": "1"},
+        }
+    }
+
+
+def test_edit():
+    struct = {"src": {"a.py": "a", "b.py": "b", "c.txt": "c"}, "tox.ini": "tox"}
+    edited = structure.edit(
+        struct,
+        ensure={"src/d.py": "d", "setup.py": ("setup", NO_OVERWRITE)},
+        modify={"src/*.py": lambda old, op: ("# header\n" + old, op)},
+        reject=["tox.ini", "src/b.*"],
+    )
+    assert edited == {
+        "src": {
+            "a.py": ("# header\na", operations.create),
+            "c.txt": "c",
+            "d.py": ("# header\nd", operations.create),
+        },
+        "setup.py": ("setup", NO_OVERWRITE),
+    }
+    # the original structure is not changed
+    assert struct["src"]["a.py"] == "a" and "tox.ini" in struct
+
+
+def test_edit_reuses_the_index(monkeypatch):
+    indexes = []
+
+    class Index(structure.StructureIndex):
+        def __init__(self, *args):
+            indexes.append(self)
+            super().__init__(*args)
+
+    monkeypatch.setattr(structure, "StructureIndex", Index)
+    struct = {"src": {"a.py": "a"}}
+    for name in ("b.py", "c.py", "d.py"):
+        struct = structure.edit(struct, ensure={f"src/{name}": name})
+    assert list(struct["src"]) == ["a.py", "b.py", "c.py", "d.py"]
+    # a chain of edits indexes the structure only once
+    assert len(indexes) == 1
+    # but other structures are indexed again
+    assert structure.edit({"x": "x"}, reject=["x"]) == {}
+    assert len(indexes) == 2
@@ -1,12 +1,14 @@
 import sys
 from configparser import ConfigParser
 from pathlib import Path
+from string import Template
 
 import pytest
 
 from snek import actions, api
 from snek import dependencies as deps
-from snek import info, templates
+from snek import info, structure, templates
+from snek.operations import create, no_overwrite
 
 
 def test_get_template():
@@ -15,6 +17,24 @@ def test_get_template():
     assert content.split("\n", 1)[0] == '"""'
 
 
+def test_get_template_is_cached():
+    templates.clear_cache()
+    template = templates.get_template("setup_py")
+    assert templates.get_template("setup_py", relative_to=templates) is template
+    templates.clear_cache()
+    assert templates.get_template("setup_py") is not template
+
+
+def test_warm_cache(monkeypatch):
+    templates.clear_cache()
+    names = templates.warm_cache()
+    assert {"setup_py", "setup_cfg", "license_mit", "gitignore"} <= set(names)
+    # After warming, templates are not read again
+    monkeypatch.setattr(templates, "read_text", lambda *_, **__: 1 / 0)
+    for name in names:
+        assert isinstance(templates.get_template(name), Template)
+
+
 @pytest.fixture
 def tmp_python_path(tmp_path):
     sys.path.append(str(tmp_path))
@@ -96,3 +116,34 @@ def test_setup_cfg_2line_description(tmpfolder):
     Path(tmpfolder, "setup.cfg").write_text(text)
     opts = info.project({})
     assert opts["description"].strip() == "2 line\ndescription"
+
+
+def test_compiled_template():
+    text = "$name: ${description} costs $$5 (${missing})\n"
+    template = templates.get_template("readme")
+    assert isinstance(template, templates.CompiledTemplate)
+
+    compiled = templates.CompiledTemplate(text)
+    opts = {"name": "proj", "description": 42}
+    # Same results as string.Template
+    assert compiled.safe_substitute(opts) == Template(text).safe_substitute(opts)
+    assert compiled.safe_substitute(opts) == "proj: 42 costs $5 (${missing})\n"
+    assert compiled.substitute(opts, missing="x") == "proj: 42 costs $5 (x)\n"
+    with pytest.raises(KeyError):
+        compiled.substitute(opts)
+    # Invalid placeholders behave exactly as in string.Template
+    with pytest.raises(ValueError, match="line 1, col 6"):
+        templates.CompiledTemplate("cost $ 5").substitute(opts)
+    assert templates.CompiledTemplate("cost $ 5").safe_substitute(opts) == "cost $ 5"
+
+
+def test_render_templates():
+    struct = {
+        "a.txt": Template("$name"),
+        "b": {"c.txt": (Template("${name}!"), no_overwrite())},
+        "d.txt": lambda opts: opts["name"],
+    }
+    rendered = structure.render_templates(struct, {"name": "proj"})
+    assert rendered["a.txt"] == ("proj", create)
+    assert rendered["b"]["c.txt"][0] == "proj!"
+    assert rendered["d.txt"] is struct["d.txt"]
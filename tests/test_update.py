@@ -13,7 +13,7 @@ from packaging.version import Version
 
 from snek import __path__ as snek_paths
 from snek import __version__, actions, info, update
-from snek.file_system import chdir
+from snek.file_system import DISK, MemoryFileSystem, chdir, use_backend
 
 from .helpers import in_ci, path_as_uri, skip_on_conda_build
 from .system.helpers import normalize_run_args
@@ -395,3 +395,57 @@ def test_replace_find_with_find_namespace(tmpfolder):
     assert "options.packages.find" in cfg
     assert cfg["options.packages.find"]["where"].value == "src"
     assert cfg["options.packages.find"]["exclude"].value.strip() == "tests"
+
+
+def test_version_migration_reads_and_writes_once(
+    tmpfolder, existing_config, monkeypatch
+):
+    # Given a project generated with an old version of snek,
+    reads, writes = [], []
+    read_setupcfg, write_atomically = update.read_setupcfg, update.write_atomically
+
+    def _read(*args):
+        reads.append(args)
+        return read_setupcfg(*args)
+
+    def _write(file, *args):
+        writes.append(Path(file).name)
+        return write_atomically(file, *args)
+
+    monkeypatch.setattr(update, "read_setupcfg", _read)
+    monkeypatch.setattr(update, "write_atomically", _write)
+    # when it is updated,
+    opts = {"project_path": tmpfolder, "update": True}
+    original = actions.get_default_options({}, opts)[1]
+    given = original.copy()
+    _, opts = update.version_migration({}, original)
+    # then all the migration steps share a single parsed setup.cfg,
+    assert len(reads) == 1
+    # each file is written only once, after all the steps are done,
+    assert sorted(writes) == ["pyproject.toml", "setup.cfg"]
+    assert update.UpdateTransaction.KEY not in opts
+    assert original == given  # the given opts are not mutated
+    # and all the changes are there
+    setupcfg = info.read_setupcfg(existing_config)
+    assert "setup_requires" not in setupcfg["options"]
+    assert setupcfg["options"]["packages"].value == "find_namespace:"
+    assert "options.entry_points" not in setupcfg  # only for older versions
+    assert "somedep>=3.8" in str(info.read_pyproject(tmpfolder)["build-system"])
+
+
+def test_version_migration_uses_file_system_backend(tmpfolder, existing_config):
+    # Given a project generated with an old version of snek,
+    original = existing_config.read_text()
+    # when it is updated with an in-memory backend (falling back to the disk),
+    opts = {"project_path": tmpfolder, "update": True}
+    with use_backend(MemoryFileSystem(fallback=DISK)) as memory:
+        update.version_migration({}, actions.get_default_options({}, opts)[1])
+        setupcfg = info.read_setupcfg(existing_config)
+        pyproject = info.read_pyproject(tmpfolder)
+    # then the changes are kept in memory,
+    assert setupcfg["options"]["packages"].value == "find_namespace:"
+    assert "somedep>=3.8" in str(pyproject["build-system"])
+    # and the disk is not touched
+    assert existing_config.read_text() == original
+    assert not Path(tmpfolder, "pyproject.toml").exists()
+    assert sorted(p.name for p in memory.files) == ["pyproject.toml", "setup.cfg"]